@@ -0,0 +1,34 @@
+"""Add client_record_id idempotency keys to test tables
+
+Revision ID: 3a6f2d9c8e71
+Revises: 7d1f4b9e2c56
+Create Date: 2026-10-16 20:41:12.305918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a6f2d9c8e71'
+down_revision = '7d1f4b9e2c56'
+branch_labels = None
+depends_on = None
+
+
+# 已有记录的 client_record_id 为 NULL，唯一索引允许多个 NULL
+TABLES = ['wifi_board_tests', 'driver_board_tests', 'integrate_tests', 'temperature_datas', 'wifi_test_logs']
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('client_record_id', sa.String(length=64), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_client_record_id'), ['client_record_id'], unique=True)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_client_record_id'))
+            batch_op.drop_column('client_record_id')
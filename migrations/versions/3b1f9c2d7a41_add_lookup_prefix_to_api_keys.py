@@ -0,0 +1,40 @@
+"""Add indexed lookup_prefix to api_keys table
+
+Revision ID: 3b1f9c2d7a41
+Revises: 6f61b26a8afd
+Create Date: 2026-10-16 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f9c2d7a41'
+down_revision = '6f61b26a8afd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lookup_prefix', sa.String(length=16), nullable=True))
+        batch_op.create_index(batch_op.f('ix_api_keys_lookup_prefix'), ['lookup_prefix'], unique=False)
+
+    # 回填已有密钥：key_prefix 保存的是 "原文前12位..."，截取前12位即为查找前缀
+    api_keys = sa.table(
+        'api_keys',
+        sa.column('key_prefix', sa.String),
+        sa.column('lookup_prefix', sa.String),
+    )
+    op.execute(
+        api_keys.update()
+        .where(api_keys.c.lookup_prefix.is_(None))
+        .values(lookup_prefix=sa.func.substr(api_keys.c.key_prefix, 1, 12))
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_api_keys_lookup_prefix'))
+        batch_op.drop_column('lookup_prefix')
@@ -0,0 +1,80 @@
+"""Store temperature sample arrays as packed binary
+
+Revision ID: 4e8a2c6f9d13
+Revises: 9b3d7e1f6a28
+Create Date: 2026-10-16 18:47:09.214583
+
+"""
+import json
+import struct
+from itertools import accumulate
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a2c6f9d13'
+down_revision = '9b3d7e1f6a28'
+branch_labels = None
+depends_on = None
+
+
+ARRAY_COLUMNS = ['original_temperature', 'compensated_temperature']
+BATCH_SIZE = 500
+
+
+def _unpack(value):
+    # 与 PackedFloatArray 的格式一致：0x00 JSON、0x01 float64、0x02 int16 差分，其他为迁移前的 JSON 文本
+    value = bytes(value)
+    if value[0] == 0x01:
+        return list(struct.unpack(f'<{(len(value) - 1) // 8}d', value[1:]))
+    if value[0] == 0x02:
+        first, *deltas = struct.unpack(f'<i{(len(value) - 5) // 2}h', value[1:])
+        return [centi / 100 for centi in accumulate(deltas, initial=first)]
+    return json.loads(value[1:] if value[0] == 0x00 else value)
+
+
+def upgrade():
+    # 只改列类型，已有的 JSON 文本按原字节保留并可直接读取；
+    # 存量数据由 `flask temperature-data pack-arrays` 在后台分批转换
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        for column in ARRAY_COLUMNS:
+            batch_op.alter_column(column,
+                   existing_type=sa.JSON(),
+                   type_=sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'),
+                   existing_nullable=True)
+
+
+def downgrade():
+    # 先把二进制数组还原为 JSON 文本，再改回 JSON 列
+    bind = op.get_bind()
+    datas = sa.table('temperature_datas', sa.column('id', sa.String(26)),
+                     *[sa.column(column, sa.LargeBinary()) for column in ARRAY_COLUMNS])
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(datas.c.id, *[datas.c[column] for column in ARRAY_COLUMNS])
+            .where(datas.c.id > last_id)
+            .order_by(datas.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for column_index, column in enumerate(ARRAY_COLUMNS, start=1):
+            changes = [{'row_id': row[0], 'value': json.dumps(_unpack(row[column_index])).encode('utf-8')}
+                       for row in rows if row[column_index]]
+            if changes:
+                bind.execute(
+                    datas.update().where(datas.c.id == sa.bindparam('row_id')).values({column: sa.bindparam('value')}),
+                    changes,
+                )
+
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        for column in ARRAY_COLUMNS:
+            batch_op.alter_column(column,
+                   existing_type=sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'),
+                   type_=sa.JSON(),
+                   existing_nullable=True)
@@ -0,0 +1,50 @@
+"""Add (sort column, id) indexes for keyset pagination
+
+Revision ID: 5e9a1c7b3d60
+Revises: d2b8e6c4f915
+Create Date: 2026-10-16 13:05:21.447190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a1c7b3d60'
+down_revision = 'd2b8e6c4f915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('wifi_board_tests', schema=None) as batch_op:
+        batch_op.create_index('ix_wifi_board_tests_update_time_id', ['update_time', 'id'], unique=False)
+
+    with op.batch_alter_table('driver_board_tests', schema=None) as batch_op:
+        batch_op.create_index('ix_driver_board_tests_update_time_id', ['update_time', 'id'], unique=False)
+
+    with op.batch_alter_table('integrate_tests', schema=None) as batch_op:
+        batch_op.create_index('ix_integrate_tests_update_time_id', ['update_time', 'id'], unique=False)
+
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        batch_op.create_index('ix_temperature_datas_update_time_id', ['update_time', 'id'], unique=False)
+
+    with op.batch_alter_table('wifi_test_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_wifi_test_logs_create_time_id', ['create_time', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('wifi_test_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_wifi_test_logs_create_time_id')
+
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        batch_op.drop_index('ix_temperature_datas_update_time_id')
+
+    with op.batch_alter_table('integrate_tests', schema=None) as batch_op:
+        batch_op.drop_index('ix_integrate_tests_update_time_id')
+
+    with op.batch_alter_table('driver_board_tests', schema=None) as batch_op:
+        batch_op.drop_index('ix_driver_board_tests_update_time_id')
+
+    with op.batch_alter_table('wifi_board_tests', schema=None) as batch_op:
+        batch_op.drop_index('ix_wifi_board_tests_update_time_id')
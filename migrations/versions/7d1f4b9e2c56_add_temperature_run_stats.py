@@ -0,0 +1,41 @@
+"""Add precomputed run statistics columns to temperature_datas
+
+Revision ID: 7d1f4b9e2c56
+Revises: 4e8a2c6f9d13
+Create Date: 2026-10-16 19:25:38.661402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d1f4b9e2c56'
+down_revision = '4e8a2c6f9d13'
+branch_labels = None
+depends_on = None
+
+
+# (列名, 类型, 注释)：已有记录由 `flask temperature-data backfill-stats` 计算
+STATS_COLUMNS = [
+    ('max_temp', sa.Float(), '最高温度'),
+    ('min_temp', sa.Float(), '最低温度'),
+    ('mean_temp', sa.Float(), '平均温度'),
+    ('time_to_stable', sa.Integer(), '进入稳定区间所用时间，单位：秒'),
+    ('overshoot', sa.Float(), '最高温度超出稳定温度的幅度'),
+    ('compensated_drift', sa.Float(), '补偿后温度在稳定段内的漂移'),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        for name, type_, comment in STATS_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=True, comment=comment))
+            batch_op.create_index(batch_op.f(f'ix_temperature_datas_{name}'), [name], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('temperature_datas', schema=None) as batch_op:
+        for name, _, _ in reversed(STATS_COLUMNS):
+            batch_op.drop_index(batch_op.f(f'ix_temperature_datas_{name}'))
+            batch_op.drop_column(name)
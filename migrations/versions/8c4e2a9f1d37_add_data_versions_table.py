@@ -0,0 +1,32 @@
+"""Add data_versions table for cross-worker cache invalidation
+
+Revision ID: 8c4e2a9f1d37
+Revises: 3b1f9c2d7a41
+Create Date: 2026-10-16 10:03:17.552914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2a9f1d37'
+down_revision = '3b1f9c2d7a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_versions = op.create_table('data_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('update_time', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # 预置API密钥代数计数器
+    op.bulk_insert(data_versions, [{'name': 'api_keys', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('data_versions')
@@ -0,0 +1,77 @@
+"""Store wifi_test_logs.raw_data as compressed binary
+
+Revision ID: 9b3d7e1f6a28
+Revises: c7e2a5d8f043
+Create Date: 2026-10-16 18:12:47.530916
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3d7e1f6a28'
+down_revision = 'c7e2a5d8f043'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 500
+
+
+def _decompress(value):
+    # 与 CompressedText 的标记字节一致：0x00 原文、0x01 zlib、0x02 zstd，其他为未压缩的旧数据
+    value = bytes(value)
+    if not value:
+        return value
+    if value[0] == 0x00:
+        return value[1:]
+    if value[0] == 0x01:
+        return zlib.decompress(value[1:])
+    if value[0] == 0x02:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(value[1:])
+    return value
+
+
+def upgrade():
+    # 只改列类型，已有内容按原字节保留；读取时没有编码标记的内容按未压缩文本处理，
+    # 存量数据由 `flask wifi-test-logs compress-raw-data` 在后台分批压缩
+    with op.batch_alter_table('wifi_test_logs', schema=None) as batch_op:
+        batch_op.alter_column('raw_data',
+               existing_type=sa.Text(),
+               type_=sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'),
+               existing_nullable=False)
+
+
+def downgrade():
+    # 先把压缩过的行还原为 UTF-8 文本，再改回 TEXT
+    bind = op.get_bind()
+    logs = sa.table('wifi_test_logs', sa.column('id', sa.String(26)), sa.column('raw_data', sa.LargeBinary()))
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(logs.c.id, logs.c.raw_data)
+            .where(logs.c.id > last_id)
+            .order_by(logs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        changes = [{'row_id': row_id, 'value': _decompress(value)}
+                   for row_id, value in rows if value is not None]
+        if changes:
+            bind.execute(
+                logs.update().where(logs.c.id == sa.bindparam('row_id')).values(raw_data=sa.bindparam('value')),
+                changes,
+            )
+
+    with op.batch_alter_table('wifi_test_logs', schema=None) as batch_op:
+        batch_op.alter_column('raw_data',
+               existing_type=sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'),
+               type_=sa.Text(),
+               existing_nullable=False)
@@ -0,0 +1,34 @@
+"""Convert api_keys.usage_count from string to integer
+
+Revision ID: a7d3f5e8b210
+Revises: 8c4e2a9f1d37
+Create Date: 2026-10-16 10:41:05.270381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f5e8b210'
+down_revision = '8c4e2a9f1d37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已有的值都是由 str(int(...)) 写入的数字字符串，可直接转换
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.alter_column('usage_count',
+               existing_type=sa.String(length=10),
+               type_=sa.Integer(),
+               existing_nullable=False,
+               postgresql_using='usage_count::integer')
+
+
+def downgrade():
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.alter_column('usage_count',
+               existing_type=sa.Integer(),
+               type_=sa.String(length=10),
+               existing_nullable=False)
@@ -0,0 +1,74 @@
+"""Add board_summaries table for per-board test statistics
+
+Revision ID: b4f7d2e9c381
+Revises: 5e9a1c7b3d60
+Create Date: 2026-10-16 14:22:09.518734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f7d2e9c381'
+down_revision = '5e9a1c7b3d60'
+branch_labels = None
+depends_on = None
+
+
+# 测试类型 -> (测试记录表, 序列号列, 测试结果列)
+SUMMARY_SOURCES = {
+    'wifi': ('wifi_board_tests', 'wifi_board_sn', 'general_test_result'),
+    'driver': ('driver_board_tests', 'driver_board_sn', 'driver_test_result'),
+    'integrate': ('integrate_tests', 'product_sn', 'integrate_test_result'),
+}
+
+
+def upgrade():
+    op.create_table('board_summaries',
+    sa.Column('test_type', sa.String(length=16), nullable=False),
+    sa.Column('sn', sa.String(length=32), nullable=False),
+    sa.Column('total_tests', sa.Integer(), nullable=False),
+    sa.Column('pass_count', sa.Integer(), nullable=False),
+    sa.Column('fail_count', sa.Integer(), nullable=False),
+    sa.Column('first_test_time', sa.DateTime(), nullable=True),
+    sa.Column('latest_test_time', sa.DateTime(), nullable=True),
+    sa.Column('latest_result', sa.String(length=64), nullable=True),
+    sa.Column('latest_test_id', sa.String(length=26), nullable=True),
+    sa.Column('update_time', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('test_type', 'sn')
+    )
+    with op.batch_alter_table('board_summaries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_board_summaries_latest_test_time'), ['latest_test_time'], unique=False)
+
+    # 从现有测试记录回填汇总
+    for test_type, (table, sn_column, result_column) in SUMMARY_SOURCES.items():
+        op.execute(sa.text(f"""
+        INSERT INTO board_summaries
+            (test_type, sn, total_tests, pass_count, fail_count,
+             first_test_time, latest_test_time, latest_result, latest_test_id, update_time)
+        SELECT :test_type, sn, total_tests, pass_count, fail_count,
+               first_test_time, create_time, result, id, CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                {sn_column} AS sn,
+                {result_column} AS result,
+                create_time,
+                id,
+                COUNT(*) OVER (PARTITION BY {sn_column}) AS total_tests,
+                SUM(CASE WHEN LOWER({result_column}) = 'pass' THEN 1 ELSE 0 END) OVER (PARTITION BY {sn_column}) AS pass_count,
+                SUM(CASE WHEN LOWER({result_column}) = 'fail' THEN 1 ELSE 0 END) OVER (PARTITION BY {sn_column}) AS fail_count,
+                MIN(create_time) OVER (PARTITION BY {sn_column}) AS first_test_time,
+                ROW_NUMBER() OVER (PARTITION BY {sn_column} ORDER BY create_time DESC, id DESC) AS rn
+            FROM {table}
+            WHERE is_deleted = 0
+        ) ranked
+        WHERE rn = 1
+        """).bindparams(test_type=test_type))
+
+
+def downgrade():
+    with op.batch_alter_table('board_summaries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_board_summaries_latest_test_time'))
+
+    op.drop_table('board_summaries')
@@ -0,0 +1,48 @@
+"""Add n-gram FULLTEXT indexes for serial number substring search
+
+Revision ID: c7e2a5d8f043
+Revises: f1c8e4a2b597
+Create Date: 2026-10-16 17:06:31.902417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2a5d8f043'
+down_revision = 'f1c8e4a2b597'
+branch_labels = None
+depends_on = None
+
+
+# (表名, 序列号列)：sn_match=contains 时使用的全文索引
+FULLTEXT_COLUMNS = [
+    ('wifi_board_tests', 'wifi_board_sn'),
+    ('driver_board_tests', 'driver_board_sn'),
+    ('integrate_tests', 'product_sn'),
+    ('temperature_datas', 'product_sn'),
+    ('wifi_test_logs', 'wifi_board_sn'),
+    ('wifi_test_logs', 'mac_address'),
+    ('board_summaries', 'sn'),
+]
+
+
+def upgrade():
+    # n-gram 全文解析器只有 MySQL 支持，其他数据库的子串搜索退回 LIKE
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    for table, column in FULLTEXT_COLUMNS:
+        op.create_index(
+            f'ft_{table}_{column}', table, [column],
+            mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    for table, column in reversed(FULLTEXT_COLUMNS):
+        op.drop_index(f'ft_{table}_{column}', table_name=table)
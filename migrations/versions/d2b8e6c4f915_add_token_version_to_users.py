@@ -0,0 +1,26 @@
+"""Add token_version to users table
+
+Revision ID: d2b8e6c4f915
+Revises: a7d3f5e8b210
+Create Date: 2026-10-16 11:26:48.903412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b8e6c4f915'
+down_revision = 'a7d3f5e8b210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
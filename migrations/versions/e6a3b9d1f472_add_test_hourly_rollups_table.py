@@ -0,0 +1,62 @@
+"""Add test_hourly_rollups table for time-stats
+
+Revision ID: e6a3b9d1f472
+Revises: b4f7d2e9c381
+Create Date: 2026-10-16 15:40:31.206518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a3b9d1f472'
+down_revision = 'b4f7d2e9c381'
+branch_labels = None
+depends_on = None
+
+
+# 测试类型 -> (测试记录表, 测试结果列)
+ROLLUP_SOURCES = {
+    'wifi': ('wifi_board_tests', 'general_test_result'),
+    'driver': ('driver_board_tests', 'driver_test_result'),
+    'integrate': ('integrate_tests', 'integrate_test_result'),
+}
+
+
+def upgrade():
+    op.create_table('test_hourly_rollups',
+    sa.Column('test_type', sa.String(length=16), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False, comment='UTC整点时间'),
+    sa.Column('result', sa.String(length=8), nullable=False, comment='pass/fail/other'),
+    sa.Column('test_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('test_type', 'bucket', 'result')
+    )
+
+    # 从现有测试记录回填小时计数
+    if op.get_bind().dialect.name == 'mysql':
+        bucket = "DATE_FORMAT(create_time, '%Y-%m-%d %H:00:00')"
+    else:
+        bucket = "strftime('%Y-%m-%d %H:00:00.000000', create_time)"
+
+    for test_type, (table, result_column) in ROLLUP_SOURCES.items():
+        op.execute(sa.text(f"""
+        INSERT INTO test_hourly_rollups (test_type, bucket, result, test_count)
+        SELECT :test_type, bucket, result, COUNT(*)
+        FROM (
+            SELECT
+                {bucket} AS bucket,
+                CASE
+                    WHEN LOWER({result_column}) = 'pass' THEN 'pass'
+                    WHEN LOWER({result_column}) = 'fail' THEN 'fail'
+                    ELSE 'other'
+                END AS result
+            FROM {table}
+            WHERE is_deleted = 0 AND create_time IS NOT NULL
+        ) tests
+        GROUP BY bucket, result
+        """).bindparams(test_type=test_type))
+
+
+def downgrade():
+    op.drop_table('test_hourly_rollups')
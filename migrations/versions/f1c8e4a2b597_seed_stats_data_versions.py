@@ -0,0 +1,35 @@
+"""Seed data_versions counters for stats cache invalidation
+
+Revision ID: f1c8e4a2b597
+Revises: e6a3b9d1f472
+Create Date: 2026-10-16 16:48:55.730162
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c8e4a2b597'
+down_revision = 'e6a3b9d1f472'
+branch_labels = None
+depends_on = None
+
+
+# 统计缓存依赖的测试记录表
+TABLE_NAMES = ['wifi_board_tests', 'driver_board_tests', 'integrate_tests']
+
+
+def upgrade():
+    # 预置版本号行，避免首次写入时并发插入同一计数器
+    data_versions = sa.table(
+        'data_versions',
+        sa.column('name', sa.String),
+        sa.column('version', sa.BigInteger),
+    )
+    op.bulk_insert(data_versions, [{'name': name, 'version': 0} for name in TABLE_NAMES])
+
+
+def downgrade():
+    data_versions = sa.table('data_versions', sa.column('name', sa.String))
+    op.execute(data_versions.delete().where(data_versions.c.name.in_(TABLE_NAMES)))
@@ -6,8 +6,16 @@ from datetime import datetime, timezone
 # 导入新的认证模块
 from src.auth.jwt_config import init_jwt
 from src.auth.rate_limiter import init_limiter
+from src.auth.api_key_cache import init_api_key_cache
+from src.auth.api_key_usage import init_api_key_usage
+from src.auth.token_claims import init_token_claims
+from src.utils.stats_cache import init_stats_cache
+from src.utils.serializer import init_json_provider
+from src.utils.ingest_queue import init_ingest_queue
+from src.models.hourly_rollup_model import init_hourly_rollup
 
 from src.config.database import Config
+from src.cli import init_cli
 from src.extensions import db
 
 # 导入新的认证路由
@@ -21,12 +29,16 @@ from src.routes import (
     driver_board_tests_bp, 
     integrate_tests_bp, 
     wifi_test_logs_bp,
-    temperature_data_bp
+    temperature_data_bp,
+    trace_bp
 )
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# JSON 响应序列化（可选 orjson）
+init_json_provider(app)
+
 # 开启 CORS 支持
 # CORS(app, supports_credentials=True, origins=[
 #     "http://localhost:5173",
@@ -40,6 +52,16 @@ db.init_app(app)
 # 初始化认证系统
 init_jwt(app)
 init_limiter(app)
+init_api_key_cache(app)
+init_api_key_usage(app)
+init_token_claims(app)
+
+# 初始化统计接口缓存和小时预聚合写回
+init_stats_cache(app)
+init_hourly_rollup(app)
+
+# 初始化异步写入队列
+init_ingest_queue(app)
 
 # 注册认证相关路由
 app.register_blueprint(auth_bp)
@@ -52,9 +74,13 @@ app.register_blueprint(driver_board_tests_bp)
 app.register_blueprint(integrate_tests_bp) 
 app.register_blueprint(wifi_test_logs_bp)
 app.register_blueprint(temperature_data_bp)
+app.register_blueprint(trace_bp)
 
 migrate = Migrate(app, db)
 
+# 注册维护命令
+init_cli(app)
+
 @app.route('/')
 def home():
     return 'Welcome to the Flask Web Service'
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.extensions import db
+from src.models.data_version_model import DataVersion
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# data_versions 表中 API 密钥代数计数器的名称
+API_KEY_GENERATION = 'api_keys'
+
+
+class CachedApiKey:
+    """已验证API密钥的只读快照，缓存命中时代替 ApiKey 模型放入 g.api_key"""
+    __slots__ = ('id', 'key_name', 'scope', 'permissions', 'expires_at')
+
+    def __init__(self, id, key_name, scope, permissions, expires_at):
+        self.id = id
+        self.key_name = key_name
+        self.scope = scope
+        self.permissions = list(permissions or [])
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_model(cls, api_key):
+        return cls(
+            id=api_key.id,
+            key_name=api_key.key_name,
+            scope=api_key.scope,
+            permissions=api_key.permissions,
+            expires_at=api_key.expires_at,
+        )
+
+    def is_valid(self) -> bool:
+        """检查密钥是否过期（数据库中的时间为无时区的UTC时间）"""
+        if self.expires_at is None:
+            return True
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) <= expires_at
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+
+class ApiKeyCache:
+    """
+    进程内已验证密钥缓存，键为请求中密钥原文的 SHA-256 摘要。
+    撤销/修改密钥时递增 data_versions 中的代数，其它 worker 最多在
+    generation_interval 秒后发现代数变化并清空本地缓存。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, generation_interval: float = 2.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation_interval = generation_interval
+        self._generation = None
+        self._generation_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._cache = TTLCache(
+            maxsize=app.config.get('API_KEY_CACHE_SIZE', 1024),
+            ttl=app.config.get('API_KEY_CACHE_TTL', 300),
+        )
+        self.generation_interval = app.config.get('API_KEY_CACHE_GENERATION_INTERVAL', 2.0)
+
+    @staticmethod
+    def digest(raw_key: str) -> str:
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+    def get(self, raw_key: str):
+        """命中时返回 CachedApiKey，否则返回 None"""
+        self._sync_generation()
+        return self._cache.get(self.digest(raw_key))
+
+    def put(self, raw_key: str, api_key) -> CachedApiKey:
+        snapshot = CachedApiKey.from_model(api_key)
+        self._cache.set(self.digest(raw_key), snapshot)
+        return snapshot
+
+    def invalidate(self):
+        """清空本地缓存，并在下次访问时重新读取代数"""
+        self._cache.clear()
+        with self._lock:
+            self._generation = None
+            self._generation_checked_at = 0.0
+
+    def stats(self) -> dict:
+        data = self._cache.stats()
+        data['generation'] = self._generation
+        data['generation_interval'] = self.generation_interval
+        return data
+
+    def _sync_generation(self):
+        """按间隔检查数据库中的代数，发生变化则清空本地缓存"""
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.generation_interval:
+            return
+
+        try:
+            generation = DataVersion.current(API_KEY_GENERATION)
+        except Exception as e:
+            # 无法确认代数时不信任缓存，走完整验证流程
+            db.session.rollback()
+            logger.warning(f"Failed to read API key cache generation: {str(e)}")
+            self._cache.clear()
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                self._cache.clear()
+                self._generation = generation
+            self._generation_checked_at = now
+
+
+api_key_cache = ApiKeyCache()
+
+
+def init_api_key_cache(app):
+    """初始化API密钥验证缓存"""
+    api_key_cache.init_app(app)
@@ -0,0 +1,125 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, update
+
+from src.extensions import db
+from src.models.admin_api_keys import ApiKey
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyUsageTracker:
+    """
+    API密钥使用统计的写后合并器。
+    请求中只在内存里累加，后台线程按间隔（以及进程退出时）把每个密钥的增量
+    合并为一条 UPDATE ... SET usage_count = usage_count + n 写回数据库。
+    """
+
+    def __init__(self, flush_interval: float = 10):
+        self.flush_interval = flush_interval
+        self._app = None
+        self._pending = {}  # key_id -> [累计次数, 最后使用时间]
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def init_app(self, app):
+        self._app = app
+        self.flush_interval = app.config.get('API_KEY_USAGE_FLUSH_INTERVAL', 10)
+        atexit.register(self._flush_at_exit)
+
+    def record(self, key_id: str):
+        """记录一次使用，只修改内存"""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._pending.get(key_id)
+            if entry is None:
+                self._pending[key_id] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+        self._ensure_flusher()
+
+    def pending(self, key_id: str) -> int:
+        """尚未写回数据库的使用次数"""
+        with self._lock:
+            entry = self._pending.get(key_id)
+        return entry[0] if entry else 0
+
+    def flush(self) -> int:
+        """把累积的增量写回数据库，返回涉及的密钥数量（需在应用上下文中调用）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = ApiKey.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(
+                usage_count=table.c.usage_count + bindparam('b_count'),
+                last_used=bindparam('b_last_used'),
+            )
+        )
+        params = [
+            {'b_id': key_id, 'b_count': count, 'b_last_used': last_used}
+            for key_id, (count, last_used) in pending.items()
+        ]
+
+        try:
+            # 使用独立连接和事务，不影响请求中的 session
+            with db.engine.begin() as conn:
+                conn.execute(stmt, params)
+        except Exception as e:
+            logger.error(f"Failed to flush API key usage: {str(e)}")
+            self._merge_back(pending)
+            return 0
+
+        return len(pending)
+
+    def _merge_back(self, pending):
+        """写回失败时把增量放回内存，等待下次重试"""
+        with self._lock:
+            for key_id, (count, last_used) in pending.items():
+                entry = self._pending.get(key_id)
+                if entry is None:
+                    self._pending[key_id] = [count, last_used]
+                else:
+                    entry[0] += count
+                    entry[1] = max(entry[1], last_used)
+
+    def _ensure_flusher(self):
+        """每个进程（包括 fork 出的 gunicorn worker）首次使用时启动后台写回线程"""
+        if self._app is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._run_flusher, name='api-key-usage-flusher', daemon=True)
+        thread.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._app.app_context():
+                self.flush()
+
+    def _flush_at_exit(self):
+        if self._app is None or not self._pending:
+            return
+        with self._app.app_context():
+            self.flush()
+
+
+api_key_usage = ApiKeyUsageTracker()
+
+
+def init_api_key_usage(app):
+    """初始化API密钥使用统计的写后合并"""
+    api_key_usage.init_app(app)
@@ -2,9 +2,11 @@ import functools
 import logging
 from flask import request, jsonify, current_app, g
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
-from werkzeug.security import check_password_hash
 from src.models.admin_user_model import User
 from src.models.admin_api_keys import ApiKey
+from src.auth.api_key_cache import api_key_cache
+from src.auth.api_key_usage import api_key_usage
+from src.auth.token_claims import load_user_from_claims
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +34,14 @@ def require_api_key(permissions=None):
                 logger.warning(f"Missing API key from {request.remote_addr}")
                 return jsonify({'error': 'API key required'}), 401
             
-            # 第2步：验证API密钥
-            key_record = None
-            for key_obj in ApiKey.query.filter_by(is_active=True).all():
-                if key_obj.verify_key(api_key) and key_obj.is_valid():
-                    key_record = key_obj
-                    break
+            # 第2步：验证API密钥（优先读取已验证缓存，未命中时按前缀索引定位并校验）
+            key_record = api_key_cache.get(api_key)
+            if key_record is None:
+                key_model = ApiKey.find_by_key(api_key)
+                if key_model:
+                    key_record = api_key_cache.put(api_key, key_model)
             
-            if not key_record:
+            if not key_record or not key_record.is_valid():
                 logger.warning(f"Invalid API key from {request.remote_addr}")
                 return jsonify({'error': 'Invalid API key'}), 401
             
@@ -51,8 +53,8 @@ def require_api_key(permissions=None):
                         logger.warning(f"Insufficient permissions for API key {key_record.key_name}")
                         return jsonify({'error': 'Insufficient permissions'}), 403
             
-            # 第4步：更新使用统计
-            key_record.update_usage()
+            # 第4步：记录使用统计（内存累加，后台批量写回）
+            api_key_usage.record(key_record.id)
             
             # 第5步：保存到请求上下文
             g.api_key = key_record
@@ -95,11 +97,45 @@ def require_auth():
 
 
 
+def require_claims_auth():
+    """
+    JWT认证装饰器（声明授权模式）
+    开启 JWT_CLAIMS_ONLY_AUTH 时只依据令牌中的角色/权限声明授权，
+    通过短TTL缓存的令牌版本号保证时效性，不再查询完整用户行；未开启时等同 require_auth
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            # 外层已通过 require_auth 加载了用户时直接复用
+            if getattr(g, 'current_user', None) is None:
+                user_id = get_jwt_identity()
+                
+                if current_app.config.get('JWT_CLAIMS_ONLY_AUTH'):
+                    user = load_user_from_claims(user_id, get_jwt())
+                    if not user:
+                        return jsonify({'error': 'Token is outdated or user inactive'}), 401
+                else:
+                    user = User.query.get(user_id)
+                    if not user or not user.is_active:
+                        return jsonify({'error': 'User not found or inactive'}), 401
+                
+                g.current_user = user
+            
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+
+
+
+
 def require_role(roles):
     """角色权限装饰器"""
     def decorator(f):
         @functools.wraps(f)
-        @require_auth()     # 先验证JWT
+        @require_claims_auth()     # 先验证JWT
         def wrapper(*args, **kwargs):
             user = g.current_user
             required_roles = roles if isinstance(roles, list) else [roles]
@@ -123,7 +159,7 @@ def require_permission(permissions):
     """权限装饰器"""
     def decorator(f):
         @functools.wraps(f)
-        @require_auth()
+        @require_claims_auth()
         def wrapper(*args, **kwargs):
             user = g.current_user
             required_perms = permissions if isinstance(permissions, list) else [permissions]
@@ -17,7 +17,8 @@ def create_tokens_for_user(user: User):
     additional_claims = {
         'role': user.role,                      # 角色信息
         'permissions': user.permissions or [],  # 权限列表
-        'username': user.username
+        'username': user.username,
+        'token_version': user.token_version or 0  # 声明授权模式下用于校验令牌是否过时
     }
     
     # 创建访问令牌（短期，2小时）
@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+from src.extensions import db
+from src.models.admin_user_model import User
+from src.utils.ttl_cache import TTLCache
+
+# 用户令牌状态：当前令牌版本号和是否激活
+TokenState = namedtuple('TokenState', ['token_version', 'is_active'])
+
+
+class TokenUser:
+    """仅由JWT声明构建的当前用户，接口与 User 的权限判断方法保持一致"""
+
+    def __init__(self, user_id, claims):
+        self.id = user_id
+        self.username = claims.get('username')
+        self.role = claims.get('role')
+        self.permissions = claims.get('permissions') or []
+        self.token_version = claims.get('token_version', 0)
+
+    def has_permission(self, permission: str) -> bool:
+        if self.role == 'admin':
+            return True
+        return permission in self.permissions
+
+    def has_role(self, role) -> bool:
+        if isinstance(role, list):
+            return self.role in role
+        return self.role == role
+
+
+class TokenStateCache:
+    """按用户ID缓存令牌版本号与激活状态，只查询两个列而不加载整行用户"""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 30):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def init_app(self, app):
+        self._cache = TTLCache(
+            maxsize=app.config.get('JWT_TOKEN_STATE_CACHE_SIZE', 4096),
+            ttl=app.config.get('JWT_TOKEN_STATE_CACHE_TTL', 30),
+        )
+
+    def get(self, user_id):
+        state = self._cache.get(user_id)
+        if state is None:
+            row = db.session.query(User.token_version, User.is_active).filter_by(id=user_id).first()
+            if row is None:
+                return None
+            state = TokenState(int(row.token_version or 0), bool(row.is_active))
+            self._cache.set(user_id, state)
+        return state
+
+    def invalidate(self, user_id):
+        """用户角色/权限/状态变更后移除本进程缓存，其它进程在TTL后刷新"""
+        self._cache.pop(user_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+token_state_cache = TokenStateCache()
+
+
+def init_token_claims(app):
+    """初始化JWT声明授权所需的令牌状态缓存"""
+    token_state_cache.init_app(app)
+
+
+def load_user_from_claims(user_id, claims):
+    """校验令牌版本后返回 TokenUser；令牌已过时或用户被禁用时返回 None"""
+    state = token_state_cache.get(user_id)
+    if state is None or not state.is_active:
+        return None
+    if claims.get('token_version', 0) != state.token_version:
+        return None
+    return TokenUser(user_id, claims)
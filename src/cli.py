@@ -0,0 +1,101 @@
+import click
+
+from src.models.board_summary_model import BoardSummary, SUMMARY_SOURCES
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.models.wifi_test_log_model import WifiTestLog
+from src.models.temperature_data_model import TemperatureData
+from src.models.column_types import CODEC_MARKERS, recompress_column, repack_array_column
+from src.utils.temperature_stats import backfill_run_stats
+from src.utils.ingest_queue import ingest_queue
+
+
+def init_cli(app):
+    """注册维护用的 flask 命令"""
+
+    @app.cli.group('board-summary')
+    def board_summary_cli():
+        """板子汇总表维护"""
+
+    @board_summary_cli.command('rebuild')
+    @click.option('--test-type', type=click.Choice(sorted(SUMMARY_SOURCES)), default=None,
+                  help='只重建指定测试类型，默认全部')
+    def rebuild_board_summary(test_type):
+        """从测试记录全量重建板子汇总表"""
+        for name in ([test_type] if test_type else sorted(SUMMARY_SOURCES)):
+            count = BoardSummary.rebuild(name)
+            click.echo(f"{name}: {count} boards")
+
+    @app.cli.group('hourly-rollup')
+    def hourly_rollup_cli():
+        """测试次数小时预聚合表维护"""
+
+    @hourly_rollup_cli.command('rebuild')
+    @click.option('--test-type', type=click.Choice(sorted(SUMMARY_SOURCES)), default=None,
+                  help='只重建指定测试类型，默认全部')
+    def rebuild_hourly_rollup(test_type):
+        """从测试记录全量重建小时预聚合表"""
+        for name in ([test_type] if test_type else sorted(SUMMARY_SOURCES)):
+            count = TestHourlyRollup.rebuild(name)
+            click.echo(f"{name}: {count} buckets")
+
+    @app.cli.group('wifi-test-logs')
+    def wifi_test_logs_cli():
+        """WiFi测试日志维护"""
+
+    @wifi_test_logs_cli.command('compress-raw-data')
+    @click.option('--codec', type=click.Choice(sorted(CODEC_MARKERS)), default=None,
+                  help='目标编码，默认使用 RAW_DATA_CODEC 配置')
+    @click.option('--batch-size', type=int, default=500, show_default=True, help='每批改写并提交的行数')
+    @click.option('--force', is_flag=True, help='已压缩但编码不同的行也改写为目标编码')
+    def compress_raw_data(codec, batch_size, force):
+        """把已有日志的 raw_data 改写为压缩格式（可重复执行，已压缩的行跳过）"""
+        codec = codec or app.config.get('RAW_DATA_CODEC', 'zlib')
+        count = recompress_column(WifiTestLog, 'raw_data', codec, batch_size, force)
+        click.echo(f"raw_data: {count} rows rewritten as {codec}")
+
+    @app.cli.group('temperature-data')
+    def temperature_data_cli():
+        """温度数据维护"""
+
+    @temperature_data_cli.command('pack-arrays')
+    @click.option('--batch-size', type=int, default=500, show_default=True, help='每批改写并提交的行数')
+    def pack_temperature_arrays(batch_size):
+        """把已有记录的温度数组从 JSON 文本改写为二进制格式（可重复执行，已转换的行跳过）"""
+        for column in ('original_temperature', 'compensated_temperature'):
+            count = repack_array_column(TemperatureData, column, batch_size)
+            click.echo(f"{column}: {count} rows packed")
+
+    @temperature_data_cli.command('backfill-stats')
+    @click.option('--batch-size', type=int, default=100, show_default=True, help='每批计算并提交的记录数')
+    @click.option('--all', 'recompute_all', is_flag=True, help='重新计算全部记录（默认只处理缺少统计值的记录）')
+    def backfill_temperature_stats(batch_size, recompute_all):
+        """为已有温度记录计算统计列"""
+        count = backfill_run_stats(TemperatureData, batch_size, only_missing=not recompute_all)
+        click.echo(f"temperature_datas: {count} rows updated")
+
+    @app.cli.group('ingest-queue')
+    def ingest_queue_cli():
+        """异步写入队列维护"""
+
+    @ingest_queue_cli.command('status')
+    def ingest_queue_status():
+        """查看队列中等待入库、已放弃和保留幂等键的记录数"""
+        stats = ingest_queue.stats()
+        click.echo(f"pending: {stats['pending']}, dead: {stats['dead']}, flushed: {stats['flushed']}")
+
+    @ingest_queue_cli.command('flush')
+    def flush_ingest_queue():
+        """立即把队列中的记录写入数据库（停机维护前排空队列）"""
+        total = 0
+        while True:
+            count = ingest_queue.flush()
+            total += count
+            if count < ingest_queue.batch_size:
+                break
+        stats = ingest_queue.stats()
+        click.echo(f"{total} records flushed, {stats['pending']} pending, {stats['dead']} dead")
+
+    @ingest_queue_cli.command('requeue-dead')
+    def requeue_dead_records():
+        """把失败次数达到上限的记录重新放回队列（排除数据或表结构问题后使用）"""
+        click.echo(f"{ingest_queue.requeue_dead()} records requeued")
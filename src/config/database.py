@@ -13,4 +13,57 @@ class Config:
         f"{os.getenv('DB_NAME', 'my_db')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
+
+    # API密钥验证缓存
+    API_KEY_CACHE_SIZE = int(os.getenv('API_KEY_CACHE_SIZE', '1024'))
+    API_KEY_CACHE_TTL = int(os.getenv('API_KEY_CACHE_TTL', '300'))  # 缓存有效期(秒)
+    API_KEY_CACHE_GENERATION_INTERVAL = float(os.getenv('API_KEY_CACHE_GENERATION_INTERVAL', '2'))  # 跨worker失效检查间隔(秒)
+
+    # API密钥使用统计写回间隔(秒)
+    API_KEY_USAGE_FLUSH_INTERVAL = float(os.getenv('API_KEY_USAGE_FLUSH_INTERVAL', '10'))
+
+    # JWT声明授权模式：require_role/require_permission 只依据令牌声明授权，不查询用户行
+    JWT_CLAIMS_ONLY_AUTH = os.getenv('JWT_CLAIMS_ONLY_AUTH', 'false').lower() == 'true'
+    JWT_TOKEN_STATE_CACHE_TTL = int(os.getenv('JWT_TOKEN_STATE_CACHE_TTL', '30'))  # 令牌版本号缓存有效期(秒)
+
+    # 批量上传接口单次最多记录数
+    BATCH_INGEST_MAX_RECORDS = int(os.getenv('BATCH_INGEST_MAX_RECORDS', '500'))
+
+    # NDJSON 流式上传每次提交的记录数
+    NDJSON_INGEST_CHUNK_SIZE = int(os.getenv('NDJSON_INGEST_CHUNK_SIZE', '500'))
+
+    # 统计接口响应缓存：数据表版本号不变时直接返回缓存结果
+    STATS_CACHE_ENABLED = os.getenv('STATS_CACHE_ENABLED', 'true').lower() == 'true'
+    STATS_CACHE_SIZE = int(os.getenv('STATS_CACHE_SIZE', '512'))
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', '300'))  # 缓存有效期(秒)
+    STATS_CACHE_REDIS_URL = os.getenv('STATS_CACHE_REDIS_URL')  # 配置后多个worker共享缓存，如 redis://localhost:6379/0
+
+    # 序列号子串搜索（sn_match=contains）使用 MySQL n-gram 全文索引，需与服务器 ngram_token_size 一致
+    SN_FULLTEXT_SEARCH = os.getenv('SN_FULLTEXT_SEARCH', 'true').lower() == 'true'
+    SN_NGRAM_TOKEN_SIZE = int(os.getenv('SN_NGRAM_TOKEN_SIZE', '2'))
+
+    # 导出接口每批从服务端游标读取的行数
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # JSON 响应序列化：auto（已安装 orjson 时使用）、orjson、default（Flask 默认）
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto').lower()
+
+    # wifi_test_logs.raw_data 的压缩编码：zlib（默认）、zstd（需安装 zstandard）、raw（不压缩）
+    RAW_DATA_CODEC = os.getenv('RAW_DATA_CODEC', 'zlib').lower()
+    RAW_DATA_COMPRESS_LEVEL = int(os.getenv('RAW_DATA_COMPRESS_LEVEL')) if os.getenv('RAW_DATA_COMPRESS_LEVEL') else None
+
+    # 批量查询接口（POST /<resource>/lookup）每次最多的 id/序列号数量
+    LOOKUP_MAX_KEYS = int(os.getenv('LOOKUP_MAX_KEYS', '500'))
+
+    # 异步写入：创建接口把通过校验的记录追加到本地 SQLite 队列后立即返回 202，由后台线程批量入库
+    INGEST_QUEUE_ENABLED = os.getenv('INGEST_QUEUE_ENABLED', 'false').lower() == 'true'
+    INGEST_QUEUE_PATH = os.getenv('INGEST_QUEUE_PATH', 'instance/ingest_queue.db')  # 同一台机器上的所有worker共用
+    INGEST_QUEUE_FLUSH_INTERVAL = float(os.getenv('INGEST_QUEUE_FLUSH_INTERVAL', '1'))  # 写回间隔(秒)
+    INGEST_QUEUE_BATCH_SIZE = int(os.getenv('INGEST_QUEUE_BATCH_SIZE', '500'))
+    INGEST_QUEUE_CLAIM_TIMEOUT = int(os.getenv('INGEST_QUEUE_CLAIM_TIMEOUT', '60'))  # 认领租约(秒)，超时未写入的记录由其它worker重新认领
+    INGEST_QUEUE_MAX_ATTEMPTS = int(os.getenv('INGEST_QUEUE_MAX_ATTEMPTS', '5'))  # 数据错误导致写入失败的最大次数，超过后不再重试
+    INGEST_QUEUE_KEY_RETENTION = int(os.getenv('INGEST_QUEUE_KEY_RETENTION', '86400'))  # 入库后保留幂等键的时间(秒)，期间的重试由队列直接返回记录ID
+
+    # time-stats 小时预聚合的增量在事务提交后先累积在内存，按此间隔(秒)合并写回；偏差可用 flask hourly-rollup rebuild 校正
+    HOURLY_ROLLUP_FLUSH_INTERVAL = float(os.getenv('HOURLY_ROLLUP_FLUSH_INTERVAL', '2'))
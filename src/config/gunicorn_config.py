@@ -0,0 +1,63 @@
+"""
+gunicorn 生产环境配置，所有参数均可通过环境变量覆盖。
+
+启动方式: gunicorn -c src/config/gunicorn_config.py src.app:app
+"""
+import multiprocessing
+import os
+import sys
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# worker 类型：gthread（默认，多线程，适合等待数据库的 I/O 型接口）、gevent（协程，需安装 gevent）、sync
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread').lower()
+
+# worker 数量：sync 按 2 * CPU + 1；gthread/gevent 由线程/协程承担并发，按 CPU + 1
+workers = int(os.getenv('GUNICORN_WORKERS') or (CPU_COUNT * 2 + 1 if worker_class == 'sync' else CPU_COUNT + 1))
+
+# gthread 每个 worker 的线程数（需不超过 SQLAlchemy 连接池大小 + 溢出数，默认 5 + 10）
+threads = int(os.getenv('GUNICORN_THREADS') or (min(CPU_COUNT * 2, 15) if worker_class == 'gthread' else 1))
+
+# gevent 每个 worker 的最大并发连接数
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# 预加载应用：master 导入一次代码后 fork，worker 共享只读内存页、启动更快。
+# 数据库连接池由 post_fork 丢弃，后台写回线程按进程号在各 worker 中重新启动。
+# gevent 在 worker 中才打补丁，与预加载同时使用时可能出现未打补丁的锁，建议关闭预加载
+preload_app = os.getenv('GUNICORN_PRELOAD_APP', 'true').lower() == 'true'
+
+# 处理一定数量请求后重启 worker，防止内存缓慢增长；随机抖动避免所有 worker 同时重启
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', str(max_requests // 10)))
+
+# 超时(秒)：单个请求最长处理时间、重启时等待进行中请求的时间、长连接保持时间（需小于前端代理的空闲超时）
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# worker 心跳文件放在内存文件系统，避免容器中磁盘 I/O 阻塞导致误判超时
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    fork 后丢弃从 master 继承的数据库连接池（不关闭连接，连接仍属于 master），
+    worker 首次查询时建立自己的连接，避免多个进程共用同一个 MySQL 连接
+    """
+    app_module = sys.modules.get('src.app')
+    if app_module is None:
+        # 未预加载时应用在 fork 之后才导入，不存在继承的连接
+        return
+
+    from src.extensions import db
+
+    with app_module.app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    server.log.info(f"Worker {worker.pid}: disposed inherited database connection pools")
@@ -1,9 +1,10 @@
 import uuid
 import ulid
 import secrets
-from sqlalchemy import Column, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Text, JSON, Integer
 from werkzeug.security import generate_password_hash, check_password_hash
 from src.extensions import db
+from src.utils.serializer import BEIJING_TZ
 from datetime import datetime, timezone, timedelta
 
 
@@ -11,10 +12,8 @@ from datetime import datetime, timezone, timedelta
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    # 创建一个代表北京时间的时区对象
-    beijing_tz = timezone(timedelta(hours=8))
     # 将无时区的UTC时间强制指定为UTC时区，然后转换为北京时间
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 
 
@@ -22,12 +21,16 @@ def to_beijing_time(utc_dt):
 
 class ApiKey(db.Model):
     __tablename__ = 'api_keys'
+
+    # 查找前缀长度：hpws_ + 7位随机字符，足以在数千个密钥中唯一定位
+    LOOKUP_PREFIX_LENGTH = 12
     
     id = Column(String(26), primary_key=True, default=lambda: str(ulid.new()))
     key_name = Column(String(128), nullable=False)                          # 密钥名称
     key_description = Column(String(512), nullable=True)                    # 密钥用途和备注信息
     key_hash = Column(String(256), nullable=False, index=True)              # 密钥哈希值，不存原文
     key_prefix = Column(String(16), nullable=False)                         # 密钥前缀(显示用)
+    lookup_prefix = Column(String(16), nullable=True, index=True)           # 密钥查找前缀(索引定位用)
     
     # 权限和作用域
     scope = Column(String(64), nullable=False, default='upload')    # 作用域：upload/read/manage
@@ -40,7 +43,7 @@ class ApiKey(db.Model):
     
     # 使用统计
     last_used = Column(DateTime, nullable=True)
-    usage_count = Column(String(10), nullable=False, default='0')
+    usage_count = Column(Integer, nullable=False, default=0)
     
     # 审计字段
     created_by = Column(String(26), nullable=True)  # 创建者用户ID
@@ -59,6 +62,7 @@ class ApiKey(db.Model):
             key_description=description,
             key_hash=key_hash,
             key_prefix=key[:12] + "...",  # 只保存前缀用于显示
+            lookup_prefix=key[:cls.LOOKUP_PREFIX_LENGTH],  # 索引查找用前缀
             scope=scope,
             permissions=permissions or [],
             created_by=created_by
@@ -66,6 +70,22 @@ class ApiKey(db.Model):
         
         return api_key, key  # 返回模型和原始密钥
     
+    @classmethod
+    def find_by_key(cls, key: str):
+        """通过前缀索引定位候选密钥，只对候选行做哈希校验"""
+        if not key or len(key) < cls.LOOKUP_PREFIX_LENGTH:
+            return None
+
+        candidates = cls.query.filter_by(
+            lookup_prefix=key[:cls.LOOKUP_PREFIX_LENGTH],
+            is_active=True
+        ).all()
+
+        for key_obj in candidates:
+            if key_obj.verify_key(key) and key_obj.is_valid():
+                return key_obj
+        return None
+    
     def verify_key(self, key: str) -> bool:
         """验证密钥"""
         return check_password_hash(self.key_hash, key)
@@ -82,11 +102,6 @@ class ApiKey(db.Model):
         """检查是否有特定权限"""
         return permission in (self.permissions or [])
     
-    def update_usage(self):
-        """更新使用统计"""
-        self.last_used = datetime.now(timezone.utc)
-        self.usage_count = str(int(self.usage_count) + 1)
-    
     def to_dict(self):
         return {
             'id': self.id,
@@ -1,9 +1,10 @@
 import uuid
 import ulid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, JSON, Text
+from sqlalchemy import Column, String, Boolean, DateTime, JSON, Text, Integer
 from werkzeug.security import generate_password_hash, check_password_hash
 from src.extensions import db
+from src.utils.serializer import BEIJING_TZ
 from datetime import datetime, timezone, timedelta
 
 
@@ -11,10 +12,8 @@ from datetime import datetime, timezone, timedelta
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    # 创建一个代表北京时间的时区对象
-    beijing_tz = timezone(timedelta(hours=8))
     # 将无时区的UTC时间强制指定为UTC时区，然后转换为北京时间
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 
 
@@ -39,6 +38,7 @@ class User(db.Model):
     login_count = Column(String(10), nullable=False, default='0')
     failed_login_attempts = Column(String(10), nullable=False, default='0')
     locked_until = Column(DateTime, nullable=True)
+    token_version = Column(Integer, nullable=False, default=0)  # 令牌版本号，角色/权限/状态变更时递增使旧令牌失效
     
     # 审计字段
     created_by = Column(String(26), nullable=True)
@@ -59,6 +59,10 @@ class User(db.Model):
             return True
         return permission in (self.permissions or [])
     
+    def bump_token_version(self):
+        """递增令牌版本号，已签发的访问令牌在声明授权模式下随即失效"""
+        self.token_version = (self.token_version or 0) + 1
+    
     def has_role(self, role: str) -> bool:
         """检查是否有特定角色"""
         if isinstance(role, list):
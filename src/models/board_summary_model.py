@@ -0,0 +1,316 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import Column, String, Integer, DateTime, func, case, select, literal, bindparam
+from sqlalchemy.dialects import mysql, sqlite
+
+from src.extensions import db
+from src.utils.pagination import fetch_page
+from src.utils.sn_search import sn_params, sn_condition
+from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.driver_board_test_model import DriverBoardTest
+from src.models.integrate_test_model import IntegrateTest
+
+# 汇总来源：测试记录模型、序列号字段、测试结果字段
+SummarySource = namedtuple('SummarySource', ['model', 'sn_field', 'result_field'])
+
+SUMMARY_SOURCES = {
+    'wifi': SummarySource(WifiBoardTest, 'wifi_board_sn', 'general_test_result'),
+    'driver': SummarySource(DriverBoardTest, 'driver_board_sn', 'driver_test_result'),
+    'integrate': SummarySource(IntegrateTest, 'product_sn', 'integrate_test_result'),
+}
+
+# 重新计算汇总时写入的列（与 BoardSummary._recount_select 的列顺序一致）
+SUMMARY_COLUMNS = [
+    'test_type', 'sn', 'total_tests', 'pass_count', 'fail_count',
+    'first_test_time', 'latest_test_time', 'latest_result', 'latest_test_id',
+]
+
+# sn-stats 排序字段到汇总表列的映射
+SN_SORT_COLUMNS = {
+    'sn': 'sn',
+    'total_tests': 'total_tests',
+    'pass_count': 'pass_count',
+    'fail_count': 'fail_count',
+    'pass_rate': 'pass_rate',
+    'latest_test_time': 'latest_test_time',
+    'first_test_time': 'first_test_time',
+    'latest_result': 'latest_result',
+}
+
+
+def load_tests(test_type, test_ids):
+    """批量插入（Core executemany）后按ID读回入库时间、序列号和结果，供汇总/统计累加使用"""
+    source = SUMMARY_SOURCES[test_type]
+    model = source.model
+    if not test_ids:
+        return []
+    return db.session.execute(
+        select(
+            model.id,
+            model.create_time,
+            getattr(model, source.sn_field),
+            getattr(model, source.result_field),
+        ).where(model.id.in_(test_ids))
+    ).all()
+
+
+def _is_result(value, expected):
+    # 与 MySQL 默认排序规则一致，结果比较不区分大小写
+    return (value or '').lower() == expected
+
+
+class BoardSummary(db.Model):
+    """
+    每个测试类型下每块板子（序列号）一行的汇总：测试次数、成功/失败次数、
+    首次/最新测试时间和最新结果。由创建/修改/删除接口在同一事务中维护，
+    boards-stats / sn-stats 未按时间筛选时直接读取本表。
+    """
+    __tablename__ = 'board_summaries'
+    # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+    __table_args__ = (
+        db.Index('ft_board_summaries_sn', 'sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
+
+    test_type = Column(String(16), primary_key=True)
+    sn = Column(String(32), primary_key=True)
+    total_tests = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    fail_count = Column(Integer, nullable=False, default=0)
+    first_test_time = Column(DateTime, nullable=True)
+    latest_test_time = Column(DateTime, nullable=True, index=True)
+    latest_result = Column(String(64), nullable=True)
+    latest_test_id = Column(String(26), nullable=True)
+    update_time = Column(DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    @classmethod
+    def _increment_statement(cls):
+        """按 (test_type, sn) 累加的 upsert 语句，支持 executemany"""
+        table = cls.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            stmt = mysql.insert(table)
+            new = stmt.inserted
+        else:
+            stmt = sqlite.insert(table)
+            new = stmt.excluded
+
+        is_newer = new.latest_test_time >= table.c.latest_test_time
+        # MySQL 按顺序执行赋值，latest_test_time 必须最后更新
+        assignments = [
+            ('total_tests', table.c.total_tests + new.total_tests),
+            ('pass_count', table.c.pass_count + new.pass_count),
+            ('fail_count', table.c.fail_count + new.fail_count),
+            ('first_test_time', case(
+                (new.first_test_time < table.c.first_test_time, new.first_test_time),
+                else_=table.c.first_test_time
+            )),
+            ('latest_result', case((is_newer, new.latest_result), else_=table.c.latest_result)),
+            ('latest_test_id', case((is_newer, new.latest_test_id), else_=table.c.latest_test_id)),
+            ('latest_test_time', case((is_newer, new.latest_test_time), else_=table.c.latest_test_time)),
+            ('update_time', func.current_timestamp()),
+        ]
+        if dialect == 'mysql':
+            return stmt.on_duplicate_key_update(assignments)
+        return stmt.on_conflict_do_update(index_elements=['test_type', 'sn'], set_=dict(assignments))
+
+    @classmethod
+    def record_tests(cls, test_type, tests):
+        """新增测试记录后累加汇总（需在提交前调用，与测试记录同一事务）"""
+        source = SUMMARY_SOURCES[test_type]
+        increments = {}
+        for test in tests:
+            sn = getattr(test, source.sn_field)
+            result = getattr(test, source.result_field)
+            entry = increments.setdefault(sn, {
+                'test_type': test_type,
+                'sn': sn,
+                'total_tests': 0,
+                'pass_count': 0,
+                'fail_count': 0,
+                'first_test_time': test.create_time,
+                'latest_test_time': test.create_time,
+                'latest_result': result,
+                'latest_test_id': test.id,
+            })
+            entry['total_tests'] += 1
+            entry['pass_count'] += 1 if _is_result(result, 'pass') else 0
+            entry['fail_count'] += 1 if _is_result(result, 'fail') else 0
+            if test.create_time < entry['first_test_time']:
+                entry['first_test_time'] = test.create_time
+            if (test.create_time, test.id) > (entry['latest_test_time'], entry['latest_test_id']):
+                entry['latest_test_time'] = test.create_time
+                entry['latest_result'] = result
+                entry['latest_test_id'] = test.id
+
+        if increments:
+            # 按主键顺序写入：并发批次总以相同顺序加行锁，避免 InnoDB 死锁
+            db.session.execute(cls._increment_statement(), [increments[sn] for sn in sorted(increments)])
+
+    @classmethod
+    def _recount_select(cls, test_type, sns=None):
+        """
+        从测试记录表按序列号重新计算汇总的 SELECT（每块板子一行，按序列号排序，
+        列顺序与 SUMMARY_COLUMNS 一致），sns 为 None 时计算全部板子
+        """
+        source = SUMMARY_SOURCES[test_type]
+        model = source.model
+        sn_column = getattr(model, source.sn_field)
+        result_column = getattr(model, source.result_field)
+
+        conditions = [model.is_deleted.is_(False)]
+        if sns is not None:
+            conditions.append(sn_column.in_(sns))
+
+        ranked = select(
+            sn_column.label('sn'),
+            result_column.label('result'),
+            model.create_time,
+            model.id,
+            func.count().over(partition_by=sn_column).label('total_tests'),
+            func.sum(case((func.lower(result_column) == 'pass', 1), else_=0)).over(partition_by=sn_column).label('pass_count'),
+            func.sum(case((func.lower(result_column) == 'fail', 1), else_=0)).over(partition_by=sn_column).label('fail_count'),
+            func.min(model.create_time).over(partition_by=sn_column).label('first_test_time'),
+            func.row_number().over(
+                partition_by=sn_column,
+                order_by=(model.create_time.desc(), model.id.desc())
+            ).label('rn'),
+        ).where(*conditions).subquery()
+
+        return select(
+            literal(test_type),
+            ranked.c.sn,
+            ranked.c.total_tests,
+            ranked.c.pass_count,
+            ranked.c.fail_count,
+            ranked.c.first_test_time,
+            ranked.c.create_time,
+            ranked.c.result,
+            ranked.c.id,
+        ).where(ranked.c.rn == 1).order_by(ranked.c.sn)
+
+    @classmethod
+    def refresh(cls, test_type, sns):
+        """
+        修改/删除测试记录后按序列号重新计算汇总（需在提交前调用）。
+        重新计数与写入汇总在同一条 INSERT ... SELECT 语句中完成，不会覆盖并发 record_tests 的累加：
+        InnoDB 对读取的测试记录加共享 next-key 锁，并发插入同一序列号的请求要等本事务结束
+        """
+        source = SUMMARY_SOURCES[test_type]
+        model = source.model
+        sn_column = getattr(model, source.sn_field)
+        sns = sorted({sn for sn in sns if sn is not None})
+        if not sns:
+            return
+        db.session.flush()
+
+        table = cls.__table__
+        dialect = db.session.get_bind().dialect.name
+        # 按序列号顺序写入，与 record_tests 的加锁顺序一致
+        rows = cls._recount_select(test_type, sns)
+        if dialect == 'mysql':
+            stmt = mysql.insert(table).from_select(SUMMARY_COLUMNS, rows)
+            new = stmt.inserted
+        else:
+            stmt = sqlite.insert(table).from_select(SUMMARY_COLUMNS, rows)
+            new = stmt.excluded
+        assignments = {column: getattr(new, column) for column in SUMMARY_COLUMNS[2:]}
+        assignments['update_time'] = func.current_timestamp()
+        if dialect == 'mysql':
+            stmt = stmt.on_duplicate_key_update(assignments)
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=['test_type', 'sn'], set_=assignments)
+        db.session.execute(stmt)
+
+        # 已没有有效测试记录的板子删除汇总行
+        active = select(model.id).where(sn_column == table.c.sn, model.is_deleted.is_(False)).exists()
+        db.session.execute(
+            table.delete().where(table.c.test_type == test_type, table.c.sn.in_(sns), ~active)
+        )
+        # 会话中已加载的汇总对象以数据库为准
+        for sn in sns:
+            summary = db.session.identity_map.get(db.session.identity_key(cls, (test_type, sn)))
+            if summary is not None:
+                db.session.expire(summary)
+
+    @classmethod
+    def rebuild(cls, test_type):
+        """从测试记录表全量重建某个测试类型的汇总，返回板子数量（用于回填和校正）"""
+        db.session.query(cls).filter_by(test_type=test_type).delete(synchronize_session=False)
+        db.session.execute(cls.__table__.insert().from_select(SUMMARY_COLUMNS, cls._recount_select(test_type)))
+        db.session.commit()
+        return db.session.query(func.count()).select_from(cls).filter_by(test_type=test_type).scalar()
+
+    @classmethod
+    def board_stats(cls, test_type, unit='boards'):
+        """
+        boards-stats 所需的测试维度与板子维度统计（一行），
+        列名与原窗口函数查询一致，unit 为板子维度列名后缀（boards/products）
+        """
+        pass_latest = func.lower(cls.latest_result) == 'pass'
+        fail_latest = func.lower(cls.latest_result) == 'fail'
+        return db.session.query(
+            func.sum(cls.total_tests).label('total_tests'),
+            func.sum(cls.pass_count).label('success_tests'),
+            func.sum(cls.fail_count).label('fail_tests'),
+            func.count().label(f'total_{unit}'),
+            func.sum(case((pass_latest, 1), else_=0)).label(f'success_{unit}'),
+            func.sum(case((fail_latest, 1), else_=0)).label(f'fail_{unit}'),
+            func.sum(case(((pass_latest) & (cls.fail_count == 0), 1), else_=0)).label(f'always_success_{unit}'),
+            func.sum(case(((pass_latest) & (cls.fail_count > 0), 1), else_=0)).label(f'final_success_{unit}'),
+            func.sum(case(((fail_latest) & (cls.pass_count == 0), 1), else_=0)).label(f'always_fail_{unit}'),
+            func.sum(case(((fail_latest) & (cls.pass_count > 0), 1), else_=0)).label(f'final_fail_{unit}'),
+        ).filter(cls.test_type == test_type).one()
+
+    @classmethod
+    def sn_stats(cls, test_type, sn_like=None, latest_result=None,
+                 sort_by='total_tests', sort_order='desc', page=1, per_page=10, include_total=True,
+                 sn_match='prefix'):
+        """
+        sn-stats 所需的每板一行统计，返回 (行字典列表, 板子总数或None, 是否有下一页)。
+        当前页与总数由同一条带 COUNT(*) OVER () 的语句取得；行字典的序列号键名与原接口一致，时间为北京时间。
+        """
+        source = SUMMARY_SOURCES[test_type]
+        pass_rate = func.round(cls.pass_count * 100.0 / cls.total_tests, 2).label('pass_rate')
+
+        columns = [
+            cls.sn, cls.total_tests, cls.pass_count, cls.fail_count, pass_rate,
+            cls.first_test_time, cls.latest_test_time, cls.latest_result,
+        ]
+        if include_total:
+            columns.append(func.count().over().label('total_count'))
+
+        stmt = select(*columns).where(
+            cls.test_type == test_type,
+            cls.sn != '',
+        )
+        params = sn_params(sn_like, sn_match) if sn_like else {}
+        if sn_like:
+            stmt = stmt.where(sn_condition(cls.sn, sn_match, params))
+        if latest_result:
+            stmt = stmt.where(func.lower(cls.latest_result) == latest_result.lower())
+
+        if sort_by == source.sn_field:
+            sort_by = 'sn'
+        column = pass_rate if sort_by == 'pass_rate' else getattr(cls, SN_SORT_COLUMNS.get(sort_by, 'total_tests'))
+        if sort_order == 'asc':
+            stmt = stmt.order_by(column.asc(), cls.sn.asc())
+        else:
+            stmt = stmt.order_by(column.desc(), cls.sn.desc())
+        stmt = stmt.limit(bindparam('limit')).offset(bindparam('offset'))
+
+        page_rows, total, has_next = fetch_page(stmt, params, page, per_page, include_total)
+
+        rows = []
+        for row in page_rows:
+            rows.append({
+                source.sn_field: row['sn'],
+                'total_tests': row['total_tests'],
+                'pass_count': row['pass_count'],
+                'fail_count': row['fail_count'],
+                'pass_rate': row['pass_rate'],
+                'first_test_time': row['first_test_time'] + timedelta(hours=8) if row['first_test_time'] else None,
+                'latest_test_time': row['latest_test_time'] + timedelta(hours=8) if row['latest_test_time'] else None,
+                'latest_result': row['latest_result'],
+            })
+        return rows, total, has_next
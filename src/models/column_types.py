@@ -0,0 +1,281 @@
+import json
+import math
+import struct
+import zlib
+from itertools import accumulate
+
+from flask import current_app, has_app_context
+from sqlalchemy import LargeBinary, select, bindparam, type_coerce
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+
+from src.extensions import db
+
+try:
+    import zstandard  # 可选依赖：pip install zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import numpy as np  # 可选依赖：pip install numpy
+except ImportError:
+    np = None
+
+# 压缩数据首字节标记所用的编码
+CODEC_RAW = 0x00
+CODEC_ZLIB = 0x01
+CODEC_ZSTD = 0x02
+CODEC_MARKERS = {'raw': CODEC_RAW, 'zlib': CODEC_ZLIB, 'zstd': CODEC_ZSTD}
+
+# 短于该长度（字节）的内容压缩收益不大，直接存原文
+COMPRESS_MIN_SIZE = 256
+
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def compress_text(value, codec='zlib', level=None):
+    """文本编码为 标记字节 + 数据；codec 为 zstd 但未安装 zstandard 时退回 zlib"""
+    data = value.encode('utf-8')
+    if codec == 'raw' or len(data) < COMPRESS_MIN_SIZE:
+        return bytes([CODEC_RAW]) + data
+    if codec == 'zstd' and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=level or 3)
+        return bytes([CODEC_ZSTD]) + compressor.compress(data)
+    return bytes([CODEC_ZLIB]) + zlib.compress(data, level or 6)
+
+
+def decompress_text(value):
+    """
+    还原 compress_text 的结果。
+    首字节不是编码标记的内容是迁移前写入的未压缩文本（正常文本不会以 0x00-0x02 开头），按原文返回。
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    if not value:
+        return ''
+    marker = value[0]
+    if marker == CODEC_RAW:
+        return value[1:].decode('utf-8')
+    if marker == CODEC_ZLIB:
+        return zlib.decompress(value[1:]).decode('utf-8')
+    if marker == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstandard is required to read zstd-compressed data')
+        return zstandard.ZstdDecompressor().decompress(value[1:]).decode('utf-8')
+    return value.decode('utf-8')
+
+
+def stored_codec(value):
+    """已存储内容的编码名，未压缩的旧数据返回 None"""
+    if not value:
+        return None
+    for name, marker in CODEC_MARKERS.items():
+        if value[0] == marker:
+            return name
+    return None
+
+
+class CompressedText(TypeDecorator):
+    """
+    透明压缩的文本列：Python 侧读写 str，数据库中存 标记字节 + 压缩数据（MySQL 为 LONGBLOB）。
+    编码由 RAW_DATA_CODEC 配置（zlib/zstd/raw），读取时按标记字节解码，不同编码的行可以共存。
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(mysql.LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(
+            value,
+            _setting('RAW_DATA_CODEC', 'zlib'),
+            _setting('RAW_DATA_COMPRESS_LEVEL', None),
+        )
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+# 数值数组的存储格式（首字节）
+ARRAY_JSON = 0x00     # JSON 文本（含非数值元素时使用）
+ARRAY_FLOAT64 = 0x01  # 小端 float64
+ARRAY_DELTA16 = 0x02  # 百分位定点：int32 首值 + int16 差分，适用于两位小数以内的温度
+ARRAY_MARKERS = (ARRAY_JSON, ARRAY_FLOAT64, ARRAY_DELTA16)
+
+
+def _centi_values(values):
+    """全部值都能无损表示为 0.01 的整数倍、且相邻差值在 int16 范围内时返回定点整数列表"""
+    centis = []
+    previous = None
+    for value in values:
+        # NaN / ±Infinity 以及放大 100 倍后溢出或超出 int32 的值无法定点表示，整个数组改用 float64
+        scaled = value * 100
+        if not math.isfinite(scaled) or not -2 ** 31 <= scaled < 2 ** 31:
+            return None
+        centi = round(scaled)
+        if centi / 100 != value:
+            return None
+        if previous is not None and not -32768 <= centi - previous <= 32767:
+            return None
+        centis.append(centi)
+        previous = centi
+    return centis
+
+
+def pack_floats(values):
+    """
+    数值数组编码为 标记字节 + 二进制数据。
+    两位小数以内的数据用 int16 差分存储（每点 2 字节，解码后与原值完全相同），否则用 float64。
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        values = values.tolist()
+    values = list(values)
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return bytes([ARRAY_JSON]) + json.dumps(values, separators=(',', ':')).encode('utf-8')
+
+    centis = _centi_values(values) if values else None
+    if centis is not None:
+        deltas = [b - a for a, b in zip(centis, centis[1:])]
+        return bytes([ARRAY_DELTA16]) + struct.pack(f'<i{len(deltas)}h', centis[0], *deltas)
+    return bytes([ARRAY_FLOAT64]) + struct.pack(f'<{len(values)}d', *values)
+
+
+def unpack_floats(value, as_numpy=False):
+    """
+    还原 pack_floats 的结果，返回 list（as_numpy 且已安装 numpy 时返回 ndarray）。
+    没有格式标记的内容是迁移前的 JSON 文本，按 JSON 解析。
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    value = bytes(value)
+    if not value:
+        return None
+    marker = value[0]
+
+    if marker == ARRAY_FLOAT64:
+        if np is not None:
+            array = np.frombuffer(value, dtype='<f8', offset=1)
+            return array if as_numpy else array.tolist()
+        result = list(struct.unpack(f'<{(len(value) - 1) // 8}d', value[1:]))
+    elif marker == ARRAY_DELTA16:
+        if np is not None:
+            first = np.frombuffer(value, dtype='<i4', count=1, offset=1)
+            deltas = np.frombuffer(value[5:], dtype='<i2').astype(np.int64)
+            array = np.concatenate((first.astype(np.int64), first + np.cumsum(deltas))) / 100
+            return array if as_numpy else array.tolist()
+        count = (len(value) - 5) // 2
+        first, *deltas = struct.unpack(f'<i{count}h', value[1:])
+        result = [centi / 100 for centi in accumulate(deltas, initial=first)]
+    else:
+        result = json.loads(value[1:] if marker == ARRAY_JSON else value)
+
+    if as_numpy and np is not None and result is not None:
+        return np.asarray(result, dtype=float)
+    return result
+
+
+class PackedFloatArray(TypeDecorator):
+    """
+    数值数组列：Python 侧读写 list（也接受 ndarray），数据库中存 pack_floats 的二进制格式（MySQL 为 LONGBLOB）。
+    接口输出仍是 JSON 数组；读取时一次 frombuffer 解码，不再逐个解析文本。
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(mysql.LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return pack_floats(value)
+
+    def process_result_value(self, value, dialect):
+        return unpack_floats(value)
+
+
+def rewrite_column(model, column_name, convert, batch_size=500):
+    """
+    按主键分批改写已有行的原始存储值，每批提交一次，可中断后重复执行。
+    convert(原始字节) 返回新的字节，返回 None 表示该行不需要改写。返回改写的行数。
+    """
+    table = model.__table__
+    # 用原始二进制列读写，绕过列类型的自动编解码
+    raw_column = type_coerce(table.c[column_name], LargeBinary)
+    updated = 0
+    last_id = ''
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, raw_column)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        changes = []
+        for row_id, value in rows:
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.encode('utf-8')
+            value = bytes(value)
+            encoded = convert(value)
+            if encoded is not None and encoded != value:
+                changes.append({'row_id': row_id, 'value': encoded})
+
+        if changes:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == bindparam('row_id'))
+                .values({column_name: bindparam('value', type_=LargeBinary)}),
+                changes,
+            )
+            updated += len(changes)
+        db.session.commit()
+    return updated
+
+
+def recompress_column(model, column_name, codec='zlib', batch_size=500, force=False):
+    """
+    把 CompressedText 列的已有行改写为 codec 编码。
+    默认只处理未压缩的旧数据；force 时把其他编码的行也转为 codec。返回改写的行数。
+    """
+    def convert(value):
+        current = stored_codec(value)
+        if current == codec or (current is not None and not force):
+            return None
+        return compress_text(decompress_text(value), codec)
+
+    return rewrite_column(model, column_name, convert, batch_size)
+
+
+def repack_array_column(model, column_name, batch_size=500):
+    """把 PackedFloatArray 列中迁移前的 JSON 文本改写为二进制格式，返回改写的行数"""
+    def convert(value):
+        if value[0] in ARRAY_MARKERS:
+            return None
+        values = json.loads(value)
+        return pack_floats(values) if isinstance(values, list) else None
+
+    return rewrite_column(model, column_name, convert, batch_size)
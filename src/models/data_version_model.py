@@ -0,0 +1,54 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, update
+from sqlalchemy.exc import IntegrityError
+
+from src.extensions import db
+
+
+class DataVersion(db.Model):
+    """
+    数据版本计数器：按名称记录某类数据的变更次数。
+    写操作递增版本号（bump 在当前事务内，bump_committed 在独立的短事务中），
+    各 gunicorn worker 通过比较版本号判断本地缓存是否过期。
+    """
+    __tablename__ = 'data_versions'
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    update_time = Column(DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    @classmethod
+    def current(cls, name: str) -> int:
+        """读取当前版本号（不存在时视为0）"""
+        version = db.session.query(cls.version).filter_by(name=name).scalar()
+        return int(version or 0)
+
+    @classmethod
+    def bump(cls, name: str):
+        """在当前事务中递增版本号，随业务数据一起提交"""
+        updated = db.session.query(cls).filter_by(name=name).update(
+            {cls.version: cls.version + 1},
+            synchronize_session=False
+        )
+        if not updated:
+            db.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def bump_committed(cls, names):
+        """
+        在独立的短事务中递增版本号（业务事务提交之后调用），
+        版本号行的行锁只持有一条 UPDATE 的时间，不随业务事务一直持有
+        """
+        table = cls.__table__
+        for name in sorted(names):
+            with db.engine.begin() as conn:
+                updated = conn.execute(
+                    update(table).where(table.c.name == name).values(version=table.c.version + 1)
+                ).rowcount
+                if updated:
+                    continue
+                try:
+                    with conn.begin_nested():
+                        conn.execute(table.insert().values(name=name, version=1))
+                except IntegrityError:
+                    # 并发的首次写入已插入该行
+                    conn.execute(update(table).where(table.c.name == name).values(version=table.c.version + 1))
@@ -4,15 +4,14 @@ from sqlalchemy import UUID , Boolean
 from datetime import datetime, timezone, timedelta
 
 from src.extensions import db 
+from src.utils.serializer import BEIJING_TZ, serialize_model
 
 # 辅助函数：将UTC时间转换为北京时间 (UTC+8)
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    # 创建一个代表北京时间的时区对象
-    beijing_tz = timezone(timedelta(hours=8))
     # 将无时区的UTC时间强制指定为UTC时区，然后转换为北京时间
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 # 1. 创建一个自定义的Query类，它会自动过滤
 class ActiveQuery(db.Query):
@@ -21,6 +20,12 @@ class ActiveQuery(db.Query):
 
 class DriverBoardTest(db.Model):
     __tablename__ = 'driver_board_tests'
+    # 列表接口游标分页按 (update_time, id) 定位
+    __table_args__ = (
+        db.Index('ix_driver_board_tests_update_time_id', 'update_time', 'id'),
+        # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+        db.Index('ft_driver_board_tests_driver_board_sn', 'driver_board_sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     # 启用软删除的默认查询
     query_class = ActiveQuery
@@ -56,45 +61,14 @@ class DriverBoardTest(db.Model):
     hostname = db.Column(db.String(255), nullable=True)
     app_version = db.Column(db.String(128), nullable=True, default='1.0.0')
 
+    # 客户端提供的幂等键：重试同一请求时返回已写入的记录而不是重复插入
+    client_record_id = db.Column(db.String(64), nullable=True, unique=True, index=True)
+
     create_time = db.Column(db.DateTime, default=db.func.current_timestamp())
     is_deleted = db.Column(Boolean, nullable=False, default=False, index=True)  
     delete_time = db.Column(db.DateTime, nullable=True)
     update_time = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def to_dict(self):
-        return {
-            'id': str(self.id) if self.id else None,
-            'driver_board_sn': self.driver_board_sn,  
-            'driver_test_result': self.driver_test_result,
-            
-            'set_speed': self.set_speed,
-            
-            'motor_status': self.motor_status,
-            'motor_status_result': self.motor_status_result,
-            'motor_speed': self.motor_speed,
-            'motor_speed_result': self.motor_speed_result,
-            'ipm_temperature': self.ipm_temperature,
-            'ipm_temperature_result': self.ipm_temperature_result,
-            'dc_voltage': self.dc_voltage,
-            'dc_voltage_result': self.dc_voltage_result,
-            'output_power': self.output_power,
-            'output_power_result': self.output_power_result,
-            'driver_software_version': self.driver_software_version,
-            'driver_software_version_result': self.driver_software_version_result,
-
-            'test_runtime': self.test_runtime,
-            'start_time': to_beijing_time(self.start_time).isoformat() if self.start_time else None,
-            'end_time': to_beijing_time(self.end_time).isoformat() if self.end_time else None,
-            'test_description': self.test_description,
-            'general_test_remark': self.general_test_remark,
-
-            'local_ip': self.local_ip,
-            'public_ip': self.public_ip,
-            'hostname': self.hostname,
-            'app_version': self.app_version,
-
-            'is_deleted': self.is_deleted,
-            'delete_time': to_beijing_time(self.delete_time).isoformat() if self.delete_time else None,
-            'create_time': to_beijing_time(self.create_time).isoformat() if self.create_time else None,
-            'update_time': to_beijing_time(self.update_time).isoformat() if self.update_time else None,
-        }
\ No newline at end of file
+        """全部列转为字典，时间字段为北京时间 ISO 字符串（按模型预先解析的列映射输出）"""
+        return serialize_model(self)
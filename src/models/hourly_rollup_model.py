@@ -0,0 +1,260 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from sqlalchemy import Column, String, Integer, DateTime, func, case, select, literal
+from sqlalchemy.dialects import mysql, sqlite
+
+from src.extensions import db
+from src.models.board_summary_model import SUMMARY_SOURCES
+from src.models.data_version_model import DataVersion
+from src.utils.commit_hooks import after_commit
+
+logger = logging.getLogger(__name__)
+
+# 汇总时区：北京时间 (UTC+8)，按日/周/月分组时使用
+BEIJING_OFFSET = timedelta(hours=8)
+
+
+def result_category(result):
+    """测试结果归类为 pass / fail / other（不区分大小写，与 MySQL 默认排序规则一致）"""
+    value = (result or '').lower()
+    return value if value in ('pass', 'fail') else 'other'
+
+
+def hour_bucket(dt):
+    """UTC 时间截断到整点"""
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+class TestHourlyRollup(db.Model):
+    """
+    按 (测试类型, UTC整点, 结果分类) 预聚合的测试次数。
+    新增测试记录时 +1，软删除或修改结果时 -1，time-stats 的日/周/月趋势
+    由小时桶在 Python 中按北京时间汇总得到，不再逐行扫描测试记录表。
+    """
+    __tablename__ = 'test_hourly_rollups'
+
+    test_type = Column(String(16), primary_key=True)
+    bucket = Column(DateTime, primary_key=True, comment='UTC整点时间')
+    result = Column(String(8), primary_key=True, comment='pass/fail/other')
+    test_count = Column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def _increment_statement(cls, dialect_name):
+        table = cls.__table__
+        if dialect_name == 'mysql':
+            stmt = mysql.insert(table)
+            return stmt.on_duplicate_key_update(test_count=table.c.test_count + stmt.inserted.test_count)
+        stmt = sqlite.insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=['test_type', 'bucket', 'result'],
+            set_={'test_count': table.c.test_count + stmt.excluded.test_count}
+        )
+
+    @classmethod
+    def apply_deltas(cls, conn, deltas):
+        """把 {(test_type, bucket, result): 增量} 写入小时计数（在调用方的连接/事务中执行）"""
+        # 按主键顺序写入：并发写回总以相同顺序加行锁，避免 InnoDB 死锁
+        params = [
+            {'test_type': test_type, 'bucket': bucket, 'result': result, 'test_count': delta}
+            for (test_type, bucket, result), delta in sorted(deltas.items()) if delta
+        ]
+        if params:
+            conn.execute(cls._increment_statement(conn.dialect.name), params)
+
+    @classmethod
+    def _apply(cls, test_type, deltas):
+        # 当前整点的计数行是所有写入请求的热点行，不在业务事务中更新：
+        # 增量先挂在 session 上，提交成功后交给写回器合并，回滚时丢弃
+        pending = after_commit('hourly_rollup', hourly_rollup_writer.add, dict)
+        for (bucket, result), delta in deltas.items():
+            key = (test_type, bucket, result)
+            pending[key] = pending.get(key, 0) + delta
+
+    @classmethod
+    def record_tests(cls, test_type, tests, delta=1):
+        """新增（delta=1）或软删除（delta=-1）测试记录后调整小时计数（需在提交前调用，提交后异步写回）"""
+        result_field = SUMMARY_SOURCES[test_type].result_field
+        deltas = {}
+        for test in tests:
+            key = (hour_bucket(test.create_time), result_category(getattr(test, result_field)))
+            deltas[key] = deltas.get(key, 0) + delta
+        cls._apply(test_type, deltas)
+
+    @classmethod
+    def record_result_change(cls, test_type, create_time, old_result, new_result):
+        """修改测试结果后把计数从旧分类移到新分类"""
+        old_category, new_category = result_category(old_result), result_category(new_result)
+        if old_category == new_category:
+            return
+        bucket = hour_bucket(create_time)
+        cls._apply(test_type, {(bucket, old_category): -1, (bucket, new_category): 1})
+
+    @classmethod
+    def _bucket_expression(cls, column):
+        if db.session.get_bind().dialect.name == 'mysql':
+            return func.date_format(column, '%Y-%m-%d %H:00:00')
+        # 与 SQLAlchemy 在 SQLite 中保存 DateTime 的文本格式一致，保证主键可比较
+        return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+
+    @classmethod
+    def rebuild(cls, test_type):
+        """
+        从测试记录表全量重建某个测试类型的小时计数，返回桶行数。
+        用于回填，以及校正写回失败或进程退出前未写回的增量造成的偏差
+        """
+        # 先写回本进程已累积的增量，避免重建后再被重复累加
+        hourly_rollup_writer.flush()
+        source = SUMMARY_SOURCES[test_type]
+        model = source.model
+        lowered = func.lower(getattr(model, source.result_field))
+        category = case((lowered == 'pass', 'pass'), (lowered == 'fail', 'fail'), else_='other')
+        bucket = cls._bucket_expression(model.create_time)
+
+        rows = select(
+            literal(test_type), bucket, category, func.count()
+        ).where(
+            model.is_deleted.is_(False),
+            model.create_time.isnot(None),
+        ).group_by(bucket, category)
+
+        db.session.query(cls).filter_by(test_type=test_type).delete(synchronize_session=False)
+        db.session.execute(cls.__table__.insert().from_select(
+            ['test_type', 'bucket', 'result', 'test_count'], rows
+        ))
+        db.session.commit()
+        return db.session.query(func.count()).select_from(cls).filter_by(test_type=test_type).scalar()
+
+    @classmethod
+    def time_stats(cls, test_type, start_dt, end_dt, interval):
+        """
+        time-stats 趋势数据：start_dt/end_dt 为 UTC 时间，interval 为 day/week/month，
+        返回按北京时间分组的 [{time_period, total_tests, success_count, fail_count}]
+        """
+        rows = db.session.query(cls.bucket, cls.result, cls.test_count).filter(
+            cls.test_type == test_type,
+            cls.bucket >= hour_bucket(start_dt),
+            cls.bucket <= end_dt,
+        ).order_by(cls.bucket).all()
+
+        periods = OrderedDict()
+        for bucket, result, count in rows:
+            local = bucket + BEIJING_OFFSET
+            if interval == 'week':
+                period = (local - timedelta(days=local.weekday())).strftime('%Y-%m-%d')
+            elif interval == 'month':
+                period = local.strftime('%Y-%m-01')
+            else:
+                period = local.strftime('%Y-%m-%d')
+
+            stats = periods.setdefault(period, {
+                'time_period': period, 'total_tests': 0, 'success_count': 0, 'fail_count': 0
+            })
+            stats['total_tests'] += count
+            if result == 'pass':
+                stats['success_count'] += count
+            elif result == 'fail':
+                stats['fail_count'] += count
+
+        return [stats for stats in periods.values() if stats['total_tests'] > 0]
+
+
+class HourlyRollupWriter:
+    """
+    小时计数的写后合并器。
+    业务事务提交后把增量累加到内存，后台线程按间隔（以及进程退出时）按主键顺序
+    合并写回，同一小时桶的多次写入只产生一条 upsert，写入请求之间不再争用当前整点的计数行。
+    写回失败的增量放回内存重试；进程被强制终止时丢失的增量由 flask hourly-rollup rebuild 校正。
+    """
+
+    def __init__(self, flush_interval: float = 2):
+        self.flush_interval = flush_interval
+        self._app = None
+        self._pending = {}  # (test_type, bucket, result) -> 累计增量
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def init_app(self, app):
+        self._app = app
+        self.flush_interval = app.config.get('HOURLY_ROLLUP_FLUSH_INTERVAL', 2)
+        atexit.register(self._flush_at_exit)
+
+    def add(self, deltas):
+        """合并一个已提交事务的增量（由提交后回调调用）"""
+        with self._lock:
+            for key, delta in deltas.items():
+                self._pending[key] = self._pending.get(key, 0) + delta
+        if self._app is None:
+            # 未启用后台写回（如脚本、测试中直接使用模型）时立即写回
+            self.flush()
+            return
+        self._ensure_flusher()
+
+    def flush(self) -> int:
+        """把累积的增量写回数据库，返回写入的桶数量（需在应用上下文中调用）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        pending = {key: delta for key, delta in pending.items() if delta}
+        if not pending:
+            return 0
+
+        try:
+            # 使用独立连接和事务，不影响请求中的 session
+            with db.engine.begin() as conn:
+                TestHourlyRollup.apply_deltas(conn, pending)
+        except Exception as e:
+            logger.error(f"Failed to flush hourly rollups: {str(e)}")
+            self._merge_back(pending)
+            return 0
+
+        # 趋势数据变化后使 time-stats 缓存失效
+        test_types = {test_type for test_type, _, _ in pending}
+        try:
+            DataVersion.bump_committed(
+                SUMMARY_SOURCES[test_type].model.__tablename__ for test_type in test_types
+            )
+        except Exception as e:
+            logger.error(f"Failed to bump data versions after hourly rollup flush: {str(e)}")
+        return len(pending)
+
+    def _merge_back(self, pending):
+        """写回失败时把增量放回内存，等待下次重试"""
+        with self._lock:
+            for key, delta in pending.items():
+                self._pending[key] = self._pending.get(key, 0) + delta
+
+    def _ensure_flusher(self):
+        """每个进程（包括 fork 出的 gunicorn worker）首次使用时启动后台写回线程"""
+        if self._app is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._run_flusher, name='hourly-rollup-flusher', daemon=True)
+        thread.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._app.app_context():
+                self.flush()
+
+    def _flush_at_exit(self):
+        if self._app is None or not self._pending:
+            return
+        with self._app.app_context():
+            self.flush()
+
+
+hourly_rollup_writer = HourlyRollupWriter()
+
+
+def init_hourly_rollup(app):
+    """初始化小时计数的写后合并"""
+    hourly_rollup_writer.init_app(app)
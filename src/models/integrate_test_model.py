@@ -4,13 +4,13 @@ from sqlalchemy import Boolean, Float, Integer, String, DateTime, Column
 from datetime import datetime, timezone, timedelta
 
 from src.extensions import db 
+from src.utils.serializer import BEIJING_TZ, serialize_model
 
 # 辅助函数：将UTC时间转换为北京时间 (UTC+8)
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    beijing_tz = timezone(timedelta(hours=8))
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 # 1. 创建一个自定义的Query类，它会自动过滤
 class ActiveQuery(db.Query):
@@ -19,6 +19,12 @@ class ActiveQuery(db.Query):
 
 class IntegrateTest(db.Model):
     __tablename__ = 'integrate_tests'
+    # 列表接口游标分页按 (update_time, id) 定位
+    __table_args__ = (
+        db.Index('ix_integrate_tests_update_time_id', 'update_time', 'id'),
+        # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+        db.Index('ft_integrate_tests_product_sn', 'product_sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     # 启用软删除的默认查询
     query_class = ActiveQuery
@@ -76,6 +82,9 @@ class IntegrateTest(db.Model):
 
 
     ipm_temperature_data_id = Column(String(64), nullable=True)
+    # 客户端提供的幂等键：重试同一请求时返回已写入的记录而不是重复插入
+    client_record_id = Column(String(64), nullable=True, unique=True, index=True)
+
     # --- 审计和软删除字段 ---
     is_deleted = Column(Boolean, nullable=False, default=False, index=True)
     delete_time = Column(DateTime, nullable=True, comment='删除时间，若未删除则为None')
@@ -83,50 +92,5 @@ class IntegrateTest(db.Model):
     update_time = Column(DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def to_dict(self):
-        return {
-            'id': str(self.id) if self.id else None,
-            'product_sn': self.product_sn, 
-            'integrate_test_result': self.integrate_test_result,             
-
-            'driver_status': self.driver_status,
-            'driver_status_result': self.driver_status_result,
-            'motor_speed': self.motor_speed,
-            'motor_speed_result': self.motor_speed_result,
-            'ipm_temperature': self.ipm_temperature,
-            'ipm_temperature_result': self.ipm_temperature_result,
-            'dc_voltage': self.dc_voltage,
-            'dc_voltage_result': self.dc_voltage_result,
-            'output_power': self.output_power,
-            'output_power_result': self.output_power_result,
-            'driver_software_version': self.driver_software_version,
-            'driver_software_version_result': self.driver_software_version_result,
-            'ac_voltage': self.ac_voltage,
-            'ac_voltage_result': self.ac_voltage_result,
-            'current': self.current,
-            'current_result': self.current_result,
-            'power': self.power,
-            'power_result': self.power_result,
-            'power_factor': self.power_factor,
-            'power_factor_result': self.power_factor_result,
-            'leakage_current': self.leakage_current,
-            'leakage_current_result': self.leakage_current_result,
-
-            'start_time': to_beijing_time(self.start_time).isoformat() if self.start_time else None,
-            'end_time': to_beijing_time(self.end_time).isoformat() if self.end_time else None,
-            'test_runtime': self.test_runtime,  
-            'test_description': self.test_description,
-            'remark': self.remark,
-
-            'local_ip': self.local_ip,
-            'public_ip': self.public_ip,
-            'hostname': self.hostname,
-            'app_version': self.app_version,
-
-            'ipm_temperature_data_id': self.ipm_temperature_data_id,
-
-            'is_deleted': self.is_deleted,
-            'delete_time': to_beijing_time(self.delete_time).isoformat() if self.delete_time else None,
-            'create_time': to_beijing_time(self.create_time).isoformat() if self.create_time else None,
-            'update_time': to_beijing_time(self.update_time).isoformat() if self.update_time else None,
-
-        }
\ No newline at end of file
+        """全部列转为字典，时间字段为北京时间 ISO 字符串（按模型预先解析的列映射输出）"""
+        return serialize_model(self)
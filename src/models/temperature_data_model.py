@@ -1,16 +1,17 @@
 import uuid
 import ulid
-from sqlalchemy import Boolean, Float, Integer, String, DateTime, Column, Text, JSON
+from sqlalchemy import Boolean, Float, Integer, String, DateTime, Column, Text
 from datetime import datetime, timezone, timedelta
 
 from src.extensions import db 
+from src.utils.serializer import BEIJING_TZ, serialize_model
+from src.models.column_types import PackedFloatArray
 
 # 辅助函数：将UTC时间转换为北京时间 (UTC+8)
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    beijing_tz = timezone(timedelta(hours=8))
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 # 1. 创建一个自定义的Query类，它会自动过滤
 class ActiveQuery(db.Query):
@@ -19,10 +20,19 @@ class ActiveQuery(db.Query):
 
 class TemperatureData(db.Model):
     __tablename__ = 'temperature_datas'
+    # 列表接口游标分页按 (update_time, id) 定位
+    __table_args__ = (
+        db.Index('ix_temperature_datas_update_time_id', 'update_time', 'id'),
+        # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+        db.Index('ft_temperature_datas_product_sn', 'product_sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     # 启用软删除的默认查询
     query_class = ActiveQuery
 
+    # 大字段：列表接口默认不查询，只在详情接口返回
+    HEAVY_COLUMNS = ('original_temperature', 'compensated_temperature')
+
     id = Column(String(26), primary_key=True, default=lambda: str(ulid.new())) 
     product_sn = Column(String(32), nullable=False, index=True)
     
@@ -33,9 +43,18 @@ class TemperatureData(db.Model):
     
     # 温度采样相关
     sample_interval = Column(Integer, nullable=True, comment='采样间隔，单位：秒')
-    original_temperature = Column(JSON, nullable=True, comment='原始温度数据数组')
+    # 温度数组以二进制存储（两位小数以内为 int16 差分，否则 float64），接口仍输出 JSON 数组
+    original_temperature = Column(PackedFloatArray(), nullable=True, comment='原始温度数据数组')
     original_temperature_count = Column(Integer, nullable=True, comment='原始温度数据点数量')
-    compensated_temperature = Column(JSON, nullable=True, comment='补偿后温度数据数组')
+    compensated_temperature = Column(PackedFloatArray(), nullable=True, comment='补偿后温度数据数组')
+    
+    # 温度统计（创建/更新时由温度数组计算，带索引用于筛选和排序）
+    max_temp = Column(Float, nullable=True, index=True, comment='最高温度')
+    min_temp = Column(Float, nullable=True, index=True, comment='最低温度')
+    mean_temp = Column(Float, nullable=True, index=True, comment='平均温度')
+    time_to_stable = Column(Integer, nullable=True, index=True, comment='进入稳定区间所用时间，单位：秒')
+    overshoot = Column(Float, nullable=True, index=True, comment='最高温度超出稳定温度的幅度')
+    compensated_drift = Column(Float, nullable=True, index=True, comment='补偿后温度在稳定段内的漂移')
     
     # 温度补偿相关
     temperature_compensation_enabled = Column(Boolean, nullable=False, default=False, comment='是否启用温度补偿')
@@ -50,6 +69,9 @@ class TemperatureData(db.Model):
     
     remark = Column(String(255), nullable=True)
     
+    # 客户端提供的幂等键：重试同一请求时返回已写入的记录而不是重复插入
+    client_record_id = Column(String(64), nullable=True, unique=True, index=True)
+
     # 审计和软删除字段
     is_deleted = Column(Boolean, nullable=False, default=False, index=True)
     delete_time = Column(DateTime, nullable=True, comment='删除时间，若未删除则为None')
@@ -57,37 +79,5 @@ class TemperatureData(db.Model):
     update_time = Column(DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def to_dict(self):
-        return {
-            'id': str(self.id) if self.id else None,
-            'product_sn': self.product_sn,
-            
-            # 测试时间相关
-            'start_time': to_beijing_time(self.start_time).isoformat() if self.start_time else None,
-            'end_time': to_beijing_time(self.end_time).isoformat() if self.end_time else None,
-            'test_runtime': self.test_runtime,
-            
-            # 温度采样相关
-            'sample_interval': self.sample_interval,
-            'original_temperature': self.original_temperature,
-            'original_temperature_count': self.original_temperature_count,
-            'compensated_temperature': self.compensated_temperature,
-            
-            # 温度补偿相关
-            'temperature_compensation_enabled': self.temperature_compensation_enabled,
-            'temperature_compensation_value': self.temperature_compensation_value,
-            'temperature_compensation_duration': self.temperature_compensation_duration,
-            
-            # 网络信息
-            'local_ip': self.local_ip,
-            'public_ip': self.public_ip,
-            'hostname': self.hostname,
-            'app_version': self.app_version,
-            
-            'remark': self.remark,
-            
-            # 审计和软删除字段
-            'is_deleted': self.is_deleted,
-            'delete_time': to_beijing_time(self.delete_time).isoformat() if self.delete_time else None,
-            'create_time': to_beijing_time(self.create_time).isoformat() if self.create_time else None,
-            'update_time': to_beijing_time(self.update_time).isoformat() if self.update_time else None,
-        }
\ No newline at end of file
+        """全部列转为字典，时间字段为北京时间 ISO 字符串（按模型预先解析的列映射输出）"""
+        return serialize_model(self)
@@ -4,15 +4,14 @@ from sqlalchemy import UUID, Boolean , Text
 from datetime import datetime, timezone, timedelta
 
 from src.extensions import db # Import the db instance
+from src.utils.serializer import BEIJING_TZ, serialize_model
 
 # 辅助函数：将UTC时间转换为北京时间 (UTC+8)
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    # 创建一个代表北京时间的时区对象
-    beijing_tz = timezone(timedelta(hours=8))
     # 将无时区的UTC时间强制指定为UTC时区，然后转换为北京时间
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 # 1. 创建一个自定义的Query类，它会自动过滤
 class ActiveQuery(db.Query):
@@ -21,10 +20,19 @@ class ActiveQuery(db.Query):
 
 class WifiBoardTest(db.Model):
     __tablename__ = 'wifi_board_tests'
+    # 列表接口游标分页按 (update_time, id) 定位
+    __table_args__ = (
+        db.Index('ix_wifi_board_tests_update_time_id', 'update_time', 'id'),
+        # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+        db.Index('ft_wifi_board_tests_wifi_board_sn', 'wifi_board_sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     # 启用软删除的默认查询
     query_class = ActiveQuery
 
+    # 大字段：列表接口默认不查询，只在详情接口返回
+    HEAVY_COLUMNS = ('speed_data', 'time_data', 'light_data')
+
     id = db.Column(db.String(26), primary_key=True, default=lambda: str(ulid.new())) # Use ULID
     wifi_board_sn = db.Column(db.String(32), nullable=False, index=True)
     general_test_result = db.Column(db.String(64), nullable=False) 
@@ -68,6 +76,9 @@ class WifiBoardTest(db.Model):
     hostname = db.Column(db.String(255), nullable=True)
     app_version = db.Column(db.String(128), nullable=True, default='1.0.0')
 
+    # 客户端提供的幂等键：重试同一请求时返回已写入的记录而不是重复插入
+    client_record_id = db.Column(db.String(64), nullable=True, unique=True, index=True)
+
     # 新增审计和软删除字段
     create_time = db.Column(db.DateTime, default=db.func.current_timestamp())
     is_deleted = db.Column(Boolean, nullable=False, default=False, index=True)  
@@ -75,58 +86,5 @@ class WifiBoardTest(db.Model):
     update_time = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def to_dict(self):
-        return {
-            'id': str(self.id) if self.id else None,
-            'wifi_board_sn': self.wifi_board_sn,
-            'general_test_result': self.general_test_result,
-            
-            # 旋钮测试相关
-            'knob_test_result': self.knob_test_result,
-            'speed_knob_result': self.speed_knob_result,
-            'speed_knob_remark': self.speed_knob_remark,
-            'speed_data': self.speed_data,
-            'time_knob_result': self.time_knob_result,
-            'time_knob_remark': self.time_knob_remark,
-            'time_data': self.time_data,
-            'knob_start_time': to_beijing_time(self.knob_start_time).isoformat() if self.knob_start_time else None,
-            'knob_end_time': to_beijing_time(self.knob_end_time).isoformat() if self.knob_end_time else None,
-            
-            # 灯光测试相关
-            'light_test_result': self.light_test_result,
-            'green_light_result': self.green_light_result,
-            'light_data': self.light_data,
-            'red_light_result': self.red_light_result,
-            'blue_light_result': self.blue_light_result,
-            'light_start_time': to_beijing_time(self.light_start_time).isoformat() if self.light_start_time else None,
-            'light_end_time': to_beijing_time(self.light_end_time).isoformat() if self.light_end_time else None,
-            
-            # 网络测试相关
-            'network_test_result': self.network_test_result,
-            'wifi_software_version': self.wifi_software_version,
-            'wifi_software_version_data': self.wifi_software_version_data,
-            'mac_address': self.mac_address,
-            
-            'start_command_result': self.start_command_result,
-            'speed_command_result': self.speed_command_result,
-            'stop_command_result': self.stop_command_result,
-            'network_start_time': to_beijing_time(self.network_start_time).isoformat() if self.network_start_time else None,
-            'network_end_time': to_beijing_time(self.network_end_time).isoformat() if self.network_end_time else None,
-            
-            # 通用信息
-            
-            'start_time': to_beijing_time(self.start_time).isoformat() if self.start_time else None,
-            'end_time': to_beijing_time(self.end_time).isoformat() if self.end_time else None,
-            'general_test_remark': self.general_test_remark,
-            
-            'local_ip': self.local_ip,
-            'public_ip': self.public_ip,
-            'hostname': self.hostname,
-            'app_version': self.app_version,
-
-
-            # 审计和软删除字段
-            'is_deleted': self.is_deleted,
-            'delete_time': to_beijing_time(self.delete_time).isoformat() if self.delete_time else None,
-            'create_time': to_beijing_time(self.create_time).isoformat() if self.create_time else None,
-            'update_time': to_beijing_time(self.update_time).isoformat() if self.update_time else None,
-        }
\ No newline at end of file
+        """全部列转为字典，时间字段为北京时间 ISO 字符串（按模型预先解析的列映射输出）"""
+        return serialize_model(self)
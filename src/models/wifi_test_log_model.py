@@ -1,16 +1,16 @@
 import ulid
-from sqlalchemy import Boolean, Text
+from sqlalchemy import Boolean
 from src.extensions import db
+from src.utils.serializer import BEIJING_TZ, serialize_model
+from src.models.column_types import CompressedText
 from datetime import datetime, timezone, timedelta
 
 # 辅助函数：将UTC时间转换为北京时间 (UTC+8)
 def to_beijing_time(utc_dt):
     if utc_dt is None:
         return None
-    # 创建一个代表北京时间的时区对象
-    beijing_tz = timezone(timedelta(hours=8))
     # 将无时区的UTC时间强制指定为UTC时区，然后转换为北京时间
-    return utc_dt.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+    return utc_dt.replace(tzinfo=timezone.utc).astimezone(BEIJING_TZ)
 
 # 1. 创建一个自定义的Query类，它会自动过滤
 class ActiveQuery(db.Query):
@@ -22,22 +22,36 @@ class WifiTestLog(db.Model):
     用于存储Wi-Fi板测试过程中的原始数据日志。
     """
     __tablename__ = 'wifi_test_logs'
+    # 列表接口游标分页按 (create_time, id) 定位
+    __table_args__ = (
+        db.Index('ix_wifi_test_logs_create_time_id', 'create_time', 'id'),
+        # 序列号子串搜索（sn_match=contains）使用的 n-gram 全文索引，仅在 MySQL 上创建
+        db.Index('ft_wifi_test_logs_wifi_board_sn', 'wifi_board_sn', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+        db.Index('ft_wifi_test_logs_mac_address', 'mac_address', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     # 2. 将自定义的Query类赋给 query_class
     query_class = ActiveQuery
 
+    # 大字段：列表接口默认不查询，只在详情接口返回
+    HEAVY_COLUMNS = ('raw_data',)
+
     # 核心字段
     id = db.Column(db.String(26), primary_key=True, default=lambda: str(ulid.new()))
     wifi_board_sn = db.Column(db.String(32), nullable=False, index=True)
     mac_address = db.Column(db.String(64), nullable=True, index=True)
     
     # 日志数据和来源信息
-    raw_data = db.Column(Text, nullable=False) # 使用Text类型存储大量原始数据
+    # 原始数据压缩存储（标记字节 + zlib/zstd），延迟加载：只在详情接口读取并解压
+    raw_data = db.deferred(db.Column(CompressedText(), nullable=False))
     local_ip = db.Column(db.String(64), nullable=True)
     public_ip = db.Column(db.String(64), nullable=True)
     host_name = db.Column(db.String(255), nullable=True)
     app_version = db.Column(db.String(128), nullable=True, default='1.0.0')
 
+    # 客户端提供的幂等键：重试同一请求时返回已写入的记录而不是重复插入
+    client_record_id = db.Column(db.String(64), nullable=True, unique=True, index=True)
+
     is_deleted = db.Column(Boolean, nullable=False, default=False, index=True)
 
     # 时间戳
@@ -46,21 +60,5 @@ class WifiTestLog(db.Model):
     update_time = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
     def to_dict(self):
-        """将模型对象转换为字典，并处理时区。"""
-        return {
-            'id': self.id,
-            'wifi_board_sn': self.wifi_board_sn,
-            'mac_address': self.mac_address,
-            'raw_data': self.raw_data,
-            
-            'local_ip': self.local_ip,
-            'public_ip': self.public_ip,
-            'host_name': self.host_name,
-            'app_version': self.app_version,
-
-            'is_deleted': self.is_deleted, 
-            # 使用辅助函数进行转换
-            'create_time': to_beijing_time(self.create_time).isoformat() if self.create_time else None,
-            'delete_time': to_beijing_time(self.delete_time).isoformat() if self.delete_time else None,
-            'update_time': to_beijing_time(self.update_time).isoformat() if self.update_time else None,
-        }
\ No newline at end of file
+        """全部列转为字典，时间字段为北京时间 ISO 字符串（按模型预先解析的列映射输出）"""
+        return serialize_model(self)
@@ -9,6 +9,7 @@ from .driver_board_test_routes import driver_board_tests_bp
 from .integrate_test_routes import integrate_tests_bp
 from .wifi_test_log_routes import wifi_test_logs_bp
 from .temperature_data_routes import temperature_data_bp
+from .trace_routes import trace_bp
 
 __all__ = [
     'routes_bp',
@@ -17,4 +18,5 @@ __all__ = [
     'integrate_tests_bp',
     'wifi_test_logs_bp',
     'temperature_data_bp',
+    'trace_bp',
 ]
\ No newline at end of file
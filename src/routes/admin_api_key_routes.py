@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify, g
 from src.extensions import db
 from src.models.admin_api_keys import ApiKey
 from src.auth.decorators import require_role, require_auth
+from src.auth.api_key_cache import api_key_cache, API_KEY_GENERATION
+from src.models.data_version_model import DataVersion
 import logging
 
 from datetime import datetime, timedelta, timezone
@@ -45,6 +47,13 @@ def list_api_keys():
 
 
 
+@api_key_bp.route('/cache-stats', methods=['GET'])
+@require_role(['admin', 'manager'])
+def get_api_key_cache_stats():
+    """获取API密钥验证缓存的命中统计（当前 worker）"""
+    return jsonify({'cache_stats': api_key_cache.stats()})
+
+
 @api_key_bp.route('', methods=['POST'])
 @require_role(['admin'])
 def create_api_key():
@@ -120,7 +129,10 @@ def update_api_key(key_id):
         if 'is_active' in data:
             api_key.is_active = bool(data['is_active'])
         
+        # 递增密钥代数，使所有 worker 的已验证缓存失效
+        DataVersion.bump(API_KEY_GENERATION)
         db.session.commit()
+        api_key_cache.invalidate()
         
         logger.info(f"API key updated: {api_key.key_name} by {g.current_user.username}")
         return jsonify({
@@ -176,7 +188,7 @@ def get_api_key_detail(key_id):
             detail_info['status'] = 'active'
         
         # 使用频率描述
-        usage_count = int(api_key.usage_count)
+        usage_count = api_key.usage_count or 0
         if usage_count == 0:
             detail_info['usage_frequency'] = 'never_used'
         elif api_key.last_used:
@@ -233,7 +245,9 @@ def revoke_api_key(key_id):
             return jsonify({'error': 'API key not found'}), 404
         
         api_key.is_active = False
+        DataVersion.bump(API_KEY_GENERATION)
         db.session.commit()
+        api_key_cache.invalidate()
         
         logger.info(f"API key revoked: {api_key.key_name} by {g.current_user.username}")
         return jsonify({'message': 'API key revoked successfully'})
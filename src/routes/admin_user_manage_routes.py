@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, g
 from src.extensions import db
 from src.models.admin_user_model import User
 from src.auth.decorators import require_role, require_permission, require_auth
+from src.auth.token_claims import token_state_cache
 import uuid
 import logging
 from datetime import datetime, timezone
@@ -138,7 +139,11 @@ def update_user(user_id):
         # 如果你的模型有 updated_by 字段，可以设置
         # target_user.updated_by = current_user.id
         
+        # 令牌中的角色/权限声明已过时，递增版本号使其失效
+        target_user.bump_token_version()
+        
         db.session.commit()
+        token_state_cache.invalidate(target_user.id)
         
         # 记录详细的操作日志
         changes_summary = '; '.join([f"{c['field']}: {c['old_value']} -> {c['new_value']}" for c in changes_made])
@@ -1,10 +1,22 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime, timezone, timedelta
 import logging
-from sqlalchemy import func, case, text  # 确保导入了 text
 
 from src.extensions import db
 from src.models.driver_board_test_model import DriverBoardTest
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.models.board_summary_model import BoardSummary
+from src.utils.pagination import paginate_query, CursorError, parse_include_total
+from src.utils.stats_cache import cached_stats, bump_data_version
+from src.utils.stats_engine import get_stats_engine
+from src.utils.sn_search import filter_sn, parse_sn_match, SnMatchError
+from src.utils.projection import list_fields, apply_projection, serialize_page, FieldsError
+from src.utils.lookup import batch_lookup, BatchLookupError
+from src.utils.idempotency import (
+    request_client_id, find_by_client_id, flush_new_record, IdempotencyKeyError, REPLAYED_HEADERS,
+)
+from src.utils.ingest_queue import ingest_queue
+from src.utils.export import stream_export, parse_export_format, parse_export_gzip, ExportError
 
 from src.auth.decorators import require_auth, require_role
 
@@ -16,6 +28,9 @@ driver_board_tests_bp = Blueprint('driver_board_tests_bp', __name__, url_prefix=
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 统计接口共用的查询引擎
+stats_engine = get_stats_engine('driver')
+
 
 
 
@@ -35,10 +50,28 @@ def create_driver_board_test():
         
         logger.info(f"Creating driver board test for SN: {json_data['driver_board_sn']}")
         
+        # 幂等键：重试的请求直接返回第一次写入的记录（异步写入模式下由队列去重，不查询数据库）
+        client_record_id = request_client_id(json_data)
+        existing = None if ingest_queue.enabled else find_by_client_id(DriverBoardTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        
         new_test = DriverBoardTest()
         populate_test_fields(new_test, json_data)
         
+        new_test.client_record_id = client_record_id
+        
+        # 异步写入模式：记录追加到本地队列后立即返回 202，由后台线程批量入库
+        if ingest_queue.enabled:
+            return ingest_queue.accepted_response(DriverBoardTest, new_test)
+        
         db.session.add(new_test)
+        existing = flush_new_record(DriverBoardTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        BoardSummary.record_tests('driver', [new_test])
+        TestHourlyRollup.record_tests('driver', [new_test])
+        bump_data_version(DriverBoardTest.__tablename__)
         db.session.commit()
         
         logger.info(f"Driver board test created successfully with ID: {new_test.id}")
@@ -78,69 +111,24 @@ def get_all_driver_board_tests():
         sort_by = request.args.get('sort_by', 'update_time')
         sort_order = request.args.get('sort_order', 'desc')
         
-        # 修复字段名称
-        driver_board_sn = request.args.get('driver_board_sn')
-        driver_test_result = request.args.get('driver_test_result')
-
-        # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # 使用 DriverBoardTest.query 会自动过滤 is_deleted=False
-        query = DriverBoardTest.query
-        
-        # 应用时间范围筛选（基于 create_time 字段）
-        if start_date:
-            try:
-                start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(DriverBoardTest.create_time >= start_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
-        
-        if end_date:
-            try:
-                end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
-                # 如果是日期格式，包含当天的所有记录
-                if 'T' not in end_date:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(DriverBoardTest.create_time <= end_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-
-
-
-
-        # 应用筛选条件
-        if driver_board_sn:
-            query = query.filter(DriverBoardTest.driver_board_sn.like(f'%{driver_board_sn}%'))
-        if driver_test_result:
-            query = query.filter(DriverBoardTest.driver_test_result == driver_test_result)
+        # 输出字段（?fields=a,b,c），大字段仅在详情接口返回
+        fields = list_fields(DriverBoardTest, request.args.get('fields'))
         
-        # 应用排序
-        if hasattr(DriverBoardTest, sort_by):
-            if sort_order.lower() == 'desc':
-                query = query.order_by(getattr(DriverBoardTest, sort_by).desc())
-            else:
-                query = query.order_by(getattr(DriverBoardTest, sort_by).asc())
+        # 筛选条件（与导出接口共用）
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
         
-        # 分页查询
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # 排序与分页（支持 cursor 游标分页与 include_total=false）
+        query = apply_projection(query, DriverBoardTest, fields, sort_by)
+        items, pagination = paginate_query(query, DriverBoardTest, sort_by, sort_order, page, per_page)
         
         return jsonify({
-            'data': [test.to_dict() for test in pagination.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'data': serialize_page(DriverBoardTest, items, fields),
+            'pagination': pagination
         })
+    except (CursorError, FieldsError, SnMatchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching driver board tests: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -161,6 +149,50 @@ def get_all_driver_board_tests():
 
 
 
+@driver_board_tests_bp.route('/export', methods=['GET'])
+@require_auth()
+def export_driver_board_tests():
+    """
+    流式导出驱动板测试记录（大批量导出，替代逐页读取列表接口）
+    
+    查询参数:
+    - start_date / end_date / driver_board_sn / sn_match / driver_test_result: 与列表接口相同的筛选条件
+    - fields: 导出字段 (默认同列表接口)
+    - format: 导出格式 (csv, ndjson，默认csv)
+    - gzip: 是否压缩输出 (true/false，默认false)
+    """
+    try:
+        fields = list_fields(DriverBoardTest, request.args.get('fields'))
+        fmt = parse_export_format()
+        
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
+        
+        return stream_export(query, DriverBoardTest, fields, fmt, parse_export_gzip(), filename='driver_board_tests')
+    except (FieldsError, SnMatchError, ExportError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting driver board tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@driver_board_tests_bp.route('/lookup', methods=['POST'])
+@require_auth()
+def lookup_driver_board_tests():
+    """
+    按 id 或 driver_board_sn 批量获取驱动板测试记录（一次 IN 查询，已删除的记录视为不存在）
+    
+    请求体: {"ids": [...], "sns": [...]}，可选 ?fields=a,b,c
+    返回格式: {"data": {id: 记录}, "not_found": {"ids": [...], "sns": [...]}}
+    """
+    try:
+        return jsonify(batch_lookup(DriverBoardTest, 'driver_board_sn', request.get_json(silent=True), request.args.get('fields')))
+    except (BatchLookupError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up driver board tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @require_auth()
 @driver_board_tests_bp.route('/<string:test_id>', methods=['GET'])
 def get_driver_board_test(test_id):
@@ -190,7 +222,13 @@ def update_driver_board_test(test_id):
         
         logger.info(f"Updating driver board test ID: {test_id}")
         
+        old_result = test.driver_test_result
+        old_sn = test.driver_board_sn
         populate_test_fields(test, json_data, is_update=True)
+        BoardSummary.refresh('driver', [old_sn, test.driver_board_sn])
+        if not test.is_deleted:
+            TestHourlyRollup.record_result_change('driver', test.create_time, old_result, test.driver_test_result)
+        bump_data_version(DriverBoardTest.__tablename__)
         
         db.session.commit()
         
@@ -230,6 +268,9 @@ def delete_driver_board_test(test_id):
         # 执行软删除
         test.is_deleted = True
         test.delete_time = datetime.now(timezone.utc)
+        BoardSummary.refresh('driver', [test.driver_board_sn])
+        TestHourlyRollup.record_tests('driver', [test], delta=-1)
+        bump_data_version(DriverBoardTest.__tablename__)
         
         db.session.commit()
         
@@ -252,6 +293,7 @@ def delete_driver_board_test(test_id):
 
 @require_auth()
 @driver_board_tests_bp.route('/stats', methods=['GET'])
+@cached_stats(DriverBoardTest.__tablename__)
 def get_driver_board_test_stats():
     """
     获取驱动板测试统计信息
@@ -259,7 +301,8 @@ def get_driver_board_test_stats():
     支持的查询参数:
     - start_date: 开始日期 (格式: YYYY-MM-DD 或 ISO格式)
     - end_date: 结束日期 (格式: YYYY-MM-DD 或 ISO格式) 
-    - driver_board_sn: 驱动板序列号 (支持模糊匹配)
+    - driver_board_sn: 驱动板序列号 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     
     返回格式:
     {
@@ -276,10 +319,10 @@ def get_driver_board_test_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         driver_board_sn = request.args.get('driver_board_sn')
+        sn_match = parse_sn_match()
         driver_test_result = request.args.get('driver_test_result')
 
-        # 构建基础查询，自动过滤软删除记录
-        query = DriverBoardTest.query.filter(DriverBoardTest.is_deleted == False)
+        start_dt = end_dt = None
         
         # 应用时间范围筛选（基于create_time字段）
         if start_date:
@@ -290,7 +333,6 @@ def get_driver_board_test_stats():
                 if start_dt.tzinfo is None:
                     # 假设输入是北京时间(UTC+8)，转换为UTC
                     start_dt = start_dt - timedelta(hours=8)
-                query = query.filter(DriverBoardTest.create_time >= start_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -304,41 +346,15 @@ def get_driver_board_test_stats():
                 if end_dt.tzinfo is None:
                     # 假设输入是北京时间(UTC+8)，转换为UTC
                     end_dt = end_dt - timedelta(hours=8)
-                query = query.filter(DriverBoardTest.create_time <= end_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
         
-        # 应用驱动板序列号筛选（模糊匹配）
-        if driver_board_sn:
-            query = query.filter(DriverBoardTest.driver_board_sn.like(f'%{driver_board_sn}%'))
-
-        if driver_test_result:
-            query = query.filter(DriverBoardTest.driver_test_result == driver_test_result)
-
-        # 使用单次聚合查询获取所有统计数据，提高查询效率
-        # 一次查询同时获取总数和各状态的统计
-        stats_result = db.session.query(
-            func.count(DriverBoardTest.id).label('total_count'),
-            func.sum(case((DriverBoardTest.driver_test_result == 'pass', 1), else_=0)).label('success_count'),
-            func.sum(case((DriverBoardTest.driver_test_result == 'fail', 1), else_=0)).label('fail_count'),
-        ).filter(query.whereclause if query.whereclause is not None else True).one()
-        
-        # 获取详细的状态分组统计（用于breakdown）
-        breakdown_stats = db.session.query(
-            DriverBoardTest.driver_test_result,
-            func.count(DriverBoardTest.id).label('count')
-        ).filter(query.whereclause if query.whereclause is not None else True
-        ).group_by(DriverBoardTest.driver_test_result).all()
-        
-        # 转换结果为字典格式
-        total_count = int(stats_result.total_count or 0)
-        success_count = int(stats_result.success_count or 0)
-        fail_count = int(stats_result.fail_count or 0)
-        
-        # 构建详细分组统计
-        breakdown = {}
-        for result, count in breakdown_stats:
-            breakdown[result or 'unknown'] = int(count)
+        # 按结果分组的单次聚合查询，同时得到总数、成功/失败数和 breakdown
+        stats = stats_engine.test_stats(start_dt, end_dt, driver_board_sn, driver_test_result, sn_match)
+        total_count = stats['total_count']
+        success_count = stats['success_count']
+        fail_count = stats['fail_count']
+        breakdown = stats['breakdown']
         
         # 计算其他状态的记录数
         other_count = total_count - success_count - fail_count
@@ -360,6 +376,8 @@ def get_driver_board_test_stats():
         logger.info(f"Driver board test stats query completed. Total: {total_count}, Success: {success_count}, Fail: {fail_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching driver board test stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -374,6 +392,7 @@ def get_driver_board_test_stats():
 
 @require_auth()
 @driver_board_tests_bp.route('/boards-stats', methods=['GET'])
+@cached_stats(DriverBoardTest.__tablename__)
 def get_driver_board_stats():
     """
     获取驱动板子维度的统计信息
@@ -410,15 +429,11 @@ def get_driver_board_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # 构建时间筛选条件
-        time_filter = ""
-        params = {}
+        start_dt = end_dt = None
         
         if start_date:
             try:
                 start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                time_filter += " AND create_time >= :start_date"
-                params['start_date'] = start_dt
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format'}), 400
         
@@ -427,73 +442,11 @@ def get_driver_board_stats():
                 end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
                 if 'T' not in end_date:
                     end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                time_filter += " AND create_time <= :end_date"
-                params['end_date'] = end_dt
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format'}), 400
         
-        # 1. 测试记录维度统计
-        test_stats_sql = text(f"""
-        SELECT 
-            COUNT(*) as total_tests,
-            SUM(CASE WHEN driver_test_result = 'pass' THEN 1 ELSE 0 END) as success_tests,
-            SUM(CASE WHEN driver_test_result = 'fail' THEN 1 ELSE 0 END) as fail_tests
-        FROM driver_board_tests 
-        WHERE is_deleted = 0 {time_filter}
-        """)
-        
-        test_result = db.session.execute(test_stats_sql, params).fetchone()
-        
-        # 2. 板子维度统计 - 使用窗口函数获取每个板子的最新测试结果
-        board_stats_sql = text(f"""
-        WITH latest_tests AS (
-            SELECT 
-                driver_board_sn,
-                driver_test_result,
-                ROW_NUMBER() OVER (PARTITION BY driver_board_sn ORDER BY create_time DESC) as rn
-            FROM driver_board_tests 
-            WHERE is_deleted = 0 {time_filter}
-        ),
-        board_history AS (
-            SELECT 
-                driver_board_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN driver_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN driver_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM driver_board_tests 
-            WHERE is_deleted = 0 {time_filter}
-            GROUP BY driver_board_sn
-        )
-        SELECT 
-            COUNT(DISTINCT l.driver_board_sn) as total_boards,
-            SUM(CASE WHEN l.driver_test_result = 'pass' THEN 1 ELSE 0 END) as success_boards,
-            SUM(CASE WHEN l.driver_test_result = 'fail' THEN 1 ELSE 0 END) as fail_boards,
-            -- 一直成功的板子：最新是成功且从未失败
-            SUM(CASE 
-                WHEN l.driver_test_result = 'pass' AND h.fail_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_success_boards,
-            -- 最终成功的板子：最新是成功但有过失败
-            SUM(CASE 
-                WHEN l.driver_test_result = 'pass' AND h.fail_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_success_boards,
-            -- 一直失败的板子：最新是失败且从未成功
-            SUM(CASE 
-                WHEN l.driver_test_result = 'fail' AND h.success_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_fail_boards,
-            -- 最终失败的板子：最新是失败但有过成功
-            SUM(CASE 
-                WHEN l.driver_test_result = 'fail' AND h.success_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_fail_boards
-        FROM latest_tests l
-        JOIN board_history h ON l.driver_board_sn = h.driver_board_sn
-        WHERE l.rn = 1
-        """)
-        
-        board_result = db.session.execute(board_stats_sql, params).fetchone()
+        # 未按时间筛选时读取板子汇总表，否则单次窗口查询同时得到测试维度与板子维度统计
+        test_result = board_result = stats_engine.board_stats(start_dt, end_dt)
         
         # 构建返回结果
         response_data = {
@@ -547,6 +500,7 @@ def get_driver_board_stats():
 
 @require_auth()
 @driver_board_tests_bp.route('/sn-stats', methods=['GET'])
+@cached_stats(DriverBoardTest.__tablename__)
 def get_driver_board_sn_stats():
     """
     获取驱动板测试的序列号统计信息 (板子维度)
@@ -555,7 +509,8 @@ def get_driver_board_sn_stats():
     查询参数:
     - start_date: 开始日期 (YYYY-MM-DD，北京时间)
     - end_date: 结束日期 (YYYY-MM-DD，北京时间)
-    - driver_board_sn: 驱动板序列号筛选 (部分匹配)
+    - driver_board_sn: 驱动板序列号筛选 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     - latest_result: 筛选最新测试结果为pass/fail的板子
     - sort_by: 排序字段 (driver_board_sn, total_tests, pass_count, fail_count, pass_rate, latest_test_time, first_test_time, latest_result)
     - sort_order: 排序方向 (asc, desc，默认desc)
@@ -590,11 +545,13 @@ def get_driver_board_sn_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         driver_board_sn = request.args.get('driver_board_sn')
+        sn_match = parse_sn_match()
         latest_result = request.args.get('latest_result')
         sort_by = request.args.get('sort_by', 'total_tests')
         sort_order = request.args.get('sort_order', 'desc').lower()
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 10)), 100)
+        include_total = parse_include_total()  # 无限滚动场景可传 include_total=false 跳过总数
 
         # 验证排序参数
         valid_sort_fields = {
@@ -614,8 +571,7 @@ def get_driver_board_sn_stats():
         if sort_order not in ['asc', 'desc']:
             sort_order = 'desc'
 
-        # 构建 CTE 查询以优化性能（时间筛选条件，不包含driver_test_result）
-        cte_conditions = ["dbt.is_deleted = FALSE"]
+        start_dt = end_dt = None
         
         # 时间范围条件（北京时间转UTC）
         if start_date:
@@ -624,7 +580,6 @@ def get_driver_board_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if start_dt.tzinfo is None:
                     start_dt = start_dt - timedelta(hours=8)
-                cte_conditions.append(f"dbt.create_time >= '{start_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -636,99 +591,13 @@ def get_driver_board_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if end_dt.tzinfo is None:
                     end_dt = end_dt - timedelta(hours=8)
-                cte_conditions.append(f"dbt.create_time <= '{end_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-        
-        # 序列号筛选条件
-        if driver_board_sn:
-            cte_conditions.append(f"dbt.driver_board_sn LIKE '%{driver_board_sn}%'")
 
-        # 构建CTE查询
-        cte_where_clause = " AND ".join(cte_conditions)
-        
-        # 板子维度统计：每块板子一行数据，基于最新测试结果筛选
-        stats_query = f"""
-        WITH board_all_tests AS (
-            SELECT 
-                dbt.driver_board_sn,
-                dbt.driver_test_result,
-                dbt.create_time,
-                CONVERT_TZ(dbt.create_time, '+00:00', '+08:00') as local_create_time,
-                ROW_NUMBER() OVER (PARTITION BY dbt.driver_board_sn ORDER BY dbt.create_time DESC) as rn
-            FROM driver_board_tests dbt
-            WHERE {cte_where_clause}
-        ),
-        board_latest_result AS (
-            SELECT 
-                driver_board_sn,
-                driver_test_result as latest_result,
-                local_create_time as latest_test_time
-            FROM board_all_tests
-            WHERE rn = 1
-        ),
-        board_stats AS (
-            SELECT 
-                bat.driver_board_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN bat.driver_test_result = 'pass' THEN 1 ELSE 0 END) as pass_count,
-                SUM(CASE WHEN bat.driver_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count,
-                MIN(bat.local_create_time) as first_test_time,
-                ROUND(
-                    (SUM(CASE WHEN bat.driver_test_result = 'pass' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)), 
-                    2
-                ) as pass_rate
-            FROM board_all_tests bat
-            WHERE bat.driver_board_sn IS NOT NULL AND bat.driver_board_sn != ''
-            GROUP BY bat.driver_board_sn
+        # 未按时间筛选时读取板子汇总表，否则按时间范围执行窗口统计；当前页与总数同一条语句取得
+        sn_stats_data, total_board_count, has_next = stats_engine.sn_stats(
+            start_dt, end_dt, driver_board_sn, latest_result, sort_by, sort_order, page, per_page, include_total, sn_match
         )
-        SELECT 
-            bs.driver_board_sn,
-            bs.total_tests,
-            bs.pass_count,
-            bs.fail_count,
-            bs.pass_rate,
-            bs.first_test_time,
-            blr.latest_test_time,
-            blr.latest_result
-        FROM board_stats bs
-        JOIN board_latest_result blr ON bs.driver_board_sn = blr.driver_board_sn
-        WHERE 1=1 {" AND blr.latest_result = '" + latest_result + "'" if latest_result else ""}
-        ORDER BY {valid_sort_fields[sort_by]} {sort_order.upper()}
-        LIMIT {per_page} OFFSET {(page - 1) * per_page}
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        sn_stats_data = [dict(row._mapping) for row in result]
-        
-        # 获取总数统计（用于分页）- 基于板子维度和最新结果筛选
-        count_query = f"""
-        WITH board_all_tests AS (
-            SELECT 
-                dbt.driver_board_sn,
-                dbt.driver_test_result,
-                dbt.create_time,
-                ROW_NUMBER() OVER (PARTITION BY dbt.driver_board_sn ORDER BY dbt.create_time DESC) as rn
-            FROM driver_board_tests dbt
-            WHERE {cte_where_clause}
-        ),
-        board_latest_result AS (
-            SELECT 
-                driver_board_sn,
-                driver_test_result as latest_result
-            FROM board_all_tests
-            WHERE rn = 1
-              AND driver_board_sn IS NOT NULL 
-              AND driver_board_sn != ''
-        )
-        SELECT COUNT(*) as total_board_count 
-        FROM board_latest_result
-        WHERE 1=1 {" AND latest_result = '" + latest_result + "'" if latest_result else ""}
-        """
-        
-        count_result = db.session.execute(text(count_query))
-        total_board_count = count_result.scalar()
         
         # 格式化返回数据
         formatted_stats = []
@@ -745,7 +614,7 @@ def get_driver_board_sn_stats():
             })
         
         # 构建分页信息
-        total_pages = (total_board_count + per_page - 1) // per_page
+        total_pages = (total_board_count + per_page - 1) // per_page if total_board_count is not None else None
         
         response_data = {
             'sn_stats': formatted_stats,
@@ -753,7 +622,8 @@ def get_driver_board_sn_stats():
                 'page': page,
                 'per_page': per_page,
                 'total': total_board_count,
-                'pages': total_pages
+                'pages': total_pages,
+                'has_next': has_next
             },
             'filters': {
                 'start_date': start_date,
@@ -768,6 +638,8 @@ def get_driver_board_sn_stats():
         logger.info(f"Driver board SN stats query completed. Found {len(formatted_stats)} board records, total boards: {total_board_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching driver board SN stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -787,6 +659,7 @@ def get_driver_board_sn_stats():
 
 @require_auth()
 @driver_board_tests_bp.route('/time-stats', methods=['GET'])
+@cached_stats(DriverBoardTest.__tablename__)
 def get_driver_board_time_stats():
     """
     获取驱动板测试时间趋势统计信息
@@ -843,46 +716,8 @@ def get_driver_board_time_stats():
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD format'}), 400
 
-        # 构建筛选条件
-        conditions = ["dbt.is_deleted = FALSE"]
-        conditions.append(f"dbt.create_time >= '{start_dt.isoformat()}'")
-        conditions.append(f"dbt.create_time <= '{end_dt.isoformat()}'")
-
-        # 根据间隔类型设置时间格式化（转换回北京时间显示）
-        interval_formats = {
-            'day': "DATE_FORMAT(CONVERT_TZ(dbt.create_time, '+00:00', '+08:00'), '%Y-%m-%d')",
-            'week': "DATE_FORMAT(DATE_SUB(CONVERT_TZ(dbt.create_time, '+00:00', '+08:00'), INTERVAL WEEKDAY(CONVERT_TZ(dbt.create_time, '+00:00', '+08:00')) DAY), '%Y-%m-%d')",
-            'month': "DATE_FORMAT(CONVERT_TZ(dbt.create_time, '+00:00', '+08:00'), '%Y-%m-01')"
-        }
-        
-        time_group = interval_formats[interval]
-        where_clause = " AND ".join(conditions)
-        
-        # 使用 CTE 构建时间趋势查询
-        stats_query = f"""
-        WITH filtered_tests AS (
-            SELECT 
-                dbt.driver_test_result,
-                {time_group} as time_period
-            FROM driver_board_tests dbt
-            WHERE {where_clause}
-        ),
-        time_aggregates AS (
-            SELECT 
-                time_period,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN driver_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN driver_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM filtered_tests
-            GROUP BY time_period
-            ORDER BY time_period ASC
-        )
-        SELECT * FROM time_aggregates
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        time_stats_data = [dict(row._mapping) for row in result]
+        # 从小时预聚合表按北京时间汇总
+        time_stats_data = stats_engine.time_stats(start_dt, end_dt, interval)
         
         # 格式化返回数据
         formatted_stats = []
@@ -962,6 +797,50 @@ def get_driver_board_time_stats():
 
 
 # 辅助函数
+def build_list_query():
+    """
+    按列表接口的筛选参数（时间范围、序列号、测试结果）构建查询，列表与导出接口共用。
+    返回 (query, error)，日期格式无效时 error 为错误信息
+    """
+    # 筛选参数
+    driver_board_sn = request.args.get('driver_board_sn')
+    sn_match = parse_sn_match()
+    driver_test_result = request.args.get('driver_test_result')
+
+    # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    # 使用 DriverBoardTest.query 会自动过滤 is_deleted=False
+    query = DriverBoardTest.query
+    
+    # 应用时间范围筛选（基于 create_time 字段）
+    if start_date:
+        try:
+            start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
+            query = query.filter(DriverBoardTest.create_time >= start_dt)
+        except ValueError:
+            return None, {'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}
+    
+    if end_date:
+        try:
+            end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
+            # 如果是日期格式，包含当天的所有记录
+            if 'T' not in end_date:
+                end_dt = end_dt.replace(hour=23, minute=59, second=59)
+            query = query.filter(DriverBoardTest.create_time <= end_dt)
+        except ValueError:
+            return None, {'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}
+
+    # 应用筛选条件
+    if driver_board_sn:
+        query = filter_sn(query, DriverBoardTest.driver_board_sn, driver_board_sn, sn_match)
+    if driver_test_result:
+        query = query.filter(DriverBoardTest.driver_test_result == driver_test_result)
+
+    return query, None
+
+
 def parse_datetime(date_str):
     """解析日期时间字符串"""
     if not date_str:
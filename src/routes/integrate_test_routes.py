@@ -1,10 +1,22 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime, timezone, timedelta
 import logging
-from sqlalchemy import func, case, text
 
 from src.extensions import db
 from src.models.integrate_test_model import IntegrateTest
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.models.board_summary_model import BoardSummary
+from src.utils.pagination import paginate_query, CursorError, parse_include_total
+from src.utils.stats_cache import cached_stats, bump_data_version
+from src.utils.stats_engine import get_stats_engine
+from src.utils.sn_search import filter_sn, parse_sn_match, SnMatchError
+from src.utils.projection import list_fields, apply_projection, serialize_page, FieldsError
+from src.utils.lookup import batch_lookup, BatchLookupError
+from src.utils.idempotency import (
+    request_client_id, find_by_client_id, flush_new_record, IdempotencyKeyError, REPLAYED_HEADERS,
+)
+from src.utils.ingest_queue import ingest_queue
+from src.utils.export import stream_export, parse_export_format, parse_export_gzip, ExportError
 from src.auth.decorators import require_auth, require_role
 
 integrate_tests_bp = Blueprint('integrate_tests_bp', __name__, url_prefix='/api/integrate_tests')
@@ -12,6 +24,9 @@ integrate_tests_bp = Blueprint('integrate_tests_bp', __name__, url_prefix='/api/
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 统计接口共用的查询引擎
+stats_engine = get_stats_engine('integrate')
+
 @integrate_tests_bp.route('', methods=['POST'])
 def create_integrate_test():
     """创建新的集成测试记录"""
@@ -27,10 +42,28 @@ def create_integrate_test():
         
         logger.info(f"Creating integrate test for SN: {json_data['product_sn']}")
         
+        # 幂等键：重试的请求直接返回第一次写入的记录（异步写入模式下由队列去重，不查询数据库）
+        client_record_id = request_client_id(json_data)
+        existing = None if ingest_queue.enabled else find_by_client_id(IntegrateTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        
         new_test = IntegrateTest()
         populate_test_fields(new_test, json_data)
         
+        new_test.client_record_id = client_record_id
+        
+        # 异步写入模式：记录追加到本地队列后立即返回 202，由后台线程批量入库
+        if ingest_queue.enabled:
+            return ingest_queue.accepted_response(IntegrateTest, new_test)
+        
         db.session.add(new_test)
+        existing = flush_new_record(IntegrateTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        BoardSummary.record_tests('integrate', [new_test])
+        TestHourlyRollup.record_tests('integrate', [new_test])
+        bump_data_version(IntegrateTest.__tablename__)
         db.session.commit()
         
         logger.info(f"Integrate test created successfully with ID: {new_test.id}")
@@ -62,67 +95,24 @@ def get_all_integrate_tests():
         sort_by = request.args.get('sort_by', 'update_time')
         sort_order = request.args.get('sort_order', 'desc')
         
-        # 添加筛选支持 - 修改字段名
-        product_sn = request.args.get('product_sn')
-        integrate_test_result = request.args.get('integrate_test_result')
-        
-        # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # 使用 IntegrateTest.query 会自动过滤 is_deleted=False
-        query = IntegrateTest.query
-
-        # 应用时间范围筛选（基于 create_time 字段）
-        if start_date:
-            try:
-                start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(IntegrateTest.create_time >= start_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
-
-        if end_date:
-            try:
-                end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
-                # 如果是日期格式，包含当天的所有记录
-                if 'T' not in end_date:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(IntegrateTest.create_time <= end_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-
-        # 应用筛选条件
-        if product_sn:
-            query = query.filter(IntegrateTest.product_sn.like(f'%{product_sn}%'))
-
-        if integrate_test_result:
-            query = query.filter(IntegrateTest.integrate_test_result == integrate_test_result)
+        # 输出字段（?fields=a,b,c），大字段仅在详情接口返回
+        fields = list_fields(IntegrateTest, request.args.get('fields'))
         
-        # 应用排序
-        if hasattr(IntegrateTest, sort_by):
-            if sort_order.lower() == 'desc':
-                query = query.order_by(getattr(IntegrateTest, sort_by).desc())
-            else:
-                query = query.order_by(getattr(IntegrateTest, sort_by).asc())
+        # 筛选条件（与导出接口共用）
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
         
-        # 分页查询
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # 排序与分页（支持 cursor 游标分页与 include_total=false）
+        query = apply_projection(query, IntegrateTest, fields, sort_by)
+        items, pagination = paginate_query(query, IntegrateTest, sort_by, sort_order, page, per_page)
         
         return jsonify({
-            'data': [test.to_dict() for test in pagination.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'data': serialize_page(IntegrateTest, items, fields),
+            'pagination': pagination
         })
+    except (CursorError, FieldsError, SnMatchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching integrate tests: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -130,6 +120,50 @@ def get_all_integrate_tests():
 
 
 
+@integrate_tests_bp.route('/export', methods=['GET'])
+@require_auth()
+def export_integrate_tests():
+    """
+    流式导出集成测试记录（大批量导出，替代逐页读取列表接口）
+    
+    查询参数:
+    - start_date / end_date / product_sn / sn_match / integrate_test_result: 与列表接口相同的筛选条件
+    - fields: 导出字段 (默认同列表接口)
+    - format: 导出格式 (csv, ndjson，默认csv)
+    - gzip: 是否压缩输出 (true/false，默认false)
+    """
+    try:
+        fields = list_fields(IntegrateTest, request.args.get('fields'))
+        fmt = parse_export_format()
+        
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
+        
+        return stream_export(query, IntegrateTest, fields, fmt, parse_export_gzip(), filename='integrate_tests')
+    except (FieldsError, SnMatchError, ExportError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting integrate tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@integrate_tests_bp.route('/lookup', methods=['POST'])
+@require_auth()
+def lookup_integrate_tests():
+    """
+    按 id 或 product_sn 批量获取集成测试记录（一次 IN 查询，已删除的记录视为不存在）
+    
+    请求体: {"ids": [...], "sns": [...]}，可选 ?fields=a,b,c
+    返回格式: {"data": {id: 记录}, "not_found": {"ids": [...], "sns": [...]}}
+    """
+    try:
+        return jsonify(batch_lookup(IntegrateTest, 'product_sn', request.get_json(silent=True), request.args.get('fields')))
+    except (BatchLookupError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up integrate tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @require_auth()
 @integrate_tests_bp.route('/<string:test_id>', methods=['GET'])
 def get_integrate_test(test_id):
@@ -170,7 +204,13 @@ def update_integrate_test(test_id):
         
         logger.info(f"Updating integrate test ID: {test_id}")
         
+        old_result = test.integrate_test_result
+        old_sn = test.product_sn
         populate_test_fields(test, json_data, is_update=True)
+        BoardSummary.refresh('integrate', [old_sn, test.product_sn])
+        if not test.is_deleted:
+            TestHourlyRollup.record_result_change('integrate', test.create_time, old_result, test.integrate_test_result)
+        bump_data_version(IntegrateTest.__tablename__)
         
         db.session.commit()
         
@@ -210,6 +250,9 @@ def delete_integrate_test(test_id):
         # 执行软删除
         test.is_deleted = True
         test.delete_time = datetime.now(timezone.utc)
+        BoardSummary.refresh('integrate', [test.product_sn])
+        TestHourlyRollup.record_tests('integrate', [test], delta=-1)
+        bump_data_version(IntegrateTest.__tablename__)
         
         db.session.commit()
         
@@ -236,6 +279,7 @@ def delete_integrate_test(test_id):
 
 @require_auth()
 @integrate_tests_bp.route('/stats', methods=['GET'])
+@cached_stats(IntegrateTest.__tablename__)
 def get_integrate_test_stats():
     """
     获取集成测试统计信息
@@ -243,7 +287,8 @@ def get_integrate_test_stats():
     支持的查询参数:
     - start_date: 开始日期 (格式: YYYY-MM-DD 或 ISO格式)
     - end_date: 结束日期 (格式: YYYY-MM-DD 或 ISO格式) 
-    - product_sn: 产品序列号 (支持模糊匹配)
+    - product_sn: 产品序列号 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     
     返回格式:
     {
@@ -259,17 +304,16 @@ def get_integrate_test_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         product_sn = request.args.get('product_sn')
+        sn_match = parse_sn_match()
         integrate_test_result = request.args.get('integrate_test_result')
         
-        # 构建基础查询，自动过滤软删除记录
-        query = IntegrateTest.query.filter(IntegrateTest.is_deleted == False)
+        start_dt = end_dt = None
         
         # 应用时间范围筛选（基于create_time字段）
         if start_date:
             try:
                 # 支持多种日期格式
                 start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(IntegrateTest.create_time >= start_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -279,41 +323,15 @@ def get_integrate_test_stats():
                 end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
                 if 'T' not in end_date:  # 如果是日期格式，则包含当天23:59:59
                     end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(IntegrateTest.create_time <= end_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
         
-        # 应用产品序列号筛选（模糊匹配）
-        if product_sn:
-            query = query.filter(IntegrateTest.product_sn.like(f'%{product_sn}%'))
-
-        if integrate_test_result:
-            query = query.filter(IntegrateTest.integrate_test_result == integrate_test_result)
-
-        # 使用单次聚合查询获取所有统计数据，提高查询效率
-        # 一次查询同时获取总数和各状态的统计
-        stats_result = db.session.query(
-            func.count(IntegrateTest.id).label('total_count'),
-            func.sum(case((IntegrateTest.integrate_test_result == 'pass', 1), else_=0)).label('success_count'),
-            func.sum(case((IntegrateTest.integrate_test_result == 'fail', 1), else_=0)).label('fail_count')
-        ).filter(query.whereclause if query.whereclause is not None else True).one()
-        
-        # 获取详细的状态分组统计（用于breakdown）
-        breakdown_stats = db.session.query(
-            IntegrateTest.integrate_test_result,
-            func.count(IntegrateTest.id).label('count')
-        ).filter(query.whereclause if query.whereclause is not None else True
-        ).group_by(IntegrateTest.integrate_test_result).all()
-        
-        # 转换结果为字典格式
-        total_count = int(stats_result.total_count or 0)
-        success_count = int(stats_result.success_count or 0)
-        fail_count = int(stats_result.fail_count or 0)
-        
-        # 构建详细分组统计
-        breakdown = {}
-        for result, count in breakdown_stats:
-            breakdown[result or 'unknown'] = int(count)
+        # 按结果分组的单次聚合查询，同时得到总数、成功/失败数和 breakdown
+        stats = stats_engine.test_stats(start_dt, end_dt, product_sn, integrate_test_result, sn_match)
+        total_count = stats['total_count']
+        success_count = stats['success_count']
+        fail_count = stats['fail_count']
+        breakdown = stats['breakdown']
         
         # 计算其他状态的记录数
         other_count = total_count - success_count - fail_count
@@ -335,6 +353,8 @@ def get_integrate_test_stats():
         logger.info(f"Integrate test stats query completed. Total: {total_count}, Success: {success_count}, Fail: {fail_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching integrate test stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -371,6 +391,7 @@ def get_integrate_test_stats():
 
 @require_auth()
 @integrate_tests_bp.route('/boards-stats', methods=['GET'])
+@cached_stats(IntegrateTest.__tablename__)
 def get_integrate_board_stats():
     """
     获取集成测试产品维度的统计信息
@@ -407,15 +428,11 @@ def get_integrate_board_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # 构建时间筛选条件
-        time_filter = ""
-        params = {}
+        start_dt = end_dt = None
         
         if start_date:
             try:
                 start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                time_filter += " AND create_time >= :start_date"
-                params['start_date'] = start_dt
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format'}), 400
         
@@ -424,73 +441,11 @@ def get_integrate_board_stats():
                 end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
                 if 'T' not in end_date:
                     end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                time_filter += " AND create_time <= :end_date"
-                params['end_date'] = end_dt
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format'}), 400
         
-        # 1. 测试记录维度统计
-        test_stats_sql = text(f"""
-        SELECT 
-            COUNT(*) as total_tests,
-            SUM(CASE WHEN integrate_test_result = 'pass' THEN 1 ELSE 0 END) as success_tests,
-            SUM(CASE WHEN integrate_test_result = 'fail' THEN 1 ELSE 0 END) as fail_tests
-        FROM integrate_tests 
-        WHERE is_deleted = 0 {time_filter}
-        """)
-        
-        test_result = db.session.execute(test_stats_sql, params).fetchone()
-        
-        # 2. 产品维度统计 - 使用窗口函数获取每个产品的最新测试结果
-        product_stats_sql = text(f"""
-        WITH latest_tests AS (
-            SELECT 
-                product_sn,
-                integrate_test_result,
-                ROW_NUMBER() OVER (PARTITION BY product_sn ORDER BY create_time DESC) as rn
-            FROM integrate_tests 
-            WHERE is_deleted = 0 {time_filter}
-        ),
-        product_history AS (
-            SELECT 
-                product_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN integrate_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN integrate_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM integrate_tests 
-            WHERE is_deleted = 0 {time_filter}
-            GROUP BY product_sn
-        )
-        SELECT 
-            COUNT(DISTINCT l.product_sn) as total_products,
-            SUM(CASE WHEN l.integrate_test_result = 'pass' THEN 1 ELSE 0 END) as success_products,
-            SUM(CASE WHEN l.integrate_test_result = 'fail' THEN 1 ELSE 0 END) as fail_products,
-            -- 一直成功的产品：最新是成功且从未失败
-            SUM(CASE 
-                WHEN l.integrate_test_result = 'pass' AND h.fail_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_success_products,
-            -- 最终成功的产品：最新是成功但有过失败
-            SUM(CASE 
-                WHEN l.integrate_test_result = 'pass' AND h.fail_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_success_products,
-            -- 一直失败的产品：最新是失败且从未成功
-            SUM(CASE 
-                WHEN l.integrate_test_result = 'fail' AND h.success_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_fail_products,
-            -- 最终失败的产品：最新是失败但有过成功
-            SUM(CASE 
-                WHEN l.integrate_test_result = 'fail' AND h.success_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_fail_products
-        FROM latest_tests l
-        JOIN product_history h ON l.product_sn = h.product_sn
-        WHERE l.rn = 1
-        """)
-        
-        product_result = db.session.execute(product_stats_sql, params).fetchone()
+        # 未按时间筛选时读取板子汇总表，否则单次窗口查询同时得到测试维度与产品维度统计
+        test_result = product_result = stats_engine.board_stats(start_dt, end_dt, unit='products')
         
         # 构建返回结果
         response_data = {
@@ -546,6 +501,51 @@ def get_integrate_board_stats():
 
 
 # 辅助函数
+def build_list_query():
+    """
+    按列表接口的筛选参数（时间范围、序列号、测试结果）构建查询，列表与导出接口共用。
+    返回 (query, error)，日期格式无效时 error 为错误信息
+    """
+    # 筛选参数
+    product_sn = request.args.get('product_sn')
+    sn_match = parse_sn_match()
+    integrate_test_result = request.args.get('integrate_test_result')
+    
+    # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    # 使用 IntegrateTest.query 会自动过滤 is_deleted=False
+    query = IntegrateTest.query
+
+    # 应用时间范围筛选（基于 create_time 字段）
+    if start_date:
+        try:
+            start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
+            query = query.filter(IntegrateTest.create_time >= start_dt)
+        except ValueError:
+            return None, {'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}
+
+    if end_date:
+        try:
+            end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
+            # 如果是日期格式，包含当天的所有记录
+            if 'T' not in end_date:
+                end_dt = end_dt.replace(hour=23, minute=59, second=59)
+            query = query.filter(IntegrateTest.create_time <= end_dt)
+        except ValueError:
+            return None, {'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}
+
+    # 应用筛选条件
+    if product_sn:
+        query = filter_sn(query, IntegrateTest.product_sn, product_sn, sn_match)
+
+    if integrate_test_result:
+        query = query.filter(IntegrateTest.integrate_test_result == integrate_test_result)
+
+    return query, None
+
+
 def parse_datetime(date_str):
     """解析日期时间字符串"""
     if not date_str:
@@ -671,6 +671,7 @@ def validate_required_fields(json_data):
 
 @require_auth()
 @integrate_tests_bp.route('/sn-stats', methods=['GET'])
+@cached_stats(IntegrateTest.__tablename__)
 def get_integrate_sn_stats():
     """
     获取集成测试的序列号统计信息 (产品维度)
@@ -679,7 +680,8 @@ def get_integrate_sn_stats():
     查询参数:
     - start_date: 开始日期 (YYYY-MM-DD，北京时间)
     - end_date: 结束日期 (YYYY-MM-DD，北京时间)
-    - product_sn: 产品序列号筛选 (部分匹配)
+    - product_sn: 产品序列号筛选 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     - latest_result: 筛选最新测试结果 (pass/fail)
     - sort_by: 排序字段 (product_sn, total_tests, pass_count, fail_count, pass_rate, latest_test_time, first_test_time, latest_result)
     - sort_order: 排序方向 (asc, desc，默认desc)
@@ -714,11 +716,13 @@ def get_integrate_sn_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         product_sn = request.args.get('product_sn')
+        sn_match = parse_sn_match()
         latest_result = request.args.get('latest_result')  # pass/fail
         sort_by = request.args.get('sort_by', 'latest_test_time')
         sort_order = request.args.get('sort_order', 'desc')
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 10)), 100)
+        include_total = parse_include_total()  # 无限滚动场景可传 include_total=false 跳过总数
 
         # 验证参数
         if sort_by not in ['product_sn', 'total_tests', 'pass_count', 'fail_count', 'pass_rate', 
@@ -731,8 +735,7 @@ def get_integrate_sn_stats():
         if latest_result and latest_result not in ['pass', 'fail']:
             return jsonify({'error': f'Invalid latest_result parameter: {latest_result}'}), 400
 
-        # 构建 CTE 查询以优化性能
-        cte_conditions = ["it.is_deleted = FALSE"]
+        start_dt = end_dt = None
         
         # 时间范围条件（北京时间转UTC）
         if start_date:
@@ -741,7 +744,6 @@ def get_integrate_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if start_dt.tzinfo is None:
                     start_dt = start_dt - timedelta(hours=8)
-                cte_conditions.append(f"it.create_time >= '{start_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -753,111 +755,13 @@ def get_integrate_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if end_dt.tzinfo is None:
                     end_dt = end_dt - timedelta(hours=8)
-                cte_conditions.append(f"it.create_time <= '{end_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-        
-        # 序列号筛选条件
-        if product_sn:
-            cte_conditions.append(f"it.product_sn LIKE '%{product_sn}%'")
 
-        # 构建CTE查询
-        cte_where_clause = " AND ".join(cte_conditions)
-        
-        # 排序字段映射
-        sort_field_map = {
-            'product_sn': 'product_sn',
-            'total_tests': 'total_tests',
-            'pass_count': 'pass_count',
-            'fail_count': 'fail_count', 
-            'pass_rate': 'pass_rate',
-            'latest_test_time': 'latest_test_time',
-            'first_test_time': 'first_test_time',
-            'latest_result': 'latest_result'
-        }
-        
-        # 使用board-centric CTE模式，每个产品序列号只返回一行
-        stats_query = f"""
-        WITH latest_test_per_board AS (
-            SELECT 
-                it.product_sn,
-                it.integrate_test_result,
-                CONVERT_TZ(it.create_time, '+00:00', '+08:00') as local_create_time,
-                ROW_NUMBER() OVER (PARTITION BY it.product_sn ORDER BY it.create_time DESC) as rn
-            FROM integrate_tests it
-            WHERE {cte_where_clause}
-              AND it.product_sn IS NOT NULL 
-              AND it.product_sn != ''
-        ),
-        board_stats AS (
-            SELECT 
-                it.product_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN it.integrate_test_result = 'pass' THEN 1 ELSE 0 END) as pass_count,
-                SUM(CASE WHEN it.integrate_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count,
-                ROUND(
-                    (SUM(CASE WHEN it.integrate_test_result = 'pass' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)), 
-                    2
-                ) as pass_rate,
-                MAX(CONVERT_TZ(it.create_time, '+00:00', '+08:00')) as latest_test_time,
-                MIN(CONVERT_TZ(it.create_time, '+00:00', '+08:00')) as first_test_time
-            FROM integrate_tests it
-            WHERE {cte_where_clause}
-              AND it.product_sn IS NOT NULL 
-              AND it.product_sn != ''
-            GROUP BY it.product_sn
-        ),
-        final_stats AS (
-            SELECT 
-                bs.*,
-                lt.integrate_test_result as latest_result
-            FROM board_stats bs
-            JOIN latest_test_per_board lt ON bs.product_sn = lt.product_sn AND lt.rn = 1"""
-        
-        # 添加latest_result过滤
-        if latest_result:
-            stats_query += f"""
-            WHERE lt.integrate_test_result = '{latest_result}'"""
-        
-        stats_query += f"""
+        # 未按时间筛选时读取板子汇总表，否则按时间范围执行窗口统计；当前页与总数同一条语句取得
+        sn_stats_data, total_sn_count, has_next = stats_engine.sn_stats(
+            start_dt, end_dt, product_sn, latest_result, sort_by, sort_order, page, per_page, include_total, sn_match
         )
-        SELECT * FROM final_stats
-        ORDER BY {sort_field_map[sort_by]} {sort_order.upper()}
-        LIMIT {per_page} OFFSET {(page - 1) * per_page}
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        sn_stats_data = [dict(row._mapping) for row in result]
-        
-        # 获取总数统计（用于分页） - 考虑latest_result过滤
-        if latest_result:
-            count_query = f"""
-            WITH latest_test_per_board AS (
-                SELECT 
-                    it.product_sn,
-                    it.integrate_test_result,
-                    ROW_NUMBER() OVER (PARTITION BY it.product_sn ORDER BY it.create_time DESC) as rn
-                FROM integrate_tests it
-                WHERE {cte_where_clause}
-                  AND it.product_sn IS NOT NULL 
-                  AND it.product_sn != ''
-            )
-            SELECT COUNT(*) as total_sn_count 
-            FROM latest_test_per_board 
-            WHERE rn = 1 AND integrate_test_result = '{latest_result}'
-            """
-        else:
-            count_query = f"""
-            SELECT COUNT(DISTINCT it.product_sn) as total_sn_count
-            FROM integrate_tests it
-            WHERE {cte_where_clause}
-              AND it.product_sn IS NOT NULL 
-              AND it.product_sn != ''
-            """
-        
-        count_result = db.session.execute(text(count_query))
-        total_sn_count = count_result.scalar()
         
         # 格式化返回数据
         formatted_stats = []
@@ -874,7 +778,7 @@ def get_integrate_sn_stats():
             })
         
         # 构建分页信息
-        total_pages = (total_sn_count + per_page - 1) // per_page
+        total_pages = (total_sn_count + per_page - 1) // per_page if total_sn_count is not None else None
         
         response_data = {
             'sn_stats': formatted_stats,
@@ -882,7 +786,8 @@ def get_integrate_sn_stats():
                 'page': page,
                 'per_page': per_page,
                 'total': total_sn_count,
-                'pages': total_pages
+                'pages': total_pages,
+                'has_next': has_next
             },
             'filters': {
                 'start_date': start_date,
@@ -897,6 +802,8 @@ def get_integrate_sn_stats():
         logger.info(f"Integrate test SN stats query completed. Found {len(formatted_stats)} SN records, total SNs: {total_sn_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching integrate test SN stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -918,6 +825,7 @@ def get_integrate_sn_stats():
 
 @require_auth()
 @integrate_tests_bp.route('/time-stats', methods=['GET'])
+@cached_stats(IntegrateTest.__tablename__)
 def get_integrate_time_stats():
     """
     获取集成测试时间趋势统计信息
@@ -974,46 +882,8 @@ def get_integrate_time_stats():
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD format'}), 400
 
-        # 构建筛选条件
-        conditions = ["it.is_deleted = FALSE"]
-        conditions.append(f"it.create_time >= '{start_dt.isoformat()}'")
-        conditions.append(f"it.create_time <= '{end_dt.isoformat()}'")
-
-        # 根据间隔类型设置时间格式化（转换回北京时间显示）
-        interval_formats = {
-            'day': "DATE_FORMAT(CONVERT_TZ(it.create_time, '+00:00', '+08:00'), '%Y-%m-%d')",
-            'week': "DATE_FORMAT(DATE_SUB(CONVERT_TZ(it.create_time, '+00:00', '+08:00'), INTERVAL WEEKDAY(CONVERT_TZ(it.create_time, '+00:00', '+08:00')) DAY), '%Y-%m-%d')",
-            'month': "DATE_FORMAT(CONVERT_TZ(it.create_time, '+00:00', '+08:00'), '%Y-%m-01')"
-        }
-        
-        time_group = interval_formats[interval]
-        where_clause = " AND ".join(conditions)
-        
-        # 使用 CTE 构建时间趋势查询
-        stats_query = f"""
-        WITH filtered_tests AS (
-            SELECT 
-                it.integrate_test_result,
-                {time_group} as time_period
-            FROM integrate_tests it
-            WHERE {where_clause}
-        ),
-        time_aggregates AS (
-            SELECT 
-                time_period,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN integrate_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN integrate_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM filtered_tests
-            GROUP BY time_period
-            ORDER BY time_period ASC
-        )
-        SELECT * FROM time_aggregates
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        time_stats_data = [dict(row._mapping) for row in result]
+        # 从小时预聚合表按北京时间汇总
+        time_stats_data = stats_engine.time_stats(start_dt, end_dt, interval)
         
         # 格式化返回数据
         formatted_stats = []
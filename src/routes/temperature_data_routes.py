@@ -4,6 +4,16 @@ import logging
 
 from src.extensions import db
 from src.models.temperature_data_model import TemperatureData
+from src.utils.pagination import paginate_query, CursorError
+from src.utils.projection import list_fields, apply_projection, serialize_page, FieldsError
+from src.utils.lookup import batch_lookup, BatchLookupError
+from src.utils.idempotency import (
+    request_client_id, find_by_client_id, flush_new_record, IdempotencyKeyError, REPLAYED_HEADERS,
+)
+from src.utils.ingest_queue import ingest_queue
+from src.utils.sn_search import filter_sn, parse_sn_match, SnMatchError
+from src.utils.downsample import parse_downsample_args, downsample_fields, DownsampleError
+from src.utils.temperature_stats import apply_run_stats, parse_stats_filters, StatsFilterError
 
 # 导入 require_auth 装饰器
 from src.auth.decorators import require_auth, require_role, require_permission
@@ -13,6 +23,9 @@ temperature_data_bp = Blueprint('temperature_data_bp', __name__, url_prefix='/ap
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 支持 ?max_points= 降采样的温度曲线字段
+TEMPERATURE_ARRAY_FIELDS = ('original_temperature', 'compensated_temperature')
+
 
 
 
@@ -32,10 +45,25 @@ def create_temperature_data():
         
         logger.info(f"Creating temperature data for product SN: {json_data['product_sn']}")
         
+        # 幂等键：重试的请求直接返回第一次写入的记录（异步写入模式下由队列去重，不查询数据库）
+        client_record_id = request_client_id(json_data)
+        existing = None if ingest_queue.enabled else find_by_client_id(TemperatureData, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        
         new_data = TemperatureData()
         populate_data_fields(new_data, json_data)
         
+        new_data.client_record_id = client_record_id
+        
+        # 异步写入模式：记录追加到本地队列后立即返回 202，由后台线程批量入库
+        if ingest_queue.enabled:
+            return ingest_queue.accepted_response(TemperatureData, new_data)
+        
         db.session.add(new_data)
+        existing = flush_new_record(TemperatureData, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
         db.session.commit()
         
         logger.info(f"Temperature data created successfully with ID: {new_data.id}")
@@ -71,9 +99,19 @@ def get_all_temperature_data():
         sort_by = request.args.get('sort_by', 'update_time')
         sort_order = request.args.get('sort_order', 'desc')
         
+        # 降采样（?max_points=N）时温度曲线也可以通过 fields 在列表中返回
+        max_points, downsample_method = parse_downsample_args()
+        
+        # 输出字段（?fields=a,b,c），大字段仅在详情接口返回
+        fields = list_fields(
+            TemperatureData, request.args.get('fields'),
+            allow_heavy=TEMPERATURE_ARRAY_FIELDS if max_points else ()
+        )
+        
         # 添加筛选支持
         product_sn = request.args.get('product_sn')
         temperature_compensation_enabled = request.args.get('temperature_compensation_enabled')
+        sn_match = parse_sn_match()
 
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
@@ -83,7 +121,7 @@ def get_all_temperature_data():
         
         # 应用筛选条件
         if product_sn:
-            query = query.filter(TemperatureData.product_sn.like(f'%{product_sn}%'))
+            query = filter_sn(query, TemperatureData.product_sn, product_sn, sn_match)
 
         # # 应用时间范围筛选（基于 create_time 字段）
         # if start_date:
@@ -128,31 +166,23 @@ def get_all_temperature_data():
             is_enabled = temperature_compensation_enabled.lower() in ['true', '1', 'yes']
             query = query.filter(TemperatureData.temperature_compensation_enabled == is_enabled)
         
-        # 应用排序
-        if hasattr(TemperatureData, sort_by):
-            if sort_order.lower() == 'desc':
-                query = query.order_by(getattr(TemperatureData, sort_by).desc())
-            else:
-                query = query.order_by(getattr(TemperatureData, sort_by).asc())
+        # 温度统计筛选（如 ?max_temp_gt=85），使用统计列上的索引
+        query = query.filter(*parse_stats_filters(TemperatureData))
         
-        # 分页查询
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # 排序与分页（支持 cursor 游标分页与 include_total=false）
+        query = apply_projection(query, TemperatureData, fields, sort_by)
+        items, pagination = paginate_query(query, TemperatureData, sort_by, sort_order, page, per_page)
+        
+        data = serialize_page(TemperatureData, items, fields)
+        for item in data:
+            downsample_fields(item, TEMPERATURE_ARRAY_FIELDS, max_points, downsample_method)
         
         return jsonify({
-            'data': [data.to_dict() for data in pagination.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'data': data,
+            'pagination': pagination
         })
+    except (CursorError, FieldsError, SnMatchError, DownsampleError, StatsFilterError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching temperature data: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -162,16 +192,37 @@ def get_all_temperature_data():
 
 
 
+@temperature_data_bp.route('/lookup', methods=['POST'])
+@require_auth()
+def lookup_temperature_data():
+    """
+    按 id 或 product_sn 批量获取温度数据记录（一次 IN 查询，已删除的记录视为不存在）
+    
+    请求体: {"ids": [...], "sns": [...]}，可选 ?fields=a,b,c
+    返回格式: {"data": {id: 记录}, "not_found": {"ids": [...], "sns": [...]}}
+    """
+    try:
+        return jsonify(batch_lookup(TemperatureData, 'product_sn', request.get_json(silent=True), request.args.get('fields')))
+    except (BatchLookupError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up temperature data: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @temperature_data_bp.route('/<string:data_id>', methods=['GET'])
 @require_auth()
 def get_temperature_data(data_id):
-    """获取特定ID的温度数据记录"""
+    """获取特定ID的温度数据记录（?max_points=N 时温度曲线降采样到不超过 N 个点）"""
     try:
+        max_points, downsample_method = parse_downsample_args()
+        
         # 使用 TemperatureData.query 会自动过滤 is_deleted=False
         data = TemperatureData.query.filter_by(id=data_id).first()
         if data is None:
             return jsonify({'error': 'Temperature data record not found'}), 404
-        return jsonify(data.to_dict())
+        return jsonify(downsample_fields(data.to_dict(), TEMPERATURE_ARRAY_FIELDS, max_points, downsample_method))
+    except DownsampleError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching temperature data {data_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -361,6 +412,10 @@ def populate_data_fields(data, json_data, is_update=False):
     
     # 备注
     data.remark = json_data.get('remark', data.remark if is_update else None)
+    
+    # 温度数组或采样间隔变化时重新计算统计列
+    if not is_update or any(name in json_data for name in ('original_temperature', 'compensated_temperature', 'sample_interval')):
+        apply_run_stats(data)
 
 def validate_required_fields(json_data):
     """验证必填字段"""
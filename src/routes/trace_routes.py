@@ -0,0 +1,73 @@
+from flask import Blueprint, jsonify, request
+import logging
+
+from src.utils.trace import collect_traces, summarize, MAX_TRACE_SNS
+
+# 导入 require_auth 装饰器
+from src.auth.decorators import require_auth
+
+trace_bp = Blueprint('trace_bp', __name__, url_prefix='/api/trace')
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+@trace_bp.route('/<string:sn>', methods=['GET'])
+@require_auth()
+def get_trace(sn):
+    """
+    单个产品/板子序列号的全工站追溯
+    
+    返回 WiFi板测试、驱动板测试、集成测试、温度数据、WiFi测试日志的合并时间线（按 create_time 升序）：
+    {
+        "sn": "...",
+        "counts": {"wifi_board_test": 1, ...},
+        "timeline": [{"type": "...", "id": "...", "time": "...", "result": "...", "record": {...}}]
+    }
+    """
+    try:
+        timeline = collect_traces([sn])[sn]
+        if not timeline:
+            return jsonify({'error': 'No records found for this SN'}), 404
+        return jsonify({'sn': sn, 'counts': summarize(timeline), 'timeline': timeline})
+    except Exception as e:
+        logger.error(f"Error tracing SN {sn}: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@trace_bp.route('', methods=['POST'])
+@require_auth()
+def batch_trace():
+    """
+    批量追溯，请求体: {"sns": ["SN1", "SN2", ...]}（最多 MAX_TRACE_SNS 个）
+    
+    返回格式:
+    {
+        "results": {"SN1": {"counts": {...}, "timeline": [...]}, ...},
+        "not_found": ["SN2"]
+    }
+    """
+    try:
+        json_data = request.get_json(silent=True)
+        sns = json_data.get('sns') if isinstance(json_data, dict) else None
+        if not isinstance(sns, list) or not sns:
+            return jsonify({'error': 'sns must be a non-empty list'}), 400
+        if len(sns) > MAX_TRACE_SNS:
+            return jsonify({'error': f'At most {MAX_TRACE_SNS} SNs per request'}), 400
+        if not all(isinstance(sn, str) and sn for sn in sns):
+            return jsonify({'error': 'Each SN must be a non-empty string'}), 400
+        
+        traces = collect_traces(sns)
+        results = {}
+        not_found = []
+        for sn, timeline in traces.items():
+            if timeline:
+                results[sn] = {'counts': summarize(timeline), 'timeline': timeline}
+            else:
+                not_found.append(sn)
+        
+        logger.info(f"Traced {len(traces)} SNs, {len(not_found)} without records")
+        return jsonify({'results': results, 'not_found': not_found})
+    except Exception as e:
+        logger.error(f"Error tracing SNs: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
@@ -1,18 +1,37 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import String, Text
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 import logging
 import json
-from sqlalchemy import func, case, text  # 添加text导入
 
 from src.extensions import db
 from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.models.board_summary_model import BoardSummary, load_tests
+from src.utils.pagination import paginate_query, CursorError, parse_include_total
+from src.utils.stats_cache import cached_stats, bump_data_version
+from src.utils.stats_engine import get_stats_engine
+from src.utils.sn_search import filter_sn, parse_sn_match, SnMatchError
+from src.utils.projection import list_fields, apply_projection, serialize_page, FieldsError
+from src.utils.lookup import batch_lookup, BatchLookupError
+from src.utils.idempotency import (
+    request_client_id, record_client_id, find_by_client_id, existing_client_ids,
+    flush_new_record, IdempotencyKeyError, REPLAYED_HEADERS,
+)
+from src.utils.ingest_queue import ingest_queue
+from src.utils.export import stream_export, parse_export_format, parse_export_gzip, ExportError
 from src.auth.decorators import require_auth, require_role
+from src.utils.bulk_insert import model_to_row, insert_rows
 
 wifi_board_tests_bp = Blueprint('wifi_board_tests_bp', __name__, url_prefix='/api/wifi_board_tests')
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 统计接口共用的查询引擎
+stats_engine = get_stats_engine('wifi')
+
 @wifi_board_tests_bp.route('', methods=['POST'])
 def create_wifi_board_test():
     """创建新的WiFi板测试记录"""
@@ -28,10 +47,28 @@ def create_wifi_board_test():
         
         # logger.info(f"Creating WiFi board test for SN: {json_data['wifi_board_sn']}")
         
+        # 幂等键：重试的请求直接返回第一次写入的记录（异步写入模式下由队列去重，不查询数据库）
+        client_record_id = request_client_id(json_data)
+        existing = None if ingest_queue.enabled else find_by_client_id(WifiBoardTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        
         new_test = WifiBoardTest()
         populate_test_fields(new_test, json_data)
         
+        new_test.client_record_id = client_record_id
+        
+        # 异步写入模式：记录追加到本地队列后立即返回 202，由后台线程批量入库
+        if ingest_queue.enabled:
+            return ingest_queue.accepted_response(WifiBoardTest, new_test)
+        
         db.session.add(new_test)
+        existing = flush_new_record(WifiBoardTest, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        BoardSummary.record_tests('wifi', [new_test])
+        TestHourlyRollup.record_tests('wifi', [new_test])
+        bump_data_version(WifiBoardTest.__tablename__)
         db.session.commit()
         
         logger.info(f"WiFi board test created successfully with ID: {new_test.id}")
@@ -51,6 +88,112 @@ def create_wifi_board_test():
 
 
 
+@wifi_board_tests_bp.route('/batch', methods=['POST'])
+def create_wifi_board_tests_batch():
+    """
+    批量创建WiFi板测试记录（工位积压数据补传）
+    
+    请求体: 记录数组，或 {"records": [...]}，单次最多 BATCH_INGEST_MAX_RECORDS 条
+    单条记录校验失败不影响其它记录，通过校验的记录在一个事务中以多行 INSERT 写入
+    记录可带 client_record_id 幂等键：已写入过（或在本批中重复）的记录不再插入，返回已有记录的 id
+    
+    返回格式:
+    {
+        "created_count": 成功条数,
+        "duplicate_count": 重复条数,
+        "error_count": 失败条数,
+        "results": [
+            {"index": 0, "status": "created", "id": "..."},
+            {"index": 1, "status": "duplicate", "id": "..."},
+            {"index": 2, "status": "error", "error": "wifi_board_sn is required"}
+        ]
+    }
+    """
+    try:
+        json_data = request.get_json()
+        records = json_data.get('records') if isinstance(json_data, dict) else json_data
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'A non-empty array of records is required'}), 400
+        
+        max_records = current_app.config.get('BATCH_INGEST_MAX_RECORDS', 500)
+        if len(records) > max_records:
+            return jsonify({'error': f'Too many records in one batch (max {max_records})'}), 400
+        
+        # 一次 IN 查询取回本批中已写入过的幂等键
+        seen = existing_client_ids(
+            WifiBoardTest, [item.get('client_record_id') for item in records if isinstance(item, dict)]
+        )
+        
+        results = []
+        rows = []
+        duplicate_count = 0
+        for index, item in enumerate(records):
+            if not isinstance(item, dict):
+                results.append({'index': index, 'status': 'error', 'error': 'Record must be an object'})
+                continue
+            
+            try:
+                error, _ = validate_required_fields(item)
+                if error:
+                    results.append({'index': index, 'status': 'error', 'error': error['error']})
+                    continue
+                
+                client_record_id = record_client_id(item)
+                if client_record_id in seen:
+                    duplicate_count += 1
+                    results.append({'index': index, 'status': 'duplicate', 'id': seen[client_record_id]})
+                    continue
+                new_test = WifiBoardTest()
+                populate_test_fields(new_test, item)
+                new_test.client_record_id = client_record_id
+            except ValueError as e:
+                results.append({'index': index, 'status': 'error', 'error': f'Validation error: {str(e)}'})
+                continue
+            except Exception as e:
+                # 单条记录的意外错误只影响该条，不让整批失败
+                logger.error(f"Unexpected error validating WiFi board test batch record {index}: {str(e)}")
+                results.append({'index': index, 'status': 'error', 'error': f'Invalid record: {str(e)}'})
+                continue
+            
+            row = model_to_row(new_test)
+            rows.append(row)
+            if client_record_id:
+                seen[client_record_id] = row['id']
+            results.append({'index': index, 'status': 'created', 'id': row['id']})
+        
+        if rows:
+            try:
+                insert_rows(WifiBoardTest, rows)
+            except IntegrityError:
+                # 并发重试的同一批数据先一步写入了部分幂等键：整批回滚，由客户端重试（重试时这些记录会标记为 duplicate）
+                db.session.rollback()
+                return jsonify({'error': 'Conflicting client_record_id written concurrently, please retry'}), 409
+            inserted = load_tests('wifi', [row['id'] for row in rows])
+            BoardSummary.record_tests('wifi', inserted)
+            TestHourlyRollup.record_tests('wifi', inserted)
+            bump_data_version(WifiBoardTest.__tablename__)
+            db.session.commit()
+        
+        created_count = len(rows)
+        error_count = len(results) - created_count - duplicate_count
+        logger.info(f"WiFi board test batch processed: {created_count} created, "
+                    f"{duplicate_count} duplicate, {error_count} failed")
+        return jsonify({
+            'created_count': created_count,
+            'duplicate_count': duplicate_count,
+            'error_count': error_count,
+            'results': results
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Unexpected error creating WiFi board test batch: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+
+
+
 @require_auth()
 @wifi_board_tests_bp.route('', methods=['GET'])
 def get_all_wifi_board_tests():
@@ -64,84 +207,78 @@ def get_all_wifi_board_tests():
         sort_by = request.args.get('sort_by', 'update_time')
         sort_order = request.args.get('sort_order', 'desc')
         
-        # 普通筛选参数
-        wifi_board_sn = request.args.get('wifi_board_sn')
-        general_test_result = request.args.get('general_test_result')
-        
-        # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # 使用 WifiBoardTest.query 会自动过滤 is_deleted=False
-        query = WifiBoardTest.query
-        
-        # 应用时间范围筛选（基于 create_time 字段）
-        if start_date:
-            try:
-                start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                # 如果没有时区信息，假设是北京时间，转换为UTC
-                if start_dt.tzinfo is None:
-                    # 假设输入是北京时间(UTC+8)，转换为UTC
-                    start_dt = start_dt - timedelta(hours=8)
-                query = query.filter(WifiBoardTest.create_time >= start_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
+        # 输出字段（?fields=a,b,c），大字段仅在详情接口返回
+        fields = list_fields(WifiBoardTest, request.args.get('fields'))
         
-        if end_date:
-            try:
-                end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
-                # 如果是日期格式，包含当天的所有记录
-                if 'T' not in end_date:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                # 如果没有时区信息，假设是北京时间，转换为UTC
-                if end_dt.tzinfo is None:
-                    # 假设输入是北京时间(UTC+8)，转换为UTC
-                    end_dt = end_dt - timedelta(hours=8)
-                query = query.filter(WifiBoardTest.create_time <= end_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-        
-        # 应用其它筛选条件
-        if wifi_board_sn:
-            query = query.filter(WifiBoardTest.wifi_board_sn.like(f'%{wifi_board_sn}%'))
-        if general_test_result:
-            query = query.filter(WifiBoardTest.general_test_result == general_test_result)
-        
-        # 应用排序
-        if hasattr(WifiBoardTest, sort_by):
-            if sort_order.lower() == 'desc':
-                query = query.order_by(getattr(WifiBoardTest, sort_by).desc())
-            else:
-                query = query.order_by(getattr(WifiBoardTest, sort_by).asc())
+        # 筛选条件（与导出接口共用）
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
         
-        # 分页查询
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # 排序与分页（支持 cursor 游标分页与 include_total=false）
+        query = apply_projection(query, WifiBoardTest, fields, sort_by)
+        items, pagination = paginate_query(query, WifiBoardTest, sort_by, sort_order, page, per_page)
         
         return jsonify({
-            'data': [test.to_dict() for test in pagination.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            },
+            'data': serialize_page(WifiBoardTest, items, fields),
+            'pagination': pagination,
             'filters': {
-                'start_date': start_date,
-                'end_date': end_date,
-                'wifi_board_sn': wifi_board_sn,
-                'general_test_result': general_test_result
+                'start_date': request.args.get('start_date'),
+                'end_date': request.args.get('end_date'),
+                'wifi_board_sn': request.args.get('wifi_board_sn'),
+                'general_test_result': request.args.get('general_test_result')
             }
         })
+    except (CursorError, FieldsError, SnMatchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching WiFi board tests: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@wifi_board_tests_bp.route('/export', methods=['GET'])
+@require_auth()
+def export_wifi_board_tests():
+    """
+    流式导出WiFi板测试记录（大批量导出，替代逐页读取列表接口）
+    
+    查询参数:
+    - start_date / end_date / wifi_board_sn / sn_match / general_test_result: 与列表接口相同的筛选条件
+    - fields: 导出字段 (默认同列表接口)
+    - format: 导出格式 (csv, ndjson，默认csv)
+    - gzip: 是否压缩输出 (true/false，默认false)
+    """
+    try:
+        fields = list_fields(WifiBoardTest, request.args.get('fields'))
+        fmt = parse_export_format()
+        
+        query, error = build_list_query()
+        if error:
+            return jsonify(error), 400
+        
+        return stream_export(query, WifiBoardTest, fields, fmt, parse_export_gzip(), filename='wifi_board_tests')
+    except (FieldsError, SnMatchError, ExportError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting WiFi board tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@wifi_board_tests_bp.route('/lookup', methods=['POST'])
+@require_auth()
+def lookup_wifi_board_tests():
+    """
+    按 id 或 wifi_board_sn 批量获取WiFi板测试记录（一次 IN 查询，已删除的记录视为不存在）
+    
+    请求体: {"ids": [...], "sns": [...]}，可选 ?fields=a,b,c
+    返回格式: {"data": {id: 记录}, "not_found": {"ids": [...], "sns": [...]}}
+    """
+    try:
+        return jsonify(batch_lookup(WifiBoardTest, 'wifi_board_sn', request.get_json(silent=True), request.args.get('fields')))
+    except (BatchLookupError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up wifi board tests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @require_auth()
 @wifi_board_tests_bp.route('/<string:test_id>', methods=['GET'])
 def get_wifi_board_test(test_id):
@@ -172,7 +309,13 @@ def update_wifi_board_test(test_id):
         
         logger.info(f"Updating WiFi board test ID: {test_id}")
         
+        old_result = test.general_test_result
+        old_sn = test.wifi_board_sn
         populate_test_fields(test, json_data, is_update=True)
+        BoardSummary.refresh('wifi', [old_sn, test.wifi_board_sn])
+        if not test.is_deleted:
+            TestHourlyRollup.record_result_change('wifi', test.create_time, old_result, test.general_test_result)
+        bump_data_version(WifiBoardTest.__tablename__)
         
         db.session.commit()
         
@@ -210,6 +353,9 @@ def delete_wifi_board_test(test_id):
         # 执行软删除
         test.is_deleted = True
         test.delete_time = datetime.now(timezone.utc)
+        BoardSummary.refresh('wifi', [test.wifi_board_sn])
+        TestHourlyRollup.record_tests('wifi', [test], delta=-1)
+        bump_data_version(WifiBoardTest.__tablename__)
         
         db.session.commit()
         
@@ -239,6 +385,7 @@ def delete_wifi_board_test(test_id):
 
 @require_auth()
 @wifi_board_tests_bp.route('/stats', methods=['GET'])
+@cached_stats(WifiBoardTest.__tablename__)
 def get_wifi_board_test_stats():
     """
     获取WiFi板测试统计信息
@@ -246,7 +393,8 @@ def get_wifi_board_test_stats():
     支持的查询参数:
     - start_date: 开始日期 (格式: YYYY-MM-DD 或 ISO格式)
     - end_date: 结束日期 (格式: YYYY-MM-DD 或 ISO格式) 
-    - wifi_board_sn: WiFi板序列号 (支持模糊匹配)
+    - wifi_board_sn: WiFi板序列号 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     
     返回格式:
     {
@@ -263,10 +411,10 @@ def get_wifi_board_test_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         wifi_board_sn = request.args.get('wifi_board_sn')
+        sn_match = parse_sn_match()
         general_test_result = request.args.get('general_test_result')
 
-        # 构建基础查询，自动过滤软删除记录
-        query = WifiBoardTest.query.filter(WifiBoardTest.is_deleted == False)
+        start_dt = end_dt = None
         
         # 应用时间范围筛选（基于create_time字段）
         if start_date:
@@ -277,7 +425,6 @@ def get_wifi_board_test_stats():
                 if start_dt.tzinfo is None:
                     # 假设输入是北京时间(UTC+8)，转换为UTC
                     start_dt = start_dt - timedelta(hours=8)
-                query = query.filter(WifiBoardTest.create_time >= start_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -291,43 +438,15 @@ def get_wifi_board_test_stats():
                 if end_dt.tzinfo is None:
                     # 假设输入是北京时间(UTC+8)，转换为UTC
                     end_dt = end_dt - timedelta(hours=8)
-                query = query.filter(WifiBoardTest.create_time <= end_dt)
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
         
-        # 应用WiFi板序列号筛选（模糊匹配）
-        if wifi_board_sn:
-            query = query.filter(WifiBoardTest.wifi_board_sn.like(f'%{wifi_board_sn}%'))
-
-        if general_test_result:
-            query = query.filter(WifiBoardTest.general_test_result == general_test_result)
-
-        # 使用单次聚合查询获取所有统计数据，提高查询效率
-
-        
-        # 一次查询同时获取总数和各状态的统计
-        stats_result = db.session.query(
-            func.count(WifiBoardTest.id).label('total_count'),
-            func.sum(case((WifiBoardTest.general_test_result == 'pass', 1), else_=0)).label('success_count'),
-            func.sum(case((WifiBoardTest.general_test_result == 'fail', 1), else_=0)).label('fail_count'),
-        ).filter(query.whereclause if query.whereclause is not None else True).one()
-        
-        # 获取详细的状态分组统计（用于breakdown）
-        breakdown_stats = db.session.query(
-            WifiBoardTest.general_test_result,
-            func.count(WifiBoardTest.id).label('count')
-        ).filter(query.whereclause if query.whereclause is not None else True
-        ).group_by(WifiBoardTest.general_test_result).all()
-        
-        # 转换结果为字典格式
-        total_count = int(stats_result.total_count or 0)
-        success_count = int(stats_result.success_count or 0)
-        fail_count = int(stats_result.fail_count or 0)
-        
-        # 构建详细分组统计
-        breakdown = {}
-        for result, count in breakdown_stats:
-            breakdown[result or 'unknown'] = int(count)
+        # 按结果分组的单次聚合查询，同时得到总数、成功/失败数和 breakdown
+        stats = stats_engine.test_stats(start_dt, end_dt, wifi_board_sn, general_test_result, sn_match)
+        total_count = stats['total_count']
+        success_count = stats['success_count']
+        fail_count = stats['fail_count']
+        breakdown = stats['breakdown']
         
         # 计算其他状态的记录数
         other_count = total_count - success_count - fail_count
@@ -349,6 +468,8 @@ def get_wifi_board_test_stats():
         logger.info(f"WiFi board test stats query completed. Total: {total_count}, Success: {success_count}, Fail: {fail_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching WiFi board test stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -375,6 +496,7 @@ def get_wifi_board_test_stats():
 
 @require_auth()
 @wifi_board_tests_bp.route('/boards-stats', methods=['GET'])
+@cached_stats(WifiBoardTest.__tablename__)
 def get_wifi_board_stats():
     """
     获取WiFi板子维度的统计信息
@@ -411,15 +533,11 @@ def get_wifi_board_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # 构建时间筛选条件
-        time_filter = ""
-        params = {}
+        start_dt = end_dt = None
         
         if start_date:
             try:
                 start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
-                time_filter += " AND create_time >= :start_date"
-                params['start_date'] = start_dt
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format'}), 400
         
@@ -428,73 +546,11 @@ def get_wifi_board_stats():
                 end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
                 if 'T' not in end_date:
                     end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                time_filter += " AND create_time <= :end_date"
-                params['end_date'] = end_dt
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format'}), 400
         
-        # 1. 测试记录维度统计
-        test_stats_sql = text(f"""
-        SELECT 
-            COUNT(*) as total_tests,
-            SUM(CASE WHEN general_test_result = 'pass' THEN 1 ELSE 0 END) as success_tests,
-            SUM(CASE WHEN general_test_result = 'fail' THEN 1 ELSE 0 END) as fail_tests
-        FROM wifi_board_tests 
-        WHERE is_deleted = 0 {time_filter}
-        """)
-        
-        test_result = db.session.execute(test_stats_sql, params).fetchone()
-        
-        # 2. 板子维度统计 - 使用窗口函数获取每个板子的最新测试结果
-        board_stats_sql = text(f"""
-        WITH latest_tests AS (
-            SELECT 
-                wifi_board_sn,
-                general_test_result,
-                ROW_NUMBER() OVER (PARTITION BY wifi_board_sn ORDER BY create_time DESC) as rn
-            FROM wifi_board_tests 
-            WHERE is_deleted = 0 {time_filter}
-        ),
-        board_history AS (
-            SELECT 
-                wifi_board_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN general_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN general_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM wifi_board_tests 
-            WHERE is_deleted = 0 {time_filter}
-            GROUP BY wifi_board_sn
-        )
-        SELECT 
-            COUNT(DISTINCT l.wifi_board_sn) as total_boards,
-            SUM(CASE WHEN l.general_test_result = 'pass' THEN 1 ELSE 0 END) as success_boards,
-            SUM(CASE WHEN l.general_test_result = 'fail' THEN 1 ELSE 0 END) as fail_boards,
-            -- 一直成功的板子：最新是成功且从未失败
-            SUM(CASE 
-                WHEN l.general_test_result = 'pass' AND h.fail_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_success_boards,
-            -- 最终成功的板子：最新是成功但有过失败
-            SUM(CASE 
-                WHEN l.general_test_result = 'pass' AND h.fail_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_success_boards,
-            -- 一直失败的板子：最新是失败且从未成功
-            SUM(CASE 
-                WHEN l.general_test_result = 'fail' AND h.success_count = 0 
-                THEN 1 ELSE 0 
-            END) as always_fail_boards,
-            -- 最终失败的板子：最新是失败但有过成功
-            SUM(CASE 
-                WHEN l.general_test_result = 'fail' AND h.success_count > 0 
-                THEN 1 ELSE 0 
-            END) as final_fail_boards
-        FROM latest_tests l
-        JOIN board_history h ON l.wifi_board_sn = h.wifi_board_sn
-        WHERE l.rn = 1
-        """)
-        
-        board_result = db.session.execute(board_stats_sql, params).fetchone()
+        # 未按时间筛选时读取板子汇总表，否则单次窗口查询同时得到测试维度与板子维度统计
+        test_result = board_result = stats_engine.board_stats(start_dt, end_dt)
         
         # 构建返回结果
         response_data = {
@@ -553,6 +609,7 @@ def get_wifi_board_stats():
 
 @require_auth()
 @wifi_board_tests_bp.route('/time-stats', methods=['GET'])
+@cached_stats(WifiBoardTest.__tablename__)
 def get_wifi_board_time_stats():
     """
     获取WiFi板测试时间趋势统计信息
@@ -609,46 +666,8 @@ def get_wifi_board_time_stats():
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD format'}), 400
 
-        # 构建筛选条件
-        conditions = ["wbt.is_deleted = FALSE"]
-        conditions.append(f"wbt.create_time >= '{start_dt.isoformat()}'")
-        conditions.append(f"wbt.create_time <= '{end_dt.isoformat()}'")
-
-        # 根据间隔类型设置时间格式化（转换回北京时间显示）
-        interval_formats = {
-            'day': "DATE_FORMAT(CONVERT_TZ(wbt.create_time, '+00:00', '+08:00'), '%Y-%m-%d')",
-            'week': "DATE_FORMAT(DATE_SUB(CONVERT_TZ(wbt.create_time, '+00:00', '+08:00'), INTERVAL WEEKDAY(CONVERT_TZ(wbt.create_time, '+00:00', '+08:00')) DAY), '%Y-%m-%d')",
-            'month': "DATE_FORMAT(CONVERT_TZ(wbt.create_time, '+00:00', '+08:00'), '%Y-%m-01')"
-        }
-        
-        time_group = interval_formats[interval]
-        where_clause = " AND ".join(conditions)
-        
-        # 使用 CTE 构建时间趋势查询
-        stats_query = f"""
-        WITH filtered_tests AS (
-            SELECT 
-                wbt.general_test_result,
-                {time_group} as time_period
-            FROM wifi_board_tests wbt
-            WHERE {where_clause}
-        ),
-        time_aggregates AS (
-            SELECT 
-                time_period,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN general_test_result = 'pass' THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN general_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM filtered_tests
-            GROUP BY time_period
-            ORDER BY time_period ASC
-        )
-        SELECT * FROM time_aggregates
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        time_stats_data = [dict(row._mapping) for row in result]
+        # 从小时预聚合表按北京时间汇总
+        time_stats_data = stats_engine.time_stats(start_dt, end_dt, interval)
         
         # 格式化返回数据
         formatted_stats = []
@@ -714,6 +733,7 @@ def get_wifi_board_time_stats():
 
 @require_auth()
 @wifi_board_tests_bp.route('/sn-stats', methods=['GET'])
+@cached_stats(WifiBoardTest.__tablename__)
 def get_wifi_board_sn_stats():
     """
     获取WiFi板测试的序列号统计信息 (板子维度)
@@ -722,7 +742,8 @@ def get_wifi_board_sn_stats():
     查询参数:
     - start_date: 开始日期 (YYYY-MM-DD，北京时间)
     - end_date: 结束日期 (YYYY-MM-DD，北京时间)
-    - wifi_board_sn: WiFi板序列号筛选 (部分匹配)
+    - wifi_board_sn: WiFi板序列号筛选 (默认前缀匹配)
+    - sn_match: 序列号匹配方式 (prefix, exact, contains，默认prefix)
     - latest_result: 筛选最新测试结果 (pass/fail)
     - sort_by: 排序字段 (wifi_board_sn, total_tests, pass_count, fail_count, pass_rate, latest_test_time, first_test_time, latest_result)
     - sort_order: 排序方向 (asc, desc，默认desc)
@@ -757,11 +778,13 @@ def get_wifi_board_sn_stats():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         wifi_board_sn = request.args.get('wifi_board_sn')
+        sn_match = parse_sn_match()
         latest_result = request.args.get('latest_result')
         sort_by = request.args.get('sort_by', 'total_tests')
         sort_order = request.args.get('sort_order', 'desc').lower()
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 10)), 100)
+        include_total = parse_include_total()  # 无限滚动场景可传 include_total=false 跳过总数
 
         # 验证排序参数
         valid_sort_fields = {
@@ -780,8 +803,7 @@ def get_wifi_board_sn_stats():
         
         if sort_order not in ['asc', 'desc']:
             sort_order = 'desc'
-        # 构建 CTE 查询以优化性能（时间筛选条件，不包含latest_result）
-        cte_conditions = ["wbt.is_deleted = FALSE"]
+        start_dt = end_dt = None
         
         # 时间范围条件（北京时间转UTC）
         if start_date:
@@ -790,7 +812,6 @@ def get_wifi_board_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if start_dt.tzinfo is None:
                     start_dt = start_dt - timedelta(hours=8)
-                cte_conditions.append(f"wbt.create_time >= '{start_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}), 400
         
@@ -802,99 +823,13 @@ def get_wifi_board_sn_stats():
                 # 北京时间转UTC（减8小时）
                 if end_dt.tzinfo is None:
                     end_dt = end_dt - timedelta(hours=8)
-                cte_conditions.append(f"wbt.create_time <= '{end_dt.isoformat()}'")
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}), 400
-        
-        # 序列号筛选条件
-        if wifi_board_sn:
-            cte_conditions.append(f"wbt.wifi_board_sn LIKE '%{wifi_board_sn}%'")
 
-        # 构建CTE查询
-        cte_where_clause = " AND ".join(cte_conditions)
-        
-        # 板子维度统计：每块板子一行数据，基于最新测试结果筛选
-        stats_query = f"""
-        WITH board_all_tests AS (
-            SELECT 
-                wbt.wifi_board_sn,
-                wbt.general_test_result,
-                wbt.create_time,
-                CONVERT_TZ(wbt.create_time, '+00:00', '+08:00') as local_create_time,
-                ROW_NUMBER() OVER (PARTITION BY wbt.wifi_board_sn ORDER BY wbt.create_time DESC) as rn
-            FROM wifi_board_tests wbt
-            WHERE {cte_where_clause}
-        ),
-        board_latest_result AS (
-            SELECT 
-                wifi_board_sn,
-                general_test_result as latest_result,
-                local_create_time as latest_test_time
-            FROM board_all_tests
-            WHERE rn = 1
-        ),
-        board_stats AS (
-            SELECT 
-                bat.wifi_board_sn,
-                COUNT(*) as total_tests,
-                SUM(CASE WHEN bat.general_test_result = 'pass' THEN 1 ELSE 0 END) as pass_count,
-                SUM(CASE WHEN bat.general_test_result = 'fail' THEN 1 ELSE 0 END) as fail_count,
-                MIN(bat.local_create_time) as first_test_time,
-                ROUND(
-                    (SUM(CASE WHEN bat.general_test_result = 'pass' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)), 
-                    2
-                ) as pass_rate
-            FROM board_all_tests bat
-            WHERE bat.wifi_board_sn IS NOT NULL AND bat.wifi_board_sn != ''
-            GROUP BY bat.wifi_board_sn
-        )
-        SELECT 
-            bs.wifi_board_sn,
-            bs.total_tests,
-            bs.pass_count,
-            bs.fail_count,
-            bs.pass_rate,
-            bs.first_test_time,
-            blr.latest_test_time,
-            blr.latest_result
-        FROM board_stats bs
-        JOIN board_latest_result blr ON bs.wifi_board_sn = blr.wifi_board_sn
-        WHERE 1=1 {" AND blr.latest_result = '" + latest_result + "'" if latest_result else ""}
-        ORDER BY {valid_sort_fields[sort_by]} {sort_order.upper()}
-        LIMIT {per_page} OFFSET {(page - 1) * per_page}
-        """
-        
-        # 执行统计查询
-        result = db.session.execute(text(stats_query))
-        sn_stats_data = [dict(row._mapping) for row in result]
-        
-        # 获取总数统计（用于分页）- 基于板子维度和最新结果筛选
-        count_query = f"""
-        WITH board_all_tests AS (
-            SELECT 
-                wbt.wifi_board_sn,
-                wbt.general_test_result,
-                wbt.create_time,
-                ROW_NUMBER() OVER (PARTITION BY wbt.wifi_board_sn ORDER BY wbt.create_time DESC) as rn
-            FROM wifi_board_tests wbt
-            WHERE {cte_where_clause}
-        ),
-        board_latest_result AS (
-            SELECT 
-                wifi_board_sn,
-                general_test_result as latest_result
-            FROM board_all_tests
-            WHERE rn = 1
-              AND wifi_board_sn IS NOT NULL 
-              AND wifi_board_sn != ''
+        # 未按时间筛选时读取板子汇总表，否则按时间范围执行窗口统计；当前页与总数同一条语句取得
+        sn_stats_data, total_board_count, has_next = stats_engine.sn_stats(
+            start_dt, end_dt, wifi_board_sn, latest_result, sort_by, sort_order, page, per_page, include_total, sn_match
         )
-        SELECT COUNT(*) as total_board_count 
-        FROM board_latest_result
-        WHERE 1=1 {" AND latest_result = '" + latest_result + "'" if latest_result else ""}
-        """
-        
-        count_result = db.session.execute(text(count_query))
-        total_board_count = count_result.scalar()
         
         # 格式化返回数据
         formatted_stats = []
@@ -911,7 +846,7 @@ def get_wifi_board_sn_stats():
             })
         
         # 构建分页信息
-        total_pages = (total_board_count + per_page - 1) // per_page
+        total_pages = (total_board_count + per_page - 1) // per_page if total_board_count is not None else None
         
         response_data = {
             'sn_stats': formatted_stats,
@@ -919,7 +854,8 @@ def get_wifi_board_sn_stats():
                 'page': page,
                 'per_page': per_page,
                 'total': total_board_count,
-                'pages': total_pages
+                'pages': total_pages,
+                'has_next': has_next
             },
             'filters': {
                 'start_date': start_date,
@@ -934,6 +870,8 @@ def get_wifi_board_sn_stats():
         logger.info(f"WiFi board SN stats query completed. Found {len(formatted_stats)} board records, total boards: {total_board_count}")
         return jsonify(response_data)
         
+    except SnMatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching WiFi board SN stats: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -956,6 +894,58 @@ def get_wifi_board_sn_stats():
 
 
 # 辅助函数
+def build_list_query():
+    """
+    按列表接口的筛选参数（时间范围、序列号、测试结果）构建查询，列表与导出接口共用。
+    返回 (query, error)，日期格式无效时 error 为错误信息
+    """
+    # 普通筛选参数
+    wifi_board_sn = request.args.get('wifi_board_sn')
+    sn_match = parse_sn_match()
+    general_test_result = request.args.get('general_test_result')
+    
+    # 时间范围筛选参数（支持 YYYY-MM-DD 或 ISO 格式）
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    # 使用 WifiBoardTest.query 会自动过滤 is_deleted=False
+    query = WifiBoardTest.query
+    
+    # 应用时间范围筛选（基于 create_time 字段）
+    if start_date:
+        try:
+            start_dt = parse_datetime(start_date) if 'T' in start_date else datetime.strptime(start_date, '%Y-%m-%d')
+            # 如果没有时区信息，假设是北京时间，转换为UTC
+            if start_dt.tzinfo is None:
+                # 假设输入是北京时间(UTC+8)，转换为UTC
+                start_dt = start_dt - timedelta(hours=8)
+            query = query.filter(WifiBoardTest.create_time >= start_dt)
+        except ValueError:
+            return None, {'error': 'Invalid start_date format. Use YYYY-MM-DD or ISO format'}
+    
+    if end_date:
+        try:
+            end_dt = parse_datetime(end_date) if 'T' in end_date else datetime.strptime(end_date, '%Y-%m-%d')
+            # 如果是日期格式，包含当天的所有记录
+            if 'T' not in end_date:
+                end_dt = end_dt.replace(hour=23, minute=59, second=59)
+            # 如果没有时区信息，假设是北京时间，转换为UTC
+            if end_dt.tzinfo is None:
+                # 假设输入是北京时间(UTC+8)，转换为UTC
+                end_dt = end_dt - timedelta(hours=8)
+            query = query.filter(WifiBoardTest.create_time <= end_dt)
+        except ValueError:
+            return None, {'error': 'Invalid end_date format. Use YYYY-MM-DD or ISO format'}
+    
+    # 应用其它筛选条件
+    if wifi_board_sn:
+        query = filter_sn(query, WifiBoardTest.wifi_board_sn, wifi_board_sn, sn_match)
+    if general_test_result:
+        query = query.filter(WifiBoardTest.general_test_result == general_test_result)
+
+    return query, None
+
+
 def parse_datetime(date_str):
     """解析日期时间字符串"""
     if not date_str:
@@ -1018,11 +1008,23 @@ def populate_test_fields(test, json_data, is_update=False):
     test.hostname = json_data.get('hostname', test.hostname if is_update else None)
     test.app_version = json_data.get('app_version', test.app_version if is_update else '1.0.0')
 
+# 直接取自请求体的字符串字段（不含由数组转换而来的 Text 字段和服务端生成的字段）
+STRING_FIELDS = tuple(
+    column.key for column in WifiBoardTest.__table__.columns
+    if isinstance(column.type, String) and not isinstance(column.type, Text)
+    and column.key not in ('id', 'client_record_id')
+)
+
+
 def validate_required_fields(json_data):
-    """验证必填字段"""
+    """验证必填字段和字符串字段类型"""
     if 'wifi_board_sn' not in json_data or not json_data['wifi_board_sn']:
         return {'error': 'wifi_board_sn is required'}, 400
     
+    for field in STRING_FIELDS:
+        if json_data.get(field) is not None and not isinstance(json_data[field], str):
+            return {'error': f'{field} must be a string'}, 400
+    
     if len(json_data['wifi_board_sn']) > 32:
         return {'error': 'wifi_board_sn too long (max 32 characters)'}, 400
     
@@ -1,9 +1,24 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
 from datetime import datetime, timezone
+import gzip
+import json
 import logging
+import zlib
 
 from src.extensions import db
 from src.models.wifi_test_log_model import WifiTestLog
+from src.utils.pagination import paginate_query, CursorError
+from src.utils.projection import list_fields, apply_projection, serialize_page, FieldsError
+from src.utils.lookup import batch_lookup, BatchLookupError
+from src.utils.idempotency import (
+    request_client_id, record_client_id, find_by_client_id, existing_client_ids,
+    flush_new_record, IdempotencyKeyError, REPLAYED_HEADERS,
+)
+from src.utils.ingest_queue import ingest_queue
+from src.utils.sn_search import filter_sn, parse_sn_match, SnMatchError
+from src.utils.bulk_insert import model_to_row, insert_rows
 
 wifi_test_logs_bp = Blueprint('wifi_test_logs_bp', __name__, url_prefix='/api/wifi_test_logs')
 
@@ -24,6 +39,12 @@ def create_wifi_test_log():
 
         logger.info(f"Creating WiFi test log for SN: {json_data['wifi_board_sn']}")
 
+        # 幂等键：重试的请求直接返回第一次写入的记录（异步写入模式下由队列去重，不查询数据库）
+        client_record_id = request_client_id(json_data)
+        existing = None if ingest_queue.enabled else find_by_client_id(WifiTestLog, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
+        
         new_log = WifiTestLog(
             wifi_board_sn=json_data['wifi_board_sn'],
             raw_data=json_data['raw_data'],
@@ -34,17 +55,119 @@ def create_wifi_test_log():
             app_version=json_data.get('app_version', '1.0.0'),
         )
 
+        new_log.client_record_id = client_record_id
+
+        # 异步写入模式：记录追加到本地队列后立即返回 202，由后台线程批量入库
+        if ingest_queue.enabled:
+            return ingest_queue.accepted_response(WifiTestLog, new_log)
+
         db.session.add(new_log)
+        existing = flush_new_record(WifiTestLog, client_record_id)
+        if existing is not None:
+            return jsonify(existing.to_dict()), 200, REPLAYED_HEADERS
         db.session.commit()
 
         logger.info(f"WiFi test log created successfully with ID: {new_log.id}")
         return jsonify(new_log.to_dict()), 201
 
+    except IdempotencyKeyError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error creating WiFi test log: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@wifi_test_logs_bp.route('/stream', methods=['POST'])
+def stream_wifi_test_logs():
+    """
+    流式批量上传WiFi测试日志
+    
+    请求头: Content-Type: application/x-ndjson，可选 Content-Encoding: gzip
+    请求体: 每行一条 JSON 日志记录，字段与单条创建接口相同
+    按行读取请求流，每 NDJSON_INGEST_CHUNK_SIZE 条插入并提交一次，服务端内存占用与上传总量无关
+    记录可带 client_record_id 幂等键：中断后重传整个文件时，已写入的记录会被跳过
+    
+    返回格式:
+    {
+        "inserted_count": 成功条数,
+        "duplicate_count": 跳过的重复条数,
+        "error_count": 失败行数,
+        "errors": [{"line": 行号, "error": "..."}]   # 最多返回前100条
+    }
+    """
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify({'error': 'Content-Type must be application/x-ndjson'}), 415
+    
+    stream = request.stream
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    
+    chunk_size = current_app.config.get('NDJSON_INGEST_CHUNK_SIZE', 500)
+    inserted_count = 0
+    duplicate_count = 0
+    error_count = 0
+    errors = []
+    chunk = []
+    
+    try:
+        for line_no, raw_line in enumerate(stream, start=1):
+            line = raw_line.strip()
+            if not line:
+                continue
+            
+            try:
+                chunk.append(build_log_row(json.loads(line)))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'line': line_no, 'error': str(e)})
+                continue
+            
+            if len(chunk) >= chunk_size:
+                inserted, duplicates = insert_log_chunk(chunk)
+                inserted_count += inserted
+                duplicate_count += duplicates
+                chunk = []
+        
+        if chunk:
+            inserted, duplicates = insert_log_chunk(chunk)
+            inserted_count += inserted
+            duplicate_count += duplicates
+    
+    except IntegrityError:
+        # 同一批幂等键被并发写入：已提交的分块保留，客户端重传时会跳过已写入的记录
+        db.session.rollback()
+        return jsonify({
+            'error': 'Conflicting client_record_id written concurrently, please retry',
+            'inserted_count': inserted_count,
+            'duplicate_count': duplicate_count,
+        }), 409
+    except (OSError, EOFError, zlib.error) as e:
+        # gzip 数据损坏或连接中断：已提交的分块保留，返回已写入数量
+        db.session.rollback()
+        logger.error(f"Corrupted WiFi test log stream after {inserted_count} rows: {str(e)}")
+        return jsonify({
+            'error': 'Corrupted or truncated request stream',
+            'inserted_count': inserted_count,
+            'duplicate_count': duplicate_count,
+            'error_count': error_count,
+            'errors': errors
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error streaming WiFi test logs after {inserted_count} rows: {str(e)}")
+        return jsonify({'error': 'Internal server error', 'inserted_count': inserted_count}), 500
+    
+    logger.info(f"WiFi test log stream processed: {inserted_count} inserted, "
+                f"{duplicate_count} duplicate, {error_count} failed")
+    return jsonify({
+        'inserted_count': inserted_count,
+        'duplicate_count': duplicate_count,
+        'error_count': error_count,
+        'errors': errors
+    })
+
 @wifi_test_logs_bp.route('', methods=['GET'])
 def get_all_wifi_test_logs():
     """获取所有WiFi测试日志（默认不包含已删除的）"""
@@ -54,47 +177,59 @@ def get_all_wifi_test_logs():
         sort_by = request.args.get('sort_by', 'create_time')
         sort_order = request.args.get('sort_order', 'desc')
         
+        # 输出字段（?fields=a,b,c），大字段仅在详情接口返回
+        fields = list_fields(WifiTestLog, request.args.get('fields'))
+        
         # 筛选参数
         wifi_board_sn = request.args.get('wifi_board_sn')
         mac_address = request.args.get('mac_address')
+        sn_match = parse_sn_match()
         
         # 使用模型的默认查询（已过滤 is_deleted=False）
         query = WifiTestLog.query
 
         # 应用筛选
         if wifi_board_sn:
-            query = query.filter(WifiTestLog.wifi_board_sn.like(f'%{wifi_board_sn}%'))
+            query = filter_sn(query, WifiTestLog.wifi_board_sn, wifi_board_sn, sn_match)
         if mac_address:
-            query = query.filter(WifiTestLog.mac_address.like(f'%{mac_address}%'))
-
-        # 应用排序
-        if hasattr(WifiTestLog, sort_by):
-            if sort_order.lower() == 'desc':
-                query = query.order_by(getattr(WifiTestLog, sort_by).desc())
-            else:
-                query = query.order_by(getattr(WifiTestLog, sort_by).asc())
+            query = filter_sn(query, WifiTestLog.mac_address, mac_address, sn_match, name='mac')
 
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        # 排序与分页（支持 cursor 游标分页与 include_total=false）
+        query = apply_projection(query, WifiTestLog, fields, sort_by)
+        items, pagination = paginate_query(query, WifiTestLog, sort_by, sort_order, page, per_page)
 
         return jsonify({
-            'data': [log.to_dict() for log in pagination.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
-            }
+            'data': serialize_page(WifiTestLog, items, fields),
+            'pagination': pagination
         })
+    except (CursorError, FieldsError, SnMatchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching WiFi test logs: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@wifi_test_logs_bp.route('/lookup', methods=['POST'])
+def lookup_wifi_test_logs():
+    """
+    按 id 或 wifi_board_sn 批量获取WiFi测试日志（一次 IN 查询，已删除的记录视为不存在）
+    
+    请求体: {"ids": [...], "sns": [...]}，可选 ?fields=a,b,c
+    返回格式: {"data": {id: 记录}, "not_found": {"ids": [...], "sns": [...]}}
+    """
+    try:
+        return jsonify(batch_lookup(WifiTestLog, 'wifi_board_sn', request.get_json(silent=True), request.args.get('fields')))
+    except (BatchLookupError, FieldsError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up WiFi test logs: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @wifi_test_logs_bp.route('/<string:log_id>', methods=['GET'])
 def get_wifi_test_log(log_id):
     """获取特定ID的WiFi测试日志"""
     try:
-        # WifiTestLog.query 会自动过滤已删除的
-        log = WifiTestLog.query.filter_by(id=log_id).first()
+        # WifiTestLog.query 会自动过滤已删除的；raw_data 为延迟加载列，详情接口随记录一起读取
+        log = WifiTestLog.query.options(undefer(WifiTestLog.raw_data)).filter_by(id=log_id).first()
         if log is None:
             return jsonify({'error': 'WiFi test log not found'}), 404
         return jsonify(log.to_dict())
@@ -124,4 +259,51 @@ def delete_wifi_test_log(log_id):
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error deleting WiFi test log {log_id}: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+
+# 流式上传最多返回的错误明细数量
+MAX_REPORTED_ERRORS = 100
+
+def build_log_row(json_data):
+    """校验单条日志记录并转换为批量插入用的列字典，校验失败抛出 ValueError"""
+    if not isinstance(json_data, dict):
+        raise ValueError('Record must be a JSON object')
+    if not json_data.get('wifi_board_sn') or 'raw_data' not in json_data:
+        raise ValueError('wifi_board_sn and raw_data are required')
+    if not isinstance(json_data['wifi_board_sn'], str):
+        raise ValueError('wifi_board_sn must be a string')
+    if len(json_data['wifi_board_sn']) > 32:
+        raise ValueError('wifi_board_sn too long (max 32 characters)')
+    
+    raw_data = json_data['raw_data']
+    if not isinstance(raw_data, str):
+        raw_data = json.dumps(raw_data, ensure_ascii=False)
+    
+    return model_to_row(WifiTestLog(
+        wifi_board_sn=json_data['wifi_board_sn'],
+        raw_data=raw_data,
+        mac_address=json_data.get('mac_address'),
+        local_ip=json_data.get('local_ip'),
+        public_ip=json_data.get('public_ip'),
+        host_name=json_data.get('host_name'),
+        app_version=json_data.get('app_version', '1.0.0'),
+        client_record_id=record_client_id(json_data),
+    ))
+
+
+def insert_log_chunk(rows):
+    """插入并提交一个分块，跳过已写入过或在分块内重复的幂等键，返回 (插入条数, 跳过条数)"""
+    seen = set(existing_client_ids(WifiTestLog, [row['client_record_id'] for row in rows]))
+    new_rows = []
+    for row in rows:
+        key = row['client_record_id']
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        new_rows.append(row)
+    insert_rows(WifiTestLog, new_rows)
+    db.session.commit()
+    return len(new_rows), len(rows) - len(new_rows)
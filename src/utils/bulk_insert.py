@@ -0,0 +1,24 @@
+from src.extensions import db
+
+
+def model_to_row(obj) -> dict:
+    """
+    把已填充字段的模型对象转换为可批量插入的列字典。
+    Python 端默认值（如 ULID 主键）在这里提前生成，数据库端默认值（如 create_time）留给数据库，
+    保证同一批次所有行的列集合一致，可以合并为一条多行 INSERT。
+    """
+    row = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if value is None and column.default is not None:
+            if column.default.is_clause_element:
+                continue
+            value = column.default.arg(None) if column.default.is_callable else column.default.arg
+        row[column.key] = value
+    return row
+
+
+def insert_rows(model, rows):
+    """在当前事务中以 executemany 批量插入（由调用方负责提交）"""
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
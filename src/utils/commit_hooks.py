@@ -0,0 +1,40 @@
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.extensions import db
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'after_commit_callbacks'
+
+
+def after_commit(key, callback, factory=set):
+    """
+    返回当前事务中 key 对应的累积状态（首次调用时用 factory 创建）。
+    事务提交成功后执行一次 callback(state)，回滚时丢弃；
+    用于把计数器/版本号等热点行的写入移出业务事务，避免并发写入在同一行上排队等锁。
+    """
+    pending = db.session.info.setdefault(_PENDING_KEY, {})
+    if key not in pending:
+        pending[key] = (callback, factory())
+    return pending[key][1]
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for key, (callback, state) in pending.items():
+        try:
+            callback(state)
+        except Exception as e:
+            # 业务数据已提交，回调失败只记录日志（缓存版本号/预聚合可由维护命令修正）
+            logger.error(f"After-commit callback {key!r} failed: {str(e)}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,154 @@
+import math
+
+from flask import request
+
+try:
+    import numpy as np  # 可选依赖：pip install numpy
+except ImportError:
+    np = None
+
+# 降采样算法：lttb（Largest-Triangle-Three-Buckets，保留曲线形状，默认）、minmax（每个区间保留最小值和最大值）
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+# max_points 允许的范围
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+
+class DownsampleError(ValueError):
+    """max_points / downsample 参数无效"""
+
+
+def parse_downsample_args():
+    """读取 max_points 和 downsample 查询参数，返回 (max_points 或 None, 算法)"""
+    max_points = request.args.get('max_points')
+    method = (request.args.get('downsample') or 'lttb').lower()
+    if method not in DOWNSAMPLE_METHODS:
+        raise DownsampleError(f'Invalid downsample. Must be one of: {", ".join(DOWNSAMPLE_METHODS)}')
+    if max_points is None or max_points == '':
+        return None, method
+    try:
+        max_points = int(max_points)
+    except ValueError:
+        raise DownsampleError('max_points must be an integer')
+    if not MIN_POINTS <= max_points <= MAX_POINTS:
+        raise DownsampleError(f'max_points must be between {MIN_POINTS} and {MAX_POINTS}')
+    return max_points, method
+
+
+def _is_numeric(values):
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) and not math.isnan(v) for v in values)
+
+
+# LTTB：按区间逐个选点，每个区间内用向量运算求与前一选中点、下一区间均值构成的三角形面积最大的点
+
+def _lttb_numpy(y, max_points):
+    n = len(y)
+    every = (n - 2) / (max_points - 2)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = y[avg_start:avg_end].mean()
+
+        range_start = int(math.floor(i * every)) + 1
+        range_end = int(math.floor((i + 1) * every)) + 1
+        xs = np.arange(range_start, range_end)
+        areas = np.abs((a - avg_x) * (y[range_start:range_end] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = range_start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def _lttb_python(y, max_points):
+    n = len(y)
+    every = (n - 2) / (max_points - 2)
+    selected = [0]
+    a = 0
+    for i in range(max_points - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        range_start = int(math.floor(i * every)) + 1
+        range_end = int(math.floor((i + 1) * every)) + 1
+        ya = y[a]
+        a = max(
+            range(range_start, range_end),
+            key=lambda j: abs((a - avg_x) * (y[j] - ya) - (a - j) * (avg_y - ya)),
+        )
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
+
+
+# minmax：首尾两点之外等分为 (max_points - 2) / 2 个区间，每个区间保留最小值和最大值
+
+def _minmax_numpy(y, max_points):
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    size = math.ceil((n - 2) / buckets)
+    interior = np.full(buckets * size, np.nan)
+    interior[:n - 2] = y[1:n - 1]
+    interior = interior.reshape(buckets, size)
+    # 末尾区间可能全部为填充值，只保留有数据的区间
+    valid = ~np.isnan(interior).all(axis=1)
+    offsets = np.arange(buckets)[valid] * size + 1
+    interior = interior[valid]
+    picks = np.concatenate((offsets + np.nanargmin(interior, axis=1), offsets + np.nanargmax(interior, axis=1)))
+    return np.unique(np.concatenate(([0], picks, [n - 1])))
+
+
+def _minmax_python(y, max_points):
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    size = math.ceil((n - 2) / buckets)
+    selected = {0, n - 1}
+    for start in range(1, n - 1, size):
+        end = min(start + size, n - 1)
+        indices = range(start, end)
+        selected.add(min(indices, key=y.__getitem__))
+        selected.add(max(indices, key=y.__getitem__))
+    return sorted(selected)
+
+
+def downsample(values, max_points, method='lttb'):
+    """
+    把等间隔采样的数值数组降到不超过 max_points 个点，返回 (采样点下标列表, 数值列表)。
+    点数不超过 max_points 或包含非数值元素时原样返回。安装 numpy 时按区间向量化计算。
+    """
+    n = len(values)
+    if n <= max_points or not _is_numeric(values):
+        return list(range(n)), list(values)
+    if max_points < 4:
+        # minmax 每个区间输出两个点，3 个点时放不下一个区间
+        method = 'lttb'
+
+    if np is not None:
+        y = np.asarray(values, dtype=float)
+        indices = _lttb_numpy(y, max_points) if method == 'lttb' else _minmax_numpy(y, max_points)
+        return indices.tolist(), y[indices].tolist()
+
+    y = list(values)
+    indices = _lttb_python(y, max_points) if method == 'lttb' else _minmax_python(y, max_points)
+    return indices, [y[i] for i in indices]
+
+
+def downsample_fields(data, fields, max_points, method='lttb'):
+    """
+    对输出字典中的数组字段降采样（原地修改）。
+    被降采样的字段额外输出 {字段}_indices（保留点在原数组中的下标，乘以采样间隔即为时间）。
+    """
+    if not max_points:
+        return data
+    for name in fields:
+        values = data.get(name)
+        if isinstance(values, list) and len(values) > max_points:
+            indices, data[name] = downsample(values, max_points, method)
+            data[f'{name}_indices'] = indices
+    return data
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime
+
+from flask import current_app, request, stream_with_context
+
+from src.utils.serializer import format_datetime
+
+logger = logging.getLogger(__name__)
+
+# 导出格式及对应的 Content-Type
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportError(ValueError):
+    """导出参数无效"""
+
+
+def parse_export_format():
+    """读取 format 查询参数（csv/ndjson，默认csv）"""
+    fmt = (request.args.get('format') or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}')
+    return fmt
+
+
+def parse_export_gzip():
+    """读取 gzip 查询参数（true/1/yes 表示压缩输出）"""
+    return (request.args.get('gzip') or '').lower() in ['true', '1', 'yes']
+
+
+def _format_value(value):
+    # 时间格式与列表接口一致（北京时间 ISO 字符串）
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    return value
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(fields, rows):
+    return ''.join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n' for row in rows)
+
+
+def stream_export(query, model, fields, fmt, compress=False, filename='export'):
+    """
+    流式导出查询结果。
+    只查询 fields 列，按主键顺序经服务端游标（yield_per）分批读取，每批序列化后立即写出，
+    整个导出只执行一次查询，内存占用与导出行数无关。compress 时输出 gzip 文件。
+    """
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    rows = query.with_entities(
+        *[getattr(model, name) for name in fields]
+    ).order_by(model.id).yield_per(batch_size)
+
+    def generate():
+        # wbits=31 输出带 gzip 头的压缩流
+        compressor = zlib.compressobj(wbits=31) if compress else None
+
+        def encode(text):
+            data = text.encode('utf-8')
+            return compressor.compress(data) if compressor else data
+
+        exported = 0
+        try:
+            if fmt == 'csv':
+                yield encode(_csv_chunk([fields]))
+
+            batch = []
+            for row in rows:
+                batch.append([_format_value(value) for value in row])
+                if len(batch) >= batch_size:
+                    exported += len(batch)
+                    chunk = encode(_csv_chunk(batch) if fmt == 'csv' else _ndjson_chunk(fields, batch))
+                    batch = []
+                    if chunk:
+                        yield chunk
+            if batch:
+                exported += len(batch)
+                yield encode(_csv_chunk(batch) if fmt == 'csv' else _ndjson_chunk(fields, batch))
+            if compressor:
+                yield compressor.flush()
+        except Exception as e:
+            # 响应头已发出，只能记录日志并中断输出
+            logger.error(f"Export of {model.__tablename__} aborted after {exported} rows: {str(e)}")
+            raise
+        logger.info(f"Exported {exported} rows from {model.__tablename__}")
+
+    filename = f"{filename}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{fmt}"
+    mimetype = EXPORT_FORMATS[fmt]
+    if compress:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = current_app.response_class(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,67 @@
+from flask import request
+from sqlalchemy.exc import IntegrityError
+
+from src.extensions import db
+
+# 单条创建接口的幂等键请求头；批量/流式接口使用每条记录的 client_record_id 字段
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_CLIENT_RECORD_ID_LENGTH = 64
+
+# 重放已有记录时附加的响应头
+REPLAYED_HEADERS = {'Idempotent-Replayed': 'true'}
+
+
+class IdempotencyKeyError(ValueError):
+    """幂等键格式无效"""
+
+
+def _validate(key):
+    if key is None or key == '':
+        return None
+    if not isinstance(key, str):
+        raise IdempotencyKeyError('client_record_id must be a string')
+    if len(key) > MAX_CLIENT_RECORD_ID_LENGTH:
+        raise IdempotencyKeyError(f'client_record_id too long (max {MAX_CLIENT_RECORD_ID_LENGTH} characters)')
+    return key
+
+
+def record_client_id(json_data):
+    """批量/流式上传中单条记录的 client_record_id（未提供时为 None）"""
+    return _validate(json_data.get('client_record_id'))
+
+
+def request_client_id(json_data):
+    """单条创建接口的幂等键：Idempotency-Key 请求头优先，其次为请求体的 client_record_id"""
+    return _validate(request.headers.get(IDEMPOTENCY_HEADER)) or record_client_id(json_data)
+
+
+def find_by_client_id(model, key):
+    """按幂等键查找已写入的记录（包括已软删除的，重试不会让记录复活）"""
+    if not key:
+        return None
+    return db.session.query(model).filter(model.client_record_id == key).first()
+
+
+def existing_client_ids(model, keys):
+    """批量查询已写入的幂等键，返回 {client_record_id: id}（一次 IN 查询，忽略无效的键）"""
+    keys = {key for key in keys if isinstance(key, str) and 0 < len(key) <= MAX_CLIENT_RECORD_ID_LENGTH}
+    if not keys:
+        return {}
+    rows = db.session.query(model.client_record_id, model.id).filter(model.client_record_id.in_(sorted(keys))).all()
+    return dict(rows)
+
+
+def flush_new_record(model, key):
+    """
+    flush 新记录。并发重试时两个请求可能同时通过 find_by_client_id 检查，
+    后写入的一方触发唯一索引冲突：回滚并返回先写入的记录；没有幂等键或不是该冲突时继续抛出。
+    """
+    try:
+        db.session.flush()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+        existing = find_by_client_id(model, key)
+        if existing is None:
+            raise
+        return existing
@@ -0,0 +1,344 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from flask import jsonify
+from sqlalchemy import DateTime
+from sqlalchemy.exc import OperationalError
+
+from src.extensions import db
+from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.driver_board_test_model import DriverBoardTest
+from src.models.integrate_test_model import IntegrateTest
+from src.models.temperature_data_model import TemperatureData
+from src.models.wifi_test_log_model import WifiTestLog
+from src.models.board_summary_model import BoardSummary, load_tests
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.utils.bulk_insert import model_to_row, insert_rows
+from src.utils.idempotency import existing_client_ids, REPLAYED_HEADERS
+from src.utils.stats_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# 可以异步写入的表：表名 -> (模型, 板子汇总/小时预聚合的测试类型，None 表示不维护)
+QUEUE_MODELS = {
+    model.__tablename__: (model, test_type)
+    for model, test_type in [
+        (WifiBoardTest, 'wifi'),
+        (DriverBoardTest, 'driver'),
+        (IntegrateTest, 'integrate'),
+        (TemperatureData, None),
+        (WifiTestLog, None),
+    ]
+}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS ingest_queue (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        resource TEXT NOT NULL,
+        record_id TEXT NOT NULL,
+        client_record_id TEXT,
+        payload TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        claimed_until REAL NOT NULL DEFAULT 0,
+        dead INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        flushed_at REAL
+    )
+    """,
+    # 同一幂等键在队列中只保留一条（NULL 互不冲突）
+    'CREATE UNIQUE INDEX IF NOT EXISTS ux_ingest_queue_client ON ingest_queue (resource, client_record_id)',
+    'CREATE INDEX IF NOT EXISTS ix_ingest_queue_pending ON ingest_queue (dead, flushed_at, claimed_until, seq)',
+]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _decode_row(model, payload):
+    row = json.loads(payload)
+    for column in model.__table__.columns:
+        if isinstance(column.type, DateTime) and isinstance(row.get(column.key), str):
+            row[column.key] = datetime.fromisoformat(row[column.key])
+    return row
+
+
+class IngestQueue:
+    """
+    创建接口的异步写入队列（写后入库）。
+    开启后，创建接口把通过校验的记录追加到本地 SQLite（WAL 模式，每次追加同步落盘）并立即返回 202，
+    后台线程按间隔把队列中的记录按表批量插入数据库，数据库短暂不可用时记录留在队列中等待重试。
+
+    同一台机器上的多个 gunicorn worker 共用一个队列文件：每个 worker 的写回线程先以租约方式
+    认领一批记录再写入，写入成功后删除；进程在提交后、删除前退出时，租约过期后记录会被重新认领，
+    此时已入库的主键/幂等键会被跳过，不会重复插入。
+
+    开启后创建接口不再查询数据库判断幂等键：队列按 (表, client_record_id) 唯一，
+    带幂等键的记录入库后在队列中保留 INGEST_QUEUE_KEY_RETENTION 秒（只保留记录ID），
+    期间的重试直接由队列返回同一个记录ID；写回时幂等键已在数据库中的记录跳过，返回已有记录的ID。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.flush_interval = 1.0
+        self.batch_size = 500
+        self.claim_timeout = 60
+        self.max_attempts = 5
+        self.key_retention = 86400
+        self._app = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def init_app(self, app):
+        self._app = app
+        self.enabled = app.config.get('INGEST_QUEUE_ENABLED', False)
+        self.path = app.config.get('INGEST_QUEUE_PATH', 'instance/ingest_queue.db')
+        self.flush_interval = app.config.get('INGEST_QUEUE_FLUSH_INTERVAL', 1.0)
+        self.batch_size = app.config.get('INGEST_QUEUE_BATCH_SIZE', 500)
+        self.claim_timeout = app.config.get('INGEST_QUEUE_CLAIM_TIMEOUT', 60)
+        self.max_attempts = app.config.get('INGEST_QUEUE_MAX_ATTEMPTS', 5)
+        self.key_retention = app.config.get('INGEST_QUEUE_KEY_RETENTION', 86400)
+        if self.enabled:
+            # 任何请求都会确保本进程的写回线程在运行，重启后遗留在队列中的记录无需等新的上传即可入库
+            app.before_request(self._ensure_flusher)
+
+    def _connection(self):
+        """每个线程一个 SQLite 连接（fork 后重新打开）"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'ingest_queue'").fetchone():
+                # 早期版本的队列文件没有 flushed_at 列
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(ingest_queue)')}
+                if 'flushed_at' not in columns:
+                    conn.execute('DROP INDEX IF EXISTS ix_ingest_queue_pending')
+                    conn.execute('ALTER TABLE ingest_queue ADD COLUMN flushed_at REAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def enqueue(self, model, obj):
+        """
+        把已填充字段并通过校验的模型对象追加到队列，返回 (记录ID, 是否为重放)。
+        create_time 取接收时间，而不是入库时间；同一幂等键已在队列中时返回排队中的记录ID。
+        """
+        row = model_to_row(obj)
+        row['create_time'] = datetime.now(timezone.utc).replace(tzinfo=None)
+        client_record_id = row.get('client_record_id')
+        conn = self._connection()
+        try:
+            conn.execute(
+                'INSERT INTO ingest_queue (resource, record_id, client_record_id, payload) VALUES (?, ?, ?, ?)',
+                (model.__tablename__, row['id'], client_record_id, json.dumps(row, default=_encode_value)),
+            )
+        except sqlite3.IntegrityError:
+            queued = conn.execute(
+                'SELECT record_id FROM ingest_queue WHERE resource = ? AND client_record_id = ?',
+                (model.__tablename__, client_record_id),
+            ).fetchone()
+            if queued is None:
+                raise
+            return queued[0], True
+        self._ensure_flusher()
+        return row['id'], False
+
+    def accepted_response(self, model, obj):
+        """入队并返回创建接口的 202 响应"""
+        record_id, replayed = self.enqueue(model, obj)
+        body = {'id': record_id, 'status': 'queued', 'client_record_id': obj.client_record_id}
+        return jsonify(body), 202, (REPLAYED_HEADERS if replayed else {})
+
+    def flush(self, limit=None):
+        """认领一批记录写入数据库，返回入库（含已存在而跳过）的条数（需在应用上下文中调用）"""
+        claimed = self._claim(limit or self.batch_size)
+        if not claimed:
+            return 0
+
+        groups = defaultdict(list)
+        for entry in claimed:
+            groups[entry[1]].append(entry)
+
+        done = []
+        persisted_ids = {}
+        for resource, entries in groups.items():
+            try:
+                persisted_ids.update(self._persist(resource, entries))
+                done.extend(entry[0] for entry in entries)
+            except OperationalError as e:
+                # 数据库不可用：释放租约，不计失败次数，等待下次重试
+                db.session.rollback()
+                logger.warning(f"Ingest queue flush deferred, database unavailable: {str(e)}")
+                self._release([entry[0] for entry in entries], str(e), count_attempt=False)
+            except Exception as e:
+                db.session.rollback()
+                if len(entries) == 1:
+                    logger.error(f"Ingest queue record {entries[0][2]} ({resource}) failed: {str(e)}")
+                    self._release([entries[0][0]], str(e), count_attempt=True)
+                else:
+                    logger.error(f"Ingest queue batch for {resource} failed, retrying row by row: {str(e)}")
+                    done.extend(self._persist_each(resource, entries, persisted_ids))
+
+        if done:
+            done = set(done)
+            self._complete([entry for entry in claimed if entry[0] in done], persisted_ids)
+        return len(done)
+
+    def _persist(self, resource, entries):
+        """
+        在一个事务中插入一组记录，并维护与同步创建接口相同的汇总表和缓存版本号。
+        返回因幂等键已在数据库中而跳过的记录 {队列中的记录ID: 已有记录ID}
+        """
+        model, test_type = QUEUE_MODELS[resource]
+        rows = [_decode_row(model, entry[4]) for entry in entries]
+
+        # 已入库的主键（上次写入后未来得及出队）和幂等键（同步接口已写入）直接跳过
+        ids = [row['id'] for row in rows]
+        persisted = {row_id for (row_id,) in db.session.query(model.id).filter(model.id.in_(ids))}
+        persisted_keys = existing_client_ids(model, [row.get('client_record_id') for row in rows])
+        replaced = {row['id']: persisted_keys[row['client_record_id']] for row in rows
+                    if row['id'] not in persisted and row.get('client_record_id') in persisted_keys}
+        rows = [row for row in rows if row['id'] not in persisted and row['id'] not in replaced]
+        if not rows:
+            return replaced
+
+        insert_rows(model, rows)
+        if test_type:
+            inserted = load_tests(test_type, [row['id'] for row in rows])
+            BoardSummary.record_tests(test_type, inserted)
+            TestHourlyRollup.record_tests(test_type, inserted)
+            bump_data_version(model.__tablename__)
+        db.session.commit()
+        return replaced
+
+    def _persist_each(self, resource, entries, persisted_ids):
+        """整批失败时逐条写入，只让有问题的记录累计失败次数，返回写入成功的队列序号"""
+        done = []
+        for entry in entries:
+            try:
+                persisted_ids.update(self._persist(resource, [entry]))
+                done.append(entry[0])
+            except OperationalError as e:
+                db.session.rollback()
+                self._release([entry[0]], str(e), count_attempt=False)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Ingest queue record {entry[2]} ({resource}) failed: {str(e)}")
+                self._release([entry[0]], str(e), count_attempt=True)
+        return done
+
+    def _claim(self, limit):
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            claimed = conn.execute(
+                'SELECT seq, resource, record_id, client_record_id, payload FROM ingest_queue '
+                'WHERE dead = 0 AND flushed_at IS NULL AND claimed_until < ? ORDER BY seq LIMIT ?',
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                'UPDATE ingest_queue SET claimed_until = ? WHERE seq = ?',
+                [(now + self.claim_timeout, entry[0]) for entry in claimed],
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return claimed
+
+    def _release(self, seqs, error, count_attempt):
+        increment = 1 if count_attempt else 0
+        conn = self._connection()
+        conn.executemany(
+            'UPDATE ingest_queue SET claimed_until = 0, attempts = attempts + ?, last_error = ?, '
+            'dead = CASE WHEN attempts + ? >= ? THEN 1 ELSE 0 END WHERE seq = ?',
+            [(increment, error[:1000], increment, self.max_attempts, seq) for seq in seqs],
+        )
+
+    def _complete(self, entries, persisted_ids):
+        """删除已入库的记录；带幂等键的只清空数据并标记入库时间，保留到 key_retention 后由 prune 删除"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'DELETE FROM ingest_queue WHERE seq = ?', [(entry[0],) for entry in entries if not entry[3]]
+            )
+            conn.executemany(
+                "UPDATE ingest_queue SET flushed_at = ?, payload = '', record_id = ? WHERE seq = ?",
+                [(now, persisted_ids.get(entry[2], entry[2]), entry[0]) for entry in entries if entry[3]],
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def prune(self):
+        """删除超过保留时间的已入库幂等键，返回删除的条数"""
+        conn = self._connection()
+        return conn.execute(
+            'DELETE FROM ingest_queue WHERE flushed_at IS NOT NULL AND flushed_at < ?',
+            (time.time() - self.key_retention,),
+        ).rowcount
+
+    def stats(self):
+        """队列中等待入库、已放弃（失败次数达到上限）和已入库但仍保留幂等键的记录数"""
+        conn = self._connection()
+        pending, dead, flushed = conn.execute(
+            'SELECT COALESCE(SUM(dead = 0 AND flushed_at IS NULL), 0), COALESCE(SUM(dead = 1), 0), '
+            'COALESCE(SUM(flushed_at IS NOT NULL), 0) FROM ingest_queue'
+        ).fetchone()
+        return {'pending': pending, 'dead': dead, 'flushed': flushed}
+
+    def requeue_dead(self):
+        """把已放弃的记录重新放回队列（排除故障后使用），返回记录数"""
+        conn = self._connection()
+        return conn.execute('UPDATE ingest_queue SET dead = 0, attempts = 0 WHERE dead = 1').rowcount
+
+    def _ensure_flusher(self):
+        """每个进程（包括 fork 出的 gunicorn worker）启动一个后台写回线程"""
+        if not self.enabled or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._run_flusher, name='ingest-queue-flusher', daemon=True)
+        thread.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                with self._app.app_context():
+                    # 积压时连续写入，直到队列中没有可认领的记录
+                    while self.flush() >= self.batch_size:
+                        pass
+                self.prune()
+            except Exception as e:
+                logger.error(f"Ingest queue flusher error: {str(e)}")
+
+
+ingest_queue = IngestQueue()
+
+
+def init_ingest_queue(app):
+    """初始化创建接口的异步写入队列（INGEST_QUEUE_ENABLED 开启时生效）"""
+    ingest_queue.init_app(app)
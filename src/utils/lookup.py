@@ -0,0 +1,69 @@
+from flask import current_app
+
+from src.extensions import db
+from src.utils.projection import list_fields, apply_projection, serialize_page
+
+
+class BatchLookupError(ValueError):
+    """批量查询请求体无效"""
+
+
+def _parse_keys(json_data, name):
+    values = json_data.get(name)
+    if values is None:
+        return []
+    if not isinstance(values, list) or not all(isinstance(v, str) and v for v in values):
+        raise BatchLookupError(f'{name} must be a list of non-empty strings')
+    return list(dict.fromkeys(values))
+
+
+def batch_lookup(model, sn_field, json_data, fields_arg=None):
+    """
+    按 id 或序列号批量获取记录（POST /<resource>/lookup）。
+    请求体: {"ids": [...]} 和/或 {"sns": [...]}，合计最多 LOOKUP_MAX_KEYS 个；
+    只执行一次 IN 查询，已删除的记录视为不存在（与详情接口一致）。
+    未指定 fields 时输出与详情接口相同的全部字段。
+
+    返回格式:
+    {
+        "data": {id: 记录},
+        "not_found": {"ids": [...], "sns": [...]}
+    }
+    """
+    if not isinstance(json_data, dict):
+        raise BatchLookupError('Request body must be a JSON object')
+    ids = _parse_keys(json_data, 'ids')
+    sns = _parse_keys(json_data, 'sns')
+    if not ids and not sns:
+        raise BatchLookupError('ids or sns is required')
+    max_keys = current_app.config.get('LOOKUP_MAX_KEYS', 500)
+    if len(ids) + len(sns) > max_keys:
+        raise BatchLookupError(f'At most {max_keys} ids/sns per request')
+
+    heavy = getattr(model, 'HEAVY_COLUMNS', ())
+    fields = list_fields(model, fields_arg, allow_heavy=heavy) if fields_arg else list(model.__table__.columns.keys())
+
+    id_column = model.__table__.c.id
+    sn_column = model.__table__.c[sn_field]
+    if ids and sns:
+        condition = id_column.in_(ids) | sn_column.in_(sns)
+    elif ids:
+        condition = id_column.in_(ids)
+    else:
+        condition = sn_column.in_(sns)
+
+    query = apply_projection(
+        db.session.query(model).filter(model.is_deleted.is_(False), condition),
+        model, fields + [sn_field], 'id',
+    ).order_by(id_column)
+    items = query.all()
+
+    found_sns = {getattr(item, sn_field) for item in items}
+    data = dict(zip((item.id for item in items), serialize_page(model, items, fields)))
+    return {
+        'data': data,
+        'not_found': {
+            'ids': [i for i in ids if i not in data],
+            'sns': [sn for sn in sns if sn not in found_sns],
+        },
+    }
@@ -0,0 +1,158 @@
+import base64
+import json
+import math
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+from src.extensions import db
+
+
+class CursorError(ValueError):
+    """游标无效或与当前排序参数不匹配"""
+
+
+def encode_cursor(sort_by: str, sort_order: str, value, row_id: str) -> str:
+    """把最后一行的 (排序列值, id) 编码为不透明游标"""
+    payload = {'s': sort_by, 'o': sort_order, 'id': row_id, 'v': value}
+    if isinstance(value, datetime):
+        payload['v'] = value.isoformat()
+        payload['t'] = 'dt'
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """解码游标，返回 (排序列值, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value = payload['v']
+        if payload.get('t') == 'dt' and value is not None:
+            value = datetime.fromisoformat(value)
+        row_id = payload['id']
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorError('Invalid cursor') from e
+
+    if payload.get('s') != sort_by or payload.get('o') != sort_order:
+        raise CursorError('Cursor does not match sort_by/sort_order')
+    return value, row_id
+
+
+def _after_cursor(column, id_column, value, row_id, descending):
+    """
+    游标之后的行的过滤条件。
+    MySQL/SQLite 中 NULL 视为最小值：升序时排在最前，降序时排在最后。
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < row_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < row_id),
+            column.is_(None),
+        )
+    if value is None:
+        return or_(
+            and_(column.is_(None), id_column > row_id),
+            column.isnot(None),
+        )
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+def parse_include_total(default=True):
+    """读取 include_total 查询参数（false/0/no 表示不统计总数）"""
+    return _parse_bool(request.args.get('include_total'), default=default)
+
+
+def fetch_page(statement, params, page, per_page, include_total=True):
+    """
+    执行分页统计语句，一次查询同时取得当前页和总数。
+    语句需使用 :limit / :offset 参数；include_total 时需包含 COUNT(*) OVER () AS total_count 列。
+    返回 (行字典列表, 总数或None, 是否有下一页)
+    """
+    offset = (max(page, 1) - 1) * per_page
+    limit = per_page if include_total else per_page + 1
+    rows = [dict(row._mapping) for row in db.session.execute(statement, {**params, 'limit': limit, 'offset': offset})]
+
+    if not include_total:
+        return rows[:per_page], None, len(rows) > per_page
+
+    if rows:
+        total = int(rows[0]['total_count'])
+    elif offset:
+        # 页码超出范围时当前页没有行，取第一行读出总数
+        first = db.session.execute(statement, {**params, 'limit': 1, 'offset': 0}).first()
+        total = int(first._mapping['total_count']) if first else 0
+    else:
+        total = 0
+    return rows, total, offset + len(rows) < total
+
+
+def _parse_bool(value, default):
+    if value is None:
+        return default
+    return value.lower() in ['true', '1', 'yes']
+
+
+def paginate_query(query, model, sort_by, sort_order, page, per_page):
+    """
+    列表接口共用的分页：按 (排序列, id) 排序，返回 (记录列表, 分页信息)。
+
+    - 传入 cursor 参数（首页可为空字符串）时使用游标分页，按上一页返回的
+      next_cursor 继续读取，不受页码深度影响；
+    - 否则保持原有 page/per_page 偏移分页。
+    include_total=false 时不执行 COUNT(*)；游标模式默认不统计总数。
+    无效的 cursor 或 sort_by 抛出 CursorError。
+    """
+    cursor = request.args.get('cursor')
+    cursor_mode = cursor is not None
+    include_total = parse_include_total(default=not cursor_mode)
+
+    descending = sort_order.lower() == 'desc'
+    sort_order = 'desc' if descending else 'asc'
+    id_column = model.__table__.c.id
+    column = model.__table__.c.get(sort_by)
+    if column is None:
+        if cursor_mode:
+            raise CursorError(f'Invalid sort_by for cursor pagination: {sort_by}')
+        column = id_column
+
+    total = query.order_by(None).count() if include_total else None
+
+    if descending:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+
+    if cursor_mode:
+        if cursor:
+            value, row_id = decode_cursor(cursor, sort_by, sort_order)
+            query = query.filter(_after_cursor(column, id_column, value, row_id, descending))
+        offset = 0
+    else:
+        offset = (max(page, 1) - 1) * per_page
+
+    # 多取一条用于判断是否还有下一页，避免额外的 COUNT
+    rows = query.offset(offset).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    pagination = {
+        'per_page': per_page,
+        'total': total,
+        'has_next': has_next,
+    }
+    if cursor_mode:
+        last = items[-1] if items else None
+        pagination['cursor'] = cursor or None
+        pagination['next_cursor'] = (
+            encode_cursor(sort_by, sort_order, getattr(last, column.key), last.id)
+            if has_next and last is not None else None
+        )
+    else:
+        pagination['page'] = page
+        pagination['pages'] = math.ceil(total / per_page) if total is not None and per_page else None
+        pagination['has_prev'] = page > 1
+    return items, pagination
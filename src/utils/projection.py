@@ -0,0 +1,54 @@
+from sqlalchemy.orm import load_only
+
+from src.utils.serializer import BEIJING_TZ, get_serializer
+
+
+class FieldsError(ValueError):
+    """fields 参数中包含未知字段或仅详情接口可用的字段"""
+
+
+def list_fields(model, fields_arg, allow_heavy=()):
+    """
+    解析列表接口的 ?fields=a,b,c 参数，返回要输出的列名列表。
+    未传时返回除 HEAVY_COLUMNS 以外的全部列；大字段只在详情接口返回，
+    allow_heavy 中的大字段可以通过 fields 显式请求（如降采样后的温度曲线）。
+    """
+    heavy = set(getattr(model, 'HEAVY_COLUMNS', ()))
+    columns = model.__table__.columns.keys()
+
+    if not fields_arg:
+        return [name for name in columns if name not in heavy]
+    heavy -= set(allow_heavy)
+
+    fields = []
+    for name in fields_arg.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name in heavy:
+            raise FieldsError(f'Field {name} is only available on the detail endpoint')
+        if name not in columns:
+            raise FieldsError(f'Unknown field: {name}')
+        fields.append(name)
+
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def apply_projection(query, model, fields, sort_by=None):
+    """只在 SQL 中查询需要输出的列（以及排序列），其余列不加载"""
+    names = set(fields)
+    if sort_by in model.__table__.columns:
+        names.add(sort_by)
+    return query.options(load_only(*[getattr(model, name) for name in names]))
+
+
+def serialize_fields(obj, fields):
+    """按列输出字典，格式与模型的 to_dict() 一致（时间转为北京时间 ISO 字符串）"""
+    return get_serializer(type(obj), fields).serialize(obj)
+
+
+def serialize_page(model, items, fields):
+    """列表接口整页输出，同一页的记录共用一个序列化器"""
+    return get_serializer(model, fields).serialize_many(items)
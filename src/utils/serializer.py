@@ -0,0 +1,128 @@
+import logging
+from datetime import datetime, timezone, timedelta
+from operator import attrgetter, itemgetter
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime
+
+logger = logging.getLogger(__name__)
+
+# 北京时间 (UTC+8)，全局共用一个时区对象
+BEIJING_TZ = timezone(timedelta(hours=8))
+BEIJING_OFFSET = timedelta(hours=8)
+
+
+def format_datetime(value):
+    """
+    UTC 时间（数据库中无时区）转为北京时间 ISO 字符串，
+    结果与 value.replace(tzinfo=utc).astimezone(BEIJING_TZ).isoformat() 相同，但不经过时区换算
+    """
+    if value is None:
+        return None
+    return (value.replace(tzinfo=None) + BEIJING_OFFSET).isoformat() + '+08:00'
+
+
+class ModelSerializer:
+    """
+    按列输出模型对象的字典（与模型 to_dict() 格式一致）。
+    每个 (模型, 字段列表) 只解析一次列类型，整页数据用同一个取值函数批量读取，时间列逐列统一转换。
+    """
+
+    def __init__(self, model, fields):
+        columns = model.__table__.columns
+        self.fields = tuple(fields)
+        self._getter = attrgetter(*self.fields)
+        # 已加载的列值直接从实例 __dict__ 读取，绕过 ORM 属性描述符
+        self._item_getter = itemgetter(*self.fields)
+        self._single = len(self.fields) == 1
+        self._datetime_positions = tuple(
+            i for i, name in enumerate(self.fields) if isinstance(columns[name].type, DateTime)
+        )
+
+    def _values(self, obj):
+        try:
+            values = self._item_getter(obj.__dict__)
+        except KeyError:
+            # 存在未加载（延迟加载/已过期）的列时按属性读取，触发正常的加载
+            values = self._getter(obj)
+        return [values] if self._single else list(values)
+
+    def serialize(self, obj):
+        values = self._values(obj)
+        for i in self._datetime_positions:
+            if values[i] is not None:
+                values[i] = format_datetime(values[i])
+        return dict(zip(self.fields, values))
+
+    def serialize_many(self, objs):
+        rows = [self._values(obj) for obj in objs]
+        for i in self._datetime_positions:
+            for values in rows:
+                if values[i] is not None:
+                    values[i] = format_datetime(values[i])
+        fields = self.fields
+        return [dict(zip(fields, values)) for values in rows]
+
+
+_serializers = {}
+
+
+def get_serializer(model, fields=None):
+    """取 (模型, 字段列表) 对应的序列化器，fields 为空时输出全部列"""
+    fields = tuple(fields) if fields else tuple(model.__table__.columns.keys())
+    key = (model, fields)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = _serializers[key] = ModelSerializer(model, fields)
+    return serializer
+
+
+def serialize_model(obj):
+    """模型对象的全部列转为字典（供 to_dict() 使用）"""
+    return get_serializer(type(obj)).serialize(obj)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    使用 orjson 的 JSON provider，输出与默认 provider 等价：
+    datetime/Decimal 等类型仍交给 Flask 的默认转换，键按默认配置排序。
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson  # 可选依赖：pip install orjson
+
+        self._orjson = orjson
+
+    def _option(self, indent=False):
+        orjson = self._orjson
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return self._orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._orjson.dumps(obj, default=self.default, option=self._option(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """JSON_PROVIDER=orjson（或 auto 且已安装 orjson）时使用 orjson 序列化响应"""
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+    if choice not in ('orjson', 'auto'):
+        return
+    try:
+        app.json = OrjsonProvider(app)
+    except ImportError:
+        if choice == 'orjson':
+            logger.warning("JSON_PROVIDER is orjson but orjson is not installed, using the default provider")
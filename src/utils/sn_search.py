@@ -0,0 +1,67 @@
+from flask import request, current_app
+from sqlalchemy import and_, bindparam
+
+from src.extensions import db
+
+# 序列号匹配方式：prefix（默认，前缀匹配）、exact（精确匹配）、contains（子串匹配）
+SN_MATCH_MODES = ('prefix', 'exact', 'contains')
+
+
+class SnMatchError(ValueError):
+    """sn_match 参数无效"""
+
+
+def parse_sn_match(default='prefix'):
+    """读取 sn_match 查询参数"""
+    mode = (request.args.get('sn_match') or default).lower()
+    if mode not in SN_MATCH_MODES:
+        raise SnMatchError(f'Invalid sn_match. Must be one of: {", ".join(SN_MATCH_MODES)}')
+    return mode
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _use_fulltext(value):
+    # 短于 n-gram 长度的词无法通过全文索引查找，退回 LIKE
+    return (
+        current_app.config.get('SN_FULLTEXT_SEARCH', True)
+        and db.session.get_bind().dialect.name == 'mysql'
+        and len(value) >= current_app.config.get('SN_NGRAM_TOKEN_SIZE', 2)
+    )
+
+
+def sn_params(value, mode, name='sn'):
+    """
+    序列号筛选的绑定参数。
+    prefix/exact 可以使用序列号列上的 B-tree 索引；
+    contains 在 MySQL 上额外生成全文检索词（{name}_term），由 n-gram 全文索引定位候选行。
+    """
+    if mode == 'exact':
+        return {name: value}
+    escaped = _escape_like(value)
+    if mode == 'prefix':
+        return {name: escaped + '%'}
+    params = {name: '%' + escaped + '%'}
+    if _use_fulltext(value):
+        # 短语检索要求 n-gram 连续出现，即子串匹配
+        params[name + '_term'] = '"' + value.replace('"', '') + '"'
+    return params
+
+
+def sn_condition(column, mode, params, name='sn'):
+    """与 sn_params 对应的筛选条件，值以绑定参数传入"""
+    if mode == 'exact':
+        return column == bindparam(name)
+    condition = column.like(bindparam(name), escape='\\')
+    if name + '_term' in params:
+        # 全文索引缩小范围后再用 LIKE 精确校验
+        return and_(column.match(bindparam(name + '_term')), condition)
+    return condition
+
+
+def filter_sn(query, column, value, mode, name='sn'):
+    """在 ORM 查询上应用序列号筛选；同一查询筛选多个列时用不同的 name"""
+    params = sn_params(value, mode, name)
+    return query.filter(sn_condition(column, mode, params, name)).params(**params)
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+from datetime import datetime
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+from src.extensions import db
+from src.models.data_version_model import DataVersion
+from src.utils.commit_hooks import after_commit
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """进程内缓存（默认），每个 gunicorn worker 各自一份"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        data = self._cache.stats()
+        data['backend'] = 'memory'
+        return data
+
+
+class RedisBackend:
+    """Redis 共享缓存，多个 worker/实例共用同一份统计结果"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = 'stats:'):
+        import redis  # 可选依赖：pip install redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+        self._prefix = prefix
+
+    def get(self, key):
+        try:
+            return self._client.get(self._prefix + key)
+        except Exception as e:
+            logger.warning(f"Stats cache read failed: {str(e)}")
+            return None
+
+    def set(self, key, value):
+        try:
+            self._client.set(self._prefix + key, value, ex=self._ttl)
+        except Exception as e:
+            logger.warning(f"Stats cache write failed: {str(e)}")
+
+    def clear(self):
+        try:
+            for key in self._client.scan_iter(match=self._prefix + '*'):
+                self._client.delete(key)
+        except Exception as e:
+            logger.warning(f"Stats cache clear failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {'backend': 'redis'}
+
+
+class StatsCache:
+    """
+    统计接口响应缓存。
+    缓存键 = 接口 + 规范化后的查询参数 + 相关数据表的版本号；
+    测试记录的增删改提交后递增版本号，版本号不变时直接返回缓存的响应体。
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBackend(maxsize=512, ttl=300)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('STATS_CACHE_ENABLED', True)
+        ttl = app.config.get('STATS_CACHE_TTL', 300)
+        redis_url = app.config.get('STATS_CACHE_REDIS_URL')
+        if redis_url:
+            try:
+                self.backend = RedisBackend(redis_url, ttl)
+                return
+            except ImportError:
+                logger.warning("STATS_CACHE_REDIS_URL is set but redis is not installed, using in-process cache")
+        self.backend = MemoryBackend(maxsize=app.config.get('STATS_CACHE_SIZE', 512), ttl=ttl)
+
+    @staticmethod
+    def make_key(endpoint: str, args, versions) -> str:
+        # 参数按名称排序、去掉空值，保证同一筛选条件得到同一个键
+        normalized = sorted(
+            (name, tuple(sorted(values)))
+            for name, values in args.lists()
+            if any(values)
+        )
+        # 默认时间范围依赖当天日期（如 time-stats 默认最近180天），日期变化时也视为不同的键
+        raw = repr((endpoint, normalized, versions, datetime.now().strftime('%Y-%m-%d')))
+        return endpoint + ':' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+stats_cache = StatsCache()
+
+
+def init_stats_cache(app):
+    """初始化统计接口响应缓存"""
+    stats_cache.init_app(app)
+
+
+def bump_data_version(*table_names):
+    """
+    测试记录写入/修改/删除时调用（提交前），使相关统计缓存失效。
+    版本号在业务事务提交成功后才在独立的短事务中递增，并发写入不会在版本号行上排队等锁；回滚时不递增
+    """
+    after_commit('data_versions', DataVersion.bump_committed).update(table_names)
+
+
+def cached_stats(*table_names):
+    """
+    统计接口缓存装饰器，放在 @bp.route 之下。
+    table_names 为统计依赖的数据表，任一表的版本号变化后缓存自动失效。
+    响应头 X-Cache 标明 HIT / MISS。
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not stats_cache.enabled:
+                return f(*args, **kwargs)
+
+            try:
+                versions = tuple(DataVersion.current(name) for name in table_names)
+            except Exception as e:
+                # 无法读取版本号时不使用缓存
+                db.session.rollback()
+                logger.warning(f"Failed to read data version for stats cache: {str(e)}")
+                return f(*args, **kwargs)
+
+            key = stats_cache.make_key(request.endpoint, request.args, versions)
+            body = stats_cache.get(key)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                stats_cache.set(key, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,221 @@
+from datetime import timedelta
+
+from sqlalchemy import select, func, case, bindparam
+
+from src.extensions import db
+from src.models.board_summary_model import SUMMARY_SOURCES, BoardSummary
+from src.models.hourly_rollup_model import TestHourlyRollup
+from src.utils.pagination import fetch_page
+from src.utils.sn_search import sn_params, sn_condition
+
+# 北京时间 (UTC+8)，sn-stats 输出的时间在 Python 中换算，SQL 不再依赖 CONVERT_TZ
+BEIJING_OFFSET = timedelta(hours=8)
+
+
+class StatsEngine:
+    """
+    三种测试类型共用的统计查询。
+    表名、序列号字段、结果字段来自 SUMMARY_SOURCES，所有筛选值都以绑定参数传入；
+    同一结构（筛选条件组合、排序）的语句只构建一次并缓存，
+    重复请求复用 SQLAlchemy 的编译缓存，数据库侧只看到相同的参数化语句。
+    """
+
+    def __init__(self, test_type):
+        source = SUMMARY_SOURCES[test_type]
+        self.test_type = test_type
+        self.sn_field = source.sn_field
+        self.table = source.model.__table__
+        self.sn_column = self.table.c[source.sn_field]
+        self.result_column = self.table.c[source.result_field]
+        self._statements = {}
+
+    def _statement(self, key, build):
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = build()
+        return statement
+
+    @staticmethod
+    def _params(start_dt=None, end_dt=None, sn=None, result=None, sn_match='prefix'):
+        """筛选参数，值为 None 的条件不参与语句"""
+        params = {}
+        if start_dt is not None:
+            params['start_dt'] = start_dt
+        if end_dt is not None:
+            params['end_dt'] = end_dt
+        if sn:
+            params.update(sn_params(sn, sn_match))
+        if result:
+            params['result'] = result
+        return params
+
+    def _conditions(self, names, sn_match='prefix'):
+        table = self.table
+        conditions = [table.c.is_deleted.is_(False)]
+        if 'start_dt' in names:
+            conditions.append(table.c.create_time >= bindparam('start_dt'))
+        if 'end_dt' in names:
+            conditions.append(table.c.create_time <= bindparam('end_dt'))
+        if 'sn' in names:
+            conditions.append(sn_condition(self.sn_column, sn_match, names))
+        if 'result' in names:
+            conditions.append(self.result_column == bindparam('result'))
+        return conditions
+
+    # /stats
+
+    def test_stats(self, start_dt=None, end_dt=None, sn=None, result=None, sn_match='prefix'):
+        """
+        测试记录维度统计，返回 {total_count, success_count, fail_count, breakdown}。
+        总数和成功/失败数由按结果分组的同一次查询累加得到。
+        """
+        params = self._params(start_dt, end_dt, sn, result, sn_match)
+        names = tuple(sorted(params))
+        statement = self._statement(('test_stats', names, sn_match), lambda: select(
+            self.result_column,
+            func.count().label('count'),
+        ).where(*self._conditions(names, sn_match)).group_by(self.result_column))
+
+        stats = {'total_count': 0, 'success_count': 0, 'fail_count': 0, 'breakdown': {}}
+        for value, count in db.session.execute(statement, params):
+            count = int(count)
+            stats['total_count'] += count
+            # 与 MySQL 默认排序规则一致，不区分大小写
+            if (value or '').lower() == 'pass':
+                stats['success_count'] += count
+            elif (value or '').lower() == 'fail':
+                stats['fail_count'] += count
+            stats['breakdown'][value or 'unknown'] = count
+        return stats
+
+    # /boards-stats
+
+    def board_stats(self, start_dt=None, end_dt=None, unit='boards'):
+        """
+        测试维度与板子维度统计（一行），列名同 BoardSummary.board_stats。
+        未按时间筛选时读取汇总表；否则单次扫描用窗口函数得到每块板子的次数和最新结果。
+        """
+        if start_dt is None and end_dt is None:
+            return BoardSummary.board_stats(self.test_type, unit=unit)
+
+        params = self._params(start_dt, end_dt)
+        names = tuple(sorted(params))
+
+        def build():
+            ranked = self._ranked(names)
+            is_pass = ranked.c.result == 'pass'
+            is_fail = ranked.c.result == 'fail'
+            return select(
+                func.sum(ranked.c.total_tests).label('total_tests'),
+                func.sum(ranked.c.pass_count).label('success_tests'),
+                func.sum(ranked.c.fail_count).label('fail_tests'),
+                func.count().label(f'total_{unit}'),
+                func.sum(case((is_pass, 1), else_=0)).label(f'success_{unit}'),
+                func.sum(case((is_fail, 1), else_=0)).label(f'fail_{unit}'),
+                func.sum(case((is_pass & (ranked.c.fail_count == 0), 1), else_=0)).label(f'always_success_{unit}'),
+                func.sum(case((is_pass & (ranked.c.fail_count > 0), 1), else_=0)).label(f'final_success_{unit}'),
+                func.sum(case((is_fail & (ranked.c.pass_count == 0), 1), else_=0)).label(f'always_fail_{unit}'),
+                func.sum(case((is_fail & (ranked.c.pass_count > 0), 1), else_=0)).label(f'final_fail_{unit}'),
+            ).where(ranked.c.rn == 1)
+
+        return db.session.execute(self._statement(('board_stats', names, unit), build), params).one()
+
+    def _ranked(self, names, sn_match='prefix', exclude_empty_sn=False):
+        """每条测试记录附带所属板子的次数统计和按时间倒序的序号（rn=1 为最新一次）"""
+        sn, result, create_time = self.sn_column, self.result_column, self.table.c.create_time
+        conditions = self._conditions(names, sn_match)
+        if exclude_empty_sn:
+            conditions.append(sn != '')
+        return select(
+            sn.label('sn'),
+            result.label('result'),
+            create_time,
+            func.count().over(partition_by=sn).label('total_tests'),
+            func.sum(case((result == 'pass', 1), else_=0)).over(partition_by=sn).label('pass_count'),
+            func.sum(case((result == 'fail', 1), else_=0)).over(partition_by=sn).label('fail_count'),
+            func.min(create_time).over(partition_by=sn).label('first_test_time'),
+            func.row_number().over(
+                partition_by=sn,
+                order_by=(create_time.desc(), self.table.c.id.desc())
+            ).label('rn'),
+        ).where(*conditions).subquery()
+
+    # /sn-stats
+
+    def sn_stats(self, start_dt=None, end_dt=None, sn=None, latest_result=None,
+                 sort_by='total_tests', sort_order='desc', page=1, per_page=10, include_total=True,
+                 sn_match='prefix'):
+        """
+        每板一行统计，返回 (行字典列表, 板子总数或None, 是否有下一页)。
+        行字典的序列号键名为该测试类型的序列号字段，时间为北京时间。
+        """
+        if start_dt is None and end_dt is None:
+            return BoardSummary.sn_stats(
+                self.test_type, sn, latest_result, sort_by, sort_order, page, per_page, include_total, sn_match
+            )
+
+        params = self._params(start_dt, end_dt, sn, sn_match=sn_match)
+        if latest_result:
+            params['latest_result'] = latest_result
+        names = tuple(sorted(params))
+        descending = sort_order != 'asc'
+        key = ('sn_stats', names, sn_match, sort_by, descending, include_total)
+        statement = self._statement(
+            key, lambda: self._sn_stats_statement(names, sn_match, sort_by, descending, include_total)
+        )
+
+        page_rows, total, has_next = fetch_page(statement, params, page, per_page, include_total)
+        rows = []
+        for row in page_rows:
+            rows.append({
+                self.sn_field: row['sn'],
+                'total_tests': row['total_tests'],
+                'pass_count': row['pass_count'],
+                'fail_count': row['fail_count'],
+                'pass_rate': row['pass_rate'],
+                'first_test_time': row['first_test_time'] + BEIJING_OFFSET if row['first_test_time'] else None,
+                'latest_test_time': row['latest_test_time'] + BEIJING_OFFSET if row['latest_test_time'] else None,
+                'latest_result': row['latest_result'],
+            })
+        return rows, total, has_next
+
+    def _sn_stats_statement(self, names, sn_match, sort_by, descending, include_total):
+        ranked = self._ranked(names, sn_match, exclude_empty_sn=True)
+        columns = {
+            'sn': ranked.c.sn,
+            'total_tests': ranked.c.total_tests,
+            'pass_count': ranked.c.pass_count,
+            'fail_count': ranked.c.fail_count,
+            'pass_rate': func.round(ranked.c.pass_count * 100.0 / ranked.c.total_tests, 2).label('pass_rate'),
+            'first_test_time': ranked.c.first_test_time,
+            'latest_test_time': ranked.c.create_time.label('latest_test_time'),
+            'latest_result': ranked.c.result.label('latest_result'),
+        }
+        selected = list(columns.values())
+        if include_total:
+            selected.append(func.count().over().label('total_count'))
+
+        statement = select(*selected).where(ranked.c.rn == 1)
+        if 'latest_result' in names:
+            statement = statement.where(ranked.c.result == bindparam('latest_result'))
+
+        column = columns.get('sn' if sort_by == self.sn_field else sort_by, columns['total_tests'])
+        if descending:
+            statement = statement.order_by(column.desc(), ranked.c.sn.desc())
+        else:
+            statement = statement.order_by(column.asc(), ranked.c.sn.asc())
+        return statement.limit(bindparam('limit')).offset(bindparam('offset'))
+
+    # /time-stats
+
+    def time_stats(self, start_dt, end_dt, interval='day'):
+        """按日/周/月的测试次数趋势（读取小时预聚合表）"""
+        return TestHourlyRollup.time_stats(self.test_type, start_dt, end_dt, interval)
+
+
+STATS_ENGINES = {test_type: StatsEngine(test_type) for test_type in SUMMARY_SOURCES}
+
+
+def get_stats_engine(test_type):
+    """按测试类型（wifi/driver/integrate）取统计引擎"""
+    return STATS_ENGINES[test_type]
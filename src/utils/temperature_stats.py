@@ -0,0 +1,135 @@
+import math
+
+from flask import request
+from sqlalchemy import bindparam
+
+from src.extensions import db
+
+try:
+    import numpy as np  # 可选依赖：pip install numpy
+except ImportError:
+    np = None
+
+# 预计算的温度统计列，列表接口支持 ?{列名}_gt= / ?{列名}_lt= 筛选
+RUN_STATS_COLUMNS = ('max_temp', 'min_temp', 'mean_temp', 'time_to_stable', 'overshoot', 'compensated_drift')
+
+# 稳定判定：与末段均值相差不超过 STABLE_BAND（℃），末段取最后 STABLE_WINDOW 比例的采样点
+STABLE_BAND = 0.5
+STABLE_WINDOW = 0.1
+
+
+class StatsFilterError(ValueError):
+    """统计列筛选参数无效"""
+
+
+def _numeric(values):
+    if not values:
+        return []
+    return [float(v) for v in values
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)]
+
+
+def _window(count):
+    return max(1, int(count * STABLE_WINDOW))
+
+
+def compute_run_stats(original, compensated=None, sample_interval=None):
+    """
+    计算一次老化测试的温度统计，返回 RUN_STATS_COLUMNS 对应的字典（无法计算的值为 None）：
+    - max_temp / min_temp / mean_temp：原始温度的最大、最小、平均值
+    - time_to_stable：原始温度进入并保持在末段均值 ±STABLE_BAND 内的时间（秒，需 sample_interval）
+    - overshoot：最高温度超出末段均值的幅度
+    - compensated_drift：补偿后温度在稳定段内的漂移（末段均值 - 稳定后首段均值）
+    """
+    stats = dict.fromkeys(RUN_STATS_COLUMNS)
+    values = _numeric(original)
+    if not values:
+        return stats
+
+    count = len(values)
+    window = _window(count)
+    if np is not None:
+        y = np.asarray(values)
+        final = float(y[-window:].mean())
+        outside = np.flatnonzero(np.abs(y - final) > STABLE_BAND)
+        stats.update(max_temp=float(y.max()), min_temp=float(y.min()), mean_temp=float(y.mean()))
+    else:
+        final = sum(values[-window:]) / window
+        outside = [i for i, v in enumerate(values) if abs(v - final) > STABLE_BAND]
+        stats.update(max_temp=max(values), min_temp=min(values), mean_temp=sum(values) / count)
+
+    # 最后一个超出稳定带的点之后即为稳定
+    stable_index = int(outside[-1]) + 1 if len(outside) else 0
+    if sample_interval:
+        stats['time_to_stable'] = stable_index * int(sample_interval)
+    stats['overshoot'] = max(stats['max_temp'] - final, 0.0)
+
+    compensated = _numeric(compensated)[stable_index:]
+    if compensated:
+        window = _window(len(compensated))
+        stats['compensated_drift'] = (
+            sum(compensated[-window:]) / window - sum(compensated[:window]) / window
+        )
+
+    for name in ('max_temp', 'min_temp', 'mean_temp', 'overshoot', 'compensated_drift'):
+        if stats[name] is not None:
+            stats[name] = round(stats[name], 4)
+    return stats
+
+
+def apply_run_stats(data):
+    """按当前温度数组重新计算统计列并写入模型对象"""
+    stats = compute_run_stats(data.original_temperature, data.compensated_temperature, data.sample_interval)
+    for name, value in stats.items():
+        setattr(data, name, value)
+
+
+def parse_stats_filters(model):
+    """读取 ?{统计列}_gt= / ?{统计列}_lt= 参数，返回筛选条件列表"""
+    conditions = []
+    for name in RUN_STATS_COLUMNS:
+        column = getattr(model, name)
+        for suffix in ('gt', 'lt'):
+            value = request.args.get(f'{name}_{suffix}')
+            if value is None or value == '':
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                raise StatsFilterError(f'{name}_{suffix} must be a number')
+            conditions.append(column > value if suffix == 'gt' else column < value)
+    return conditions
+
+
+def backfill_run_stats(model, batch_size=100, only_missing=True):
+    """
+    按主键分批为已有记录计算统计列，每批提交一次。
+    only_missing 时只处理还没有统计值的记录。返回更新的行数。
+    """
+    table = model.__table__
+    updated = 0
+    last_id = ''
+    while True:
+        query = db.session.query(
+            model.id, model.original_temperature, model.compensated_temperature, model.sample_interval
+        ).filter(model.id > last_id)
+        if only_missing:
+            query = query.filter(model.max_temp.is_(None), model.original_temperature.isnot(None))
+        rows = query.order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        changes = []
+        for row in rows:
+            stats = compute_run_stats(row.original_temperature, row.compensated_temperature, row.sample_interval)
+            changes.append({'row_id': row.id, **{f'new_{name}': value for name, value in stats.items()}})
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam('row_id'))
+            .values({name: bindparam(f'new_{name}') for name in RUN_STATS_COLUMNS}),
+            changes,
+        )
+        db.session.commit()
+        updated += len(changes)
+    return updated
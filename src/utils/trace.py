@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from sqlalchemy import select, or_
+
+from src.extensions import db
+from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.driver_board_test_model import DriverBoardTest
+from src.models.integrate_test_model import IntegrateTest
+from src.models.temperature_data_model import TemperatureData
+from src.models.wifi_test_log_model import WifiTestLog
+from src.utils.projection import list_fields, apply_projection, serialize_page
+
+# POST /api/trace 一次最多查询的序列号数量
+MAX_TRACE_SNS = 1000
+
+# 时间线记录类型：(类型名, 模型, 序列号字段, 结果字段)
+TRACE_SOURCES = [
+    ('wifi_board_test', WifiBoardTest, 'wifi_board_sn', 'general_test_result'),
+    ('driver_board_test', DriverBoardTest, 'driver_board_sn', 'driver_test_result'),
+    ('integrate_test', IntegrateTest, 'product_sn', 'integrate_test_result'),
+    ('temperature_data', TemperatureData, 'product_sn', None),
+    ('wifi_test_log', WifiTestLog, 'wifi_board_sn', None),
+]
+
+
+def _fetch(model, conditions):
+    """查询一种记录（不含已删除、不加载大字段），返回 (模型对象列表, 输出字段)"""
+    fields = list_fields(model, None)
+    query = apply_projection(
+        db.session.query(model).filter(model.is_deleted.is_(False), *conditions),
+        model, fields, 'create_time',
+    )
+    return query.all(), fields
+
+
+def collect_traces(sns):
+    """
+    汇总一批序列号在各工站的全部测试记录，返回 {序列号: 按时间排序的时间线}。
+    每种记录只执行一次 IN 查询（共 5 次，与序列号数量无关）；
+    集成测试引用的温度数据（ipm_temperature_data_id）在温度数据查询中通过子查询一并取回，
+    归入引用它的产品序列号。
+    """
+    sns = list(dict.fromkeys(sns))
+    timelines = {sn: [] for sn in sns}
+
+    integrate_owner = {}
+    for record_type, model, sn_field, result_field in TRACE_SOURCES:
+        sn_column = getattr(model, sn_field)
+        conditions = [sn_column.in_(sns)]
+        if model is TemperatureData:
+            referenced = select(IntegrateTest.ipm_temperature_data_id).where(
+                IntegrateTest.product_sn.in_(sns),
+                IntegrateTest.is_deleted.is_(False),
+                IntegrateTest.ipm_temperature_data_id.isnot(None),
+            )
+            conditions = [or_(sn_column.in_(sns), TemperatureData.id.in_(referenced))]
+
+        items, fields = _fetch(model, conditions)
+        for item, record in zip(items, serialize_page(model, items, fields)):
+            owners = {getattr(item, sn_field)}
+            if model is IntegrateTest and item.ipm_temperature_data_id:
+                integrate_owner.setdefault(item.ipm_temperature_data_id, set()).add(item.product_sn)
+            elif model is TemperatureData:
+                owners |= integrate_owner.get(item.id, set())
+
+            entry = {
+                'type': record_type,
+                'id': item.id,
+                'time': record.get('create_time'),
+                'result': getattr(item, result_field) if result_field else None,
+                'record': record,
+            }
+            # 按 (create_time, id) 排序，缺少时间的记录排在最前
+            sort_key = (item.create_time or datetime.min, item.id)
+            for sn in owners & timelines.keys():
+                timelines[sn].append((sort_key, entry))
+
+    return {sn: [entry for _, entry in sorted(timeline, key=lambda pair: pair[0])]
+            for sn, timeline in timelines.items()}
+
+
+def summarize(timeline):
+    """时间线中各类型记录的数量"""
+    counts = {record_type: 0 for record_type, *_ in TRACE_SOURCES}
+    for entry in timeline:
+        counts[entry['type']] += 1
+    return counts
@@ -4,4 +4,5 @@ set -e
 # 若有数据库迁移等操作可在这里加
 # if [ -f "manage.py" ]; then python manage.py migrate; fi
 
-exec gunicorn app:app --bind 0.0.0.0:8000 --workers 2
\ No newline at end of file
+# worker 数量、线程数、worker 类型等通过 GUNICORN_* 环境变量调整，见 src/config/gunicorn_config.py
+exec gunicorn -c src/config/gunicorn_config.py src.app:app
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""API 密钥认证耗时基准：验证密钥数量从 5 增长到 5000 时认证耗时保持平稳
+
+运行方式: python -m tests.api_key_lookup_bench
+使用内存 SQLite，不依赖线上数据库。
+"""
+
+import secrets
+import time
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from src.extensions import db
+from src.models.admin_api_keys import ApiKey
+
+KEY_COUNTS = [5, 50, 500, 5000]
+ROUNDS = 20
+
+
+def create_bench_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def add_filler_keys(count):
+    """批量插入干扰密钥（共用同一个真实哈希值，校验成本与线上一致）"""
+    filler_hash = generate_password_hash(f"hpws_{secrets.token_urlsafe(32)}")
+    rows = []
+    for i in range(count):
+        key = f"hpws_{secrets.token_urlsafe(32)}"
+        rows.append({
+            'id': f"{i:026d}",
+            'key_name': f"filler-{i}",
+            'key_hash': filler_hash,
+            'key_prefix': key[:12] + "...",
+            'lookup_prefix': key[:ApiKey.LOOKUP_PREFIX_LENGTH],
+            'scope': 'upload',
+            'permissions': ['upload'],
+            'is_active': True,
+            'usage_count': 0,
+        })
+    db.session.execute(ApiKey.__table__.insert(), rows)
+    db.session.commit()
+
+
+def linear_scan(raw_key):
+    """旧实现：对所有激活密钥逐个做哈希校验"""
+    for key_obj in ApiKey.query.filter_by(is_active=True).all():
+        if key_obj.verify_key(raw_key) and key_obj.is_valid():
+            return key_obj
+    return None
+
+
+def time_lookup(func, raw_key, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        assert func(raw_key) is not None
+        db.session.expunge_all()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run_benchmark():
+    app = create_bench_app()
+    with app.app_context():
+        print(f"{'keys':>6} | {'indexed (ms)':>12} | {'linear scan (ms)':>16}")
+        print("-" * 42)
+        for count in KEY_COUNTS:
+            db.drop_all()
+            db.create_all()
+
+            # 目标密钥排在最后插入，模拟最差情况
+            add_filler_keys(count - 1)
+            api_key, raw_key = ApiKey.generate_key(name='bench', permissions=['upload'])
+            db.session.add(api_key)
+            db.session.commit()
+
+            indexed_ms = time_lookup(ApiKey.find_by_key, raw_key, ROUNDS)
+            # 线性扫描在大数据量下非常慢，只测少量轮次
+            linear_ms = time_lookup(linear_scan, raw_key, 1) if count <= 50 else None
+
+            linear_text = f"{linear_ms:16.2f}" if linear_ms is not None else f"{'skipped':>16}"
+            print(f"{count:>6} | {indexed_ms:12.2f} | {linear_text}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
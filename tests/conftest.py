@@ -0,0 +1,30 @@
+"""测试共用的 SQLite 应用（不依赖远程 MySQL）"""
+
+import pytest
+from flask import Flask
+
+from src.config.database import Config
+from src.extensions import db
+
+
+@pytest.fixture
+def sqlite_app(tmp_path):
+    """使用临时 SQLite 文件、注册测试记录路由的应用，表结构由模型直接创建"""
+    from src.routes import wifi_board_tests_bp, driver_board_tests_bp, integrate_tests_bp
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SN_FULLTEXT_SEARCH=False,
+    )
+    db.init_app(app)
+    for blueprint in (wifi_board_tests_bp, driver_board_tests_bp, integrate_tests_bp):
+        app.register_blueprint(blueprint)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
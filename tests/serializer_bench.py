@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""列表接口序列化耗时基准：每个测试模型 1000 行一页，对比逐行 to_dict + 标准库 json 与预编译序列化器 + orjson
+
+运行方式: python -m tests.serializer_bench
+只构造内存中的模型对象，不依赖数据库；未安装 orjson 时只测序列化器部分。
+"""
+
+import json
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from src.models import WifiBoardTest, DriverBoardTest, IntegrateTest, WifiTestLog, TemperatureData
+from src.utils.serializer import get_serializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MODELS = [WifiBoardTest, DriverBoardTest, IntegrateTest, WifiTestLog, TemperatureData]
+PAGE_SIZE = 1000
+ROUNDS = 20
+
+
+def make_rows(model, count):
+    """按列类型填充示例值，时间列为无时区的 UTC 时间（与数据库读出的一致）"""
+    base_time = datetime(2025, 1, 1, 8, 30, 15, 123456)
+    rows = []
+    for i in range(count):
+        values = {}
+        for column in model.__table__.columns:
+            if isinstance(column.type, DateTime):
+                values[column.key] = base_time + timedelta(seconds=i)
+            elif isinstance(column.type, Boolean):
+                values[column.key] = False
+            elif isinstance(column.type, Integer):
+                values[column.key] = i
+            elif isinstance(column.type, Float):
+                values[column.key] = i * 0.5
+            else:
+                values[column.key] = f"{column.key}-{i:06d}"
+        rows.append(model(**values))
+    return rows
+
+
+def legacy_serialize(rows, fields):
+    """旧实现：逐行逐列判断类型，每个时间值都做一次时区换算"""
+    beijing_tz = timezone(timedelta(hours=8))
+    data = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = getattr(row, name)
+            if isinstance(value, datetime):
+                value = value.replace(tzinfo=timezone.utc).astimezone(beijing_tz).isoformat()
+            item[name] = value
+        data.append(item)
+    return data
+
+
+def time_call(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run_benchmark():
+    print(f"{'model':<18} | {'legacy+json (ms)':>16} | {'serializer+json (ms)':>20} | {'serializer+orjson (ms)':>22}")
+    print("-" * 86)
+    for model in MODELS:
+        rows = make_rows(model, PAGE_SIZE)
+        fields = tuple(model.__table__.columns.keys())
+        serializer = get_serializer(model, fields)
+        assert serializer.serialize_many(rows) == legacy_serialize(rows, fields)
+
+        legacy_ms = time_call(lambda: json.dumps({'data': legacy_serialize(rows, fields)}), ROUNDS)
+        fast_ms = time_call(lambda: json.dumps({'data': serializer.serialize_many(rows)}), ROUNDS)
+        if orjson is not None:
+            orjson_ms = time_call(lambda: orjson.dumps({'data': serializer.serialize_many(rows)}), ROUNDS)
+            orjson_text = f"{orjson_ms:22.2f}"
+        else:
+            orjson_text = f"{'not installed':>22}"
+        print(f"{model.__name__:<18} | {legacy_ms:16.2f} | {fast_ms:20.2f} | {orjson_text}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
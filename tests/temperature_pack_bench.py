@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""温度数组存储基准：对比 JSON 文本与 PackedFloatArray 二进制格式的存储大小和解码耗时
+
+运行方式: python -m tests.temperature_pack_bench
+只做内存中的编解码，不依赖数据库；安装 numpy 后解码走 frombuffer。
+"""
+
+import json
+import random
+import time
+
+from src.models.column_types import pack_floats, unpack_floats, np
+
+POINT_COUNTS = [1000, 10000, 50000]
+ROUNDS = 20
+
+
+def make_curve(count):
+    """模拟老化测试曲线：升温后在 85℃ 附近波动，两位小数"""
+    values = []
+    temperature = 25.0
+    for i in range(count):
+        target = 85.0 if i > count // 10 else 25.0 + 60.0 * i / max(count // 10, 1)
+        temperature += (target - temperature) * 0.05 + random.uniform(-0.3, 0.3)
+        values.append(round(temperature, 2))
+    return values
+
+
+def time_call(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run_benchmark():
+    print(f"numpy: {'yes' if np is not None else 'no'}")
+    print(f"{'points':>7} | {'json bytes':>10} | {'packed bytes':>12} | {'json decode (ms)':>16} | {'packed decode (ms)':>18}")
+    print("-" * 76)
+    for count in POINT_COUNTS:
+        values = make_curve(count)
+        text = json.dumps(values).encode('utf-8')
+        packed = pack_floats(values)
+        assert unpack_floats(packed) == values
+
+        json_ms = time_call(lambda: json.loads(text), ROUNDS)
+        packed_ms = time_call(lambda: unpack_floats(packed), ROUNDS)
+        print(f"{count:>7} | {len(text):>10} | {len(packed):>12} | {json_ms:16.3f} | {packed_ms:18.3f}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""测试 API 密钥验证缓存（TTL/LRU 淘汰、过期判断、命中计数）"""
+
+import time
+from datetime import datetime, timedelta
+
+from src.utils.ttl_cache import TTLCache
+from src.auth.api_key_cache import ApiKeyCache, CachedApiKey
+
+
+def test_ttl_cache_lru_and_expiry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1      # a 变为最近使用
+    cache.set('c', 3)               # 淘汰最久未使用的 b
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    cache.set('d', 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('d') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+    print(f"✓ TTLCache 统计: {stats}")
+
+
+def test_cached_api_key_validity():
+    expired = CachedApiKey('1', 'k', 'upload', ['upload'], datetime.utcnow() - timedelta(minutes=1))
+    valid = CachedApiKey('2', 'k', 'upload', ['upload'], datetime.utcnow() + timedelta(minutes=1))
+    forever = CachedApiKey('3', 'k', 'upload', None, None)
+
+    assert not expired.is_valid()
+    assert valid.is_valid()
+    assert forever.is_valid()
+    assert valid.has_permission('upload')
+    assert not forever.has_permission('upload')
+    print("✓ CachedApiKey 过期与权限判断正确")
+
+
+def test_cache_digest_does_not_store_raw_key():
+    digest = ApiKeyCache.digest('hpws_secret')
+    assert 'hpws_secret' not in digest
+    assert len(digest) == 64
+    print("✓ 缓存键为密钥摘要，不保存原文")
+
+
+if __name__ == "__main__":
+    test_ttl_cache_lru_and_expiry()
+    test_cached_api_key_validity()
+    test_cache_digest_does_not_store_raw_key()
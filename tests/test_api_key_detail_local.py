@@ -4,6 +4,7 @@
 from src.app import app
 from src.extensions import db
 from src.models.admin_api_keys import ApiKey
+from src.auth.api_key_usage import api_key_usage
 from src.models.admin_user_model import User
 from src.routes.admin_api_key_routes import get_api_key_detail
 from flask import g
@@ -44,10 +45,10 @@ def test_api_key_detail_function():
             
             # 2. 模拟使用密钥（增加使用次数）
             print("\n2. 模拟密钥使用...")
-            api_key.update_usage()
-            api_key.update_usage()
-            api_key.update_usage()
-            db.session.commit()
+            for _ in range(3):
+                api_key_usage.record(api_key.id)
+            api_key_usage.flush()
+            db.session.refresh(api_key)
             print(f"✓ 模拟使用3次，当前使用次数: {api_key.usage_count}")
             
             # 3. 直接调用详情方法测试
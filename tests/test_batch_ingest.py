@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""测试批量上传：单条记录出错只影响该条"""
+
+from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.board_summary_model import BoardSummary
+
+
+def test_batch_rejects_non_string_sn_per_record(sqlite_app):
+    client = sqlite_app.test_client()
+    response = client.post('/api/wifi_board_tests/batch', json=[
+        {'wifi_board_sn': 'SN-A', 'general_test_result': 'pass'},
+        {'wifi_board_sn': 12345, 'general_test_result': 'pass'},
+        {'wifi_board_sn': 'SN-B', 'general_test_result': 'fail', 'mac_address': ['not', 'a', 'string']},
+        {'wifi_board_sn': 'SN-C', 'general_test_result': 'fail'},
+    ])
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['created_count'] == 2
+    assert data['error_count'] == 2
+    statuses = [result['status'] for result in data['results']]
+    assert statuses == ['created', 'error', 'error', 'created']
+    assert data['results'][1]['error'] == 'wifi_board_sn must be a string'
+    assert data['results'][2]['error'] == 'mac_address must be a string'
+
+    assert sorted(test.wifi_board_sn for test in WifiBoardTest.query.all()) == ['SN-A', 'SN-C']
+    assert sorted(summary.sn for summary in BoardSummary.query.all()) == ['SN-A', 'SN-C']
+    print("✓ 非字符串序列号只让该条记录失败，其余记录正常写入")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""测试板子汇总表：重新计算汇总时不覆盖并发写入的累加"""
+
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from src.extensions import db
+from src.models.wifi_board_test_model import WifiBoardTest
+from src.models.board_summary_model import BoardSummary
+
+
+def _add_test(sn, result, create_time):
+    test = WifiBoardTest(wifi_board_sn=sn, general_test_result=result, create_time=create_time)
+    db.session.add(test)
+    db.session.flush()
+    BoardSummary.record_tests('wifi', [test])
+    return test
+
+
+def _recount(sn):
+    tests = WifiBoardTest.query.filter_by(wifi_board_sn=sn, is_deleted=False).all()
+    return len(tests), sum(1 for test in tests if test.general_test_result == 'pass')
+
+
+def test_refresh_does_not_lose_concurrent_record_tests(sqlite_app):
+    now = datetime.utcnow()
+    _add_test('SN-1', 'pass', now - timedelta(minutes=5))
+    db.session.commit()
+
+    def record_concurrently():
+        # 另一个请求：在 refresh 的事务进行中为同一块板子新增一条测试记录
+        with sqlite_app.app_context():
+            _add_test('SN-1', 'pass', now)
+            db.session.commit()
+
+    writer = threading.Thread(target=record_concurrently)
+    refreshing = threading.get_ident()
+
+    def interleave(conn, cursor, statement, parameters, context, executemany):
+        # refresh 执行第一条语句后让并发写入运行（最多等待1秒，被锁阻塞时继续执行 refresh）
+        if threading.get_ident() == refreshing and not writer.is_alive() and writer.ident is None:
+            writer.start()
+            writer.join(timeout=1)
+
+    event.listen(db.engine, 'after_cursor_execute', interleave)
+    try:
+        BoardSummary.refresh('wifi', ['SN-1'])
+        db.session.commit()
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', interleave)
+    writer.join()
+
+    db.session.expire_all()
+    summary = db.session.get(BoardSummary, ('wifi', 'SN-1'))
+    assert (summary.total_tests, summary.pass_count) == _recount('SN-1') == (2, 2)
+    assert summary.latest_test_time == now
+    print("✓ 重新计算汇总与并发新增交错时汇总等于全量重新计数")
+
+
+def test_refresh_after_soft_delete(sqlite_app):
+    now = datetime.utcnow()
+    _add_test('SN-1', 'pass', now - timedelta(minutes=5))
+    latest = _add_test('SN-1', 'fail', now)
+    only = _add_test('SN-2', 'pass', now)
+    db.session.commit()
+
+    summary = db.session.get(BoardSummary, ('wifi', 'SN-1'))
+    assert summary.latest_result == 'fail'
+
+    latest.is_deleted = True
+    only.is_deleted = True
+    BoardSummary.refresh('wifi', ['SN-1', 'SN-2', None])
+    db.session.commit()
+
+    summary = db.session.get(BoardSummary, ('wifi', 'SN-1'))
+    assert (summary.total_tests, summary.pass_count, summary.fail_count) == (1, 1, 0)
+    assert summary.latest_result == 'pass'
+    assert db.session.get(BoardSummary, ('wifi', 'SN-2')) is None
+    print("✓ 软删除后重新计算汇总，无有效记录的板子删除汇总行")
+
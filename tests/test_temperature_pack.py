@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""测试温度数组的二进制编码（定点差分 / float64 / JSON）"""
+
+import math
+
+from src.models.column_types import (
+    pack_floats, unpack_floats, ARRAY_DELTA16, ARRAY_FLOAT64, ARRAY_JSON,
+)
+
+
+def test_two_decimal_values_use_delta16():
+    values = [25.0, 25.25, 24.99, 80.5]
+    packed = pack_floats(values)
+    assert packed[0] == ARRAY_DELTA16
+    assert unpack_floats(packed) == values
+    print("✓ 两位小数以内的温度使用 int16 差分编码")
+
+
+def test_non_finite_values_fall_back_to_float64():
+    for bad in (float('nan'), float('inf'), float('-inf')):
+        packed = pack_floats([25.0, bad, 26.5])
+        assert packed[0] == ARRAY_FLOAT64
+        restored = unpack_floats(packed)
+        assert restored[0] == 25.0 and restored[2] == 26.5
+        assert (math.isnan(restored[1]) if math.isnan(bad) else restored[1] == bad)
+    print("✓ NaN / Infinity 改用 float64 编码，不抛出异常")
+
+
+def test_huge_values_fall_back_to_float64():
+    for values in ([1e308], [25.0, -1e308], [21474836.48], [25.0, 1e20]):
+        packed = pack_floats(values)
+        assert packed[0] == ARRAY_FLOAT64
+        assert unpack_floats(packed) == values
+    # 仍在 int32 定点范围内的最大值继续使用差分编码
+    assert pack_floats([21474836.47])[0] == ARRAY_DELTA16
+    print("✓ 放大后溢出或超出 int32 的值改用 float64 编码")
+
+
+def test_non_numeric_values_use_json():
+    packed = pack_floats([1.5, None])
+    assert packed[0] == ARRAY_JSON
+    assert unpack_floats(packed) == [1.5, None]
+    print("✓ 含非数值元素时使用 JSON 编码")
+
+
+if __name__ == "__main__":
+    test_two_decimal_values_use_delta16()
+    test_non_finite_values_fall_back_to_float64()
+    test_huge_values_fall_back_to_float64()
+    test_non_numeric_values_use_json()